@@ -0,0 +1,383 @@
+"""
+Columnar analytics store of solved orders (orders/.analytics)
+- record() appends one row per solve (processed or failed) to the `solves` table and the plan's
+  assignments, summed per machine, to the `machine_loads` table when run_order finishes
+- Machine utilization over time comes from the reservation calendar (reservations.py): the hours
+  each machine is booked within each time bucket, not the solve times of the orders
+- Every column is an append-only file of fixed-width binary values; text columns store int32
+  codes into a JSON vocabulary. Readers load whole columns once and afterwards only the rows
+  appended since, so the aggregations below are numpy reductions that never open an order folder;
+  their results are kept until the store grows
+- Re-solved orders keep their history; aggregations use the latest solve of each order
+- The store is derived data: a write torn by a crash is trimmed on the next append, and
+  rebuild() regenerates the store from the order folders
+
+Usage: python analytics.py [--orders DIR] [--rebuild]
+"""
+import os
+import json
+import math
+import time
+import shutil
+import argparse
+from datetime import datetime, timezone
+
+import reservations
+from order_store import atomic_write_json, process_lock, read_json
+
+STORE_NAME = '.analytics'
+# table: {column: numpy dtype, or 'text' for dictionary-encoded strings}
+TABLES = {
+    'solves': {
+        'order_id': 'text', 'solved_at': 'f8', 'status': 'text', 'cause': 'text', 'config_version': 'text',
+        'time_model': 'text', 'num_tasks': 'i8', 'price': 'f8', 'section': 'i8', 'cost': 'f8', 'profit': 'f8',
+        'time': 'f8', 'time_limit': 'f8', 'cost_limit': 'f8',
+    },
+    'machine_loads': {
+        'solve': 'i8', 'section_id': 'i8', 'machine_id': 'i8', 'tasks': 'i8', 'hours': 'f8', 'var_cost': 'f8',
+    },
+}
+BUCKETS = {'hour': 3600, 'day': 86400, 'week': 7 * 86400}
+WEEK_OFFSET = 4 * 86400  # week buckets start on Monday (1970-01-01 was a Thursday)
+TIGHT_SHARE = 0.95       # an order using this share of its time limit saturates its section
+PERCENTILES = [10, 25, 50, 75, 90]
+
+_cache = {}    # (store, table) -> (generation, rows, {column: array}, {column: vocabulary})
+_results = {}  # (aggregation, orders_dir, arguments) -> (store stamp, result)
+RESULTS_KEPT = 64
+
+
+def store_path(orders_dir):
+    return os.path.join(orders_dir, STORE_NAME)
+
+
+# ---------- Storage ----------
+
+def _file(store, table, column, suffix='.bin'):
+    return os.path.join(store, table, column + suffix)
+
+
+def _itemsize(kind):
+    return 4 if kind == 'text' else int(kind[1:])
+
+
+def _rows(store, table):
+    """Complete rows of a table: the shortest column (longer ones end in a torn append)"""
+    sizes = []
+    for column, kind in TABLES[table].items():
+        path = _file(store, table, column)
+        sizes.append(os.path.getsize(path) // _itemsize(kind) if os.path.exists(path) else 0)
+    return min(sizes)
+
+
+def _writer(store):
+    """Exclusive append access to a store (lock file outside it, so rebuild() can swap the folder)"""
+    return process_lock(store + '.lock')
+
+
+def _append(store, table, columns):
+    """Append equal-length value lists {column: values}; returns the row number of the first one"""
+    import numpy as np
+    os.makedirs(os.path.join(store, table), exist_ok=True)
+    first = _rows(store, table)
+    for column, kind in TABLES[table].items():
+        path = _file(store, table, column)
+        if os.path.exists(path) and os.path.getsize(path) > first * _itemsize(kind):
+            with open(path, 'r+b') as f:
+                f.truncate(first * _itemsize(kind))
+        values = columns[column]
+        if kind == 'text':
+            vocab_path = _file(store, table, column, '.vocab.json')
+            vocab = read_json(vocab_path, [])
+            codes = {v: i for i, v in enumerate(vocab)}
+            new = [v for v in dict.fromkeys(values) if v not in codes]
+            if new:
+                codes.update((v, len(vocab) + i) for i, v in enumerate(new))
+                atomic_write_json(vocab_path, vocab + new)  # before any code that refers to it
+            data = np.array([codes[v] for v in values], dtype='i4')
+        else:
+            data = np.asarray(values, dtype=kind)
+        with open(path, 'ab') as f:
+            f.write(data.tobytes())
+    return first
+
+
+def _read(store, table):
+    """(rows, {column: array}, {column: vocabulary array}) of a table; reads only rows added since the last call"""
+    import numpy as np
+    schema = TABLES[table]
+    table_dir = os.path.join(store, table)
+    if not os.path.isdir(table_dir):
+        return 0, {c: np.zeros(0, 'i4' if k == 'text' else k) for c, k in schema.items()}, \
+            {c: np.zeros(0, object) for c, k in schema.items() if k == 'text'}
+    generation = os.stat(table_dir).st_ino  # rebuild() swaps in a new folder
+    rows = _rows(store, table)
+    cached = _cache.get((store, table))
+    if cached and cached[0] == generation and cached[1] == rows:
+        return cached[1:]
+    start = cached[1] if cached and cached[0] == generation and cached[1] < rows else 0
+    columns = {}
+    for column, kind in schema.items():
+        dtype = np.dtype('i4' if kind == 'text' else kind)
+        tail = np.fromfile(_file(store, table, column), dtype=dtype, count=rows - start,
+                           offset=start * dtype.itemsize)
+        columns[column] = np.concatenate([cached[2][column], tail]) if start else tail
+    vocabs = {c: np.array(read_json(_file(store, table, c, '.vocab.json'), []), dtype=object)
+              for c, k in schema.items() if k == 'text'}
+    _cache[(store, table)] = (generation, rows, columns, vocabs)
+    return rows, columns, vocabs
+
+
+# ---------- Recording ----------
+
+def infeasibility_cause(DATA, time_model='total'):
+    """
+    Limit that rules an order out according to the quick quote: "time", "cost", "capacity" or
+    "machines" ('+'-joined when sections fail for different ones); "combined" when no single
+    limit does and only the limits together leave no plan.
+    """
+    from solver import quick_quote
+    quoted = quick_quote(DATA, time_model=time_model)
+    if quoted['verdict'] != 'infeasible':
+        return 'combined'
+    return '+'.join(sorted(set(quoted['causes'].values())))
+
+
+def _record(store, order_id, DATA, result, time_model, config_version, solved_at):
+    summary = (result or {}).get('summary')
+    nan = float('nan')
+    row = dict(order_id=order_id, solved_at=solved_at or time.time(), status='processed' if summary else 'failed',
+               cause='' if summary else infeasibility_cause(DATA, time_model), config_version=config_version or '',
+               time_model=time_model, num_tasks=int(DATA['p']), price=float(DATA['Cc']),
+               section=int(summary['chosen_section']) if summary else -1,
+               cost=float(summary['total_cost']) if summary else nan,
+               profit=float(summary['total_profit']) if summary else nan,
+               time=float(summary['time']) if summary else nan,
+               time_limit=float(DATA['T_desired']), cost_limit=float(DATA['C_desired']))
+    with _writer(store):
+        solve = _append(store, 'solves', {k: [v] for k, v in row.items()})
+        if summary:
+            loads = result['assignments'].groupby(['section_id', 'machine_id'], as_index=False).agg(
+                tasks=('task_id', 'size'), hours=('time', 'sum'), var_cost=('var_cost', 'sum'))
+            columns = {c: loads[c].tolist() for c in TABLES['machine_loads'] if c != 'solve'}
+            columns['solve'] = [solve] * len(loads)
+            _append(store, 'machine_loads', columns)
+    return solve
+
+
+def record(orders_dir, order_id, DATA, result=None, time_model='total', config_version=None, solved_at=None):
+    """
+    Append one solve of an order. `result` is the solver result (summary and assignments), or
+    None when the order was infeasible; the cause is then worked out from DATA.
+    Returns the solve's row number.
+    """
+    return _record(store_path(orders_dir), order_id, DATA, result, time_model, config_version, solved_at)
+
+
+def rebuild(orders_dir):
+    """
+    Regenerate the store from the order folders: the current solve of every processed or failed
+    order that has a config snapshot. Returns the number of solves recorded.
+    """
+    import pandas as pd
+    from order_pipeline import solver_settings
+    from solver import load_data_from_csv
+    store = store_path(orders_dir)
+    staging = store + '.new'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    solves = []
+    for order_id in os.listdir(orders_dir):
+        order_dir = os.path.join(orders_dir, order_id)
+        data_path = os.path.join(order_dir, 'customer_data.json')
+        customer_data = read_json(data_path) or {}
+        status = customer_data.get('status')
+        if status not in ('processed', 'failed') or not os.path.exists(os.path.join(order_dir, 'costs.csv')):
+            continue
+        if status == 'processed' and not os.path.exists(os.path.join(order_dir, 'solution_summary.json')):
+            continue
+        stamp = customer_data.get('processing_timestamp')
+        solved_at = (datetime.fromisoformat(stamp).timestamp() if status == 'processed' and stamp
+                     else os.path.getmtime(data_path))
+        solves.append((solved_at, order_id, status, customer_data.get('config_version')))
+
+    for solved_at, order_id, status, config_version in sorted(solves):
+        order_dir = os.path.join(orders_dir, order_id)
+        settings = solver_settings(order_dir)
+        result = None
+        if status == 'processed':
+            result = {'summary': read_json(os.path.join(order_dir, 'solution_summary.json')),
+                      'assignments': pd.read_csv(os.path.join(order_dir, 'solution_assignments.csv'))}
+        _record(staging, order_id, load_data_from_csv(order_dir), result, settings['time_model'],
+                config_version or settings['template_key'], solved_at)
+    with _writer(store):
+        retired = store + '.old'
+        shutil.rmtree(retired, ignore_errors=True)
+        if os.path.isdir(store):
+            os.rename(store, retired)
+        os.rename(staging, store)
+        shutil.rmtree(retired, ignore_errors=True)
+    return len(solves)
+
+
+# ---------- Aggregations ----------
+
+def _stamp(store):
+    return tuple((os.stat(os.path.join(store, table)).st_ino, _rows(store, table))
+                 if os.path.isdir(os.path.join(store, table)) else None for table in TABLES)
+
+
+def _cached(name, orders_dir, args, compute):
+    """Result of compute(), reused until a solve is recorded or the store is rebuilt"""
+    stamp = _stamp(store_path(orders_dir))
+    key = (name, orders_dir, args)
+    cached = _results.get(key)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    result = compute()
+    if len(_results) >= RESULTS_KEPT:
+        _results.clear()
+    _results[key] = (stamp, result)
+    return result
+
+
+def _current_solves(orders_dir, since=None, until=None):
+    """Solves table plus a mask of the latest solve of every order, limited to solved_at in [since, until)"""
+    import numpy as np
+    rows, solves, vocabs = _read(store_path(orders_dir), 'solves')
+    latest = np.zeros(rows, dtype=bool)
+    if rows:
+        _, last = np.unique(solves['order_id'][::-1], return_index=True)
+        latest[rows - 1 - last] = True
+    if since is not None:
+        latest &= solves['solved_at'] >= since
+    if until is not None:
+        latest &= solves['solved_at'] < until
+    return solves, vocabs, latest
+
+
+def _iso(seconds):
+    return datetime.fromtimestamp(float(seconds), timezone.utc).isoformat()
+
+
+def _stats(values):
+    import numpy as np
+    if not len(values):
+        return None
+    return dict(mean=round(float(values.mean()), 4),
+                **{f"p{q}": round(float(v), 4) for q, v in zip(PERCENTILES, np.percentile(values, PERCENTILES))})
+
+
+def utilization(orders_dir, bucket='day', since=None, until=None):
+    """
+    Machine utilization per time bucket (UTC) and machine from the reservation calendar: the hours
+    each machine is booked within the bucket (a booking spanning buckets is split between them),
+    that as a share of the bucket, and the orders booked on it; only bookings still in the calendar
+    count, i.e. none that had finished when the app last started. Per section, from the current
+    solves in [since, until): the machine hours of their plans and how close the orders run to
+    their time limits (tight: >= TIGHT_SHARE of the limit).
+    """
+    log = reservations.log_path(orders_dir)
+    calendar = (os.stat(log).st_ino, os.path.getsize(log)) if os.path.exists(log) else None
+    return _cached('utilization', orders_dir, (bucket, since, until, calendar),
+                   lambda: _utilization(orders_dir, bucket, since, until))
+
+
+def _booked_buckets(orders_dir, size, offset, since, until):
+    """{(bucket, section, machine): [booked seconds, {order ids}]} of the calendar's bookings within [since, until)"""
+    found = {}
+    for j, i, order_id, start, end, _ in reservations.booked(orders_dir, since, until):
+        start = start if since is None else max(start, since)
+        end = end if until is None else min(end, until)
+        for b in range(math.floor((start - offset) / size), math.ceil((end - offset) / size)):
+            seconds = min(end, (b + 1) * size + offset) - max(start, b * size + offset)
+            if seconds > 0:
+                entry = found.setdefault((b, j, i), [0.0, set()])
+                entry[0] += seconds
+                entry[1].add(order_id)
+    return found
+
+
+def _utilization(orders_dir, bucket, since, until):
+    import numpy as np
+    size = BUCKETS[bucket]
+    offset = WEEK_OFFSET if bucket == 'week' else 0
+    machines = [dict(start=_iso(b * size + offset), section_id=int(j), machine_id=int(i),
+                     hours=round(seconds / 3600, 4), share=round(seconds / size, 4), orders=len(orders))
+                for (b, j, i), (seconds, orders) in sorted(_booked_buckets(orders_dir, size, offset, since, until).items())]
+
+    solves, _, current = _current_solves(orders_dir, since, until)
+    processed = current & (solves['section'] >= 0)
+    _, loads, _ = _read(store_path(orders_dir), 'machine_loads')
+    keep = processed[loads['solve']]
+    section_id, hours = loads['section_id'][keep], loads['hours'][keep]
+
+    section = solves['section'][processed]
+    limit = solves['time_limit'][processed]
+    share = solves['time'][processed] / np.where(limit > 0, limit, np.nan)
+    sections = []
+    for j in np.unique(section):
+        mine = share[section == j]
+        sections.append(dict(section_id=int(j), orders=int(len(mine)), hours=round(float(hours[section_id == j].sum()), 4),
+                             mean_time_share=round(float(np.nanmean(mine)), 4) if np.isfinite(mine).any() else None,
+                             tight_orders=int((mine >= TIGHT_SHARE).sum())))
+    return dict(bucket=bucket, orders=int(processed.sum()), machines=machines, sections=sections)
+
+
+def profit_distribution(orders_dir, bins=10, since=None, until=None):
+    """Totals, percentiles and a margin histogram over the current plans of processed orders, overall and per section"""
+    return _cached('profit', orders_dir, (bins, since, until), lambda: _profit_distribution(orders_dir, bins, since, until))
+
+
+def _profit_distribution(orders_dir, bins, since, until):
+    import numpy as np
+    solves, _, current = _current_solves(orders_dir, since, until)
+    processed = current & (solves['section'] >= 0)
+    price, profit, section = solves['price'][processed], solves['profit'][processed], solves['section'][processed]
+    margin = profit / np.where(price > 0, price, np.nan)
+    margin_known = margin[np.isfinite(margin)]
+    counts, edges = np.histogram(margin_known, bins=bins) if len(margin_known) else (np.zeros(0), np.zeros(0))
+    sections = [dict(section_id=int(j), orders=int((section == j).sum()),
+                     profit=round(float(profit[section == j].sum()), 2),
+                     mean_margin=round(float(np.nanmean(margin[section == j])), 4)
+                     if np.isfinite(margin[section == j]).any() else None)
+                for j in np.unique(section)]
+    return dict(orders=int(processed.sum()), revenue=round(float(price.sum()), 2),
+                cost=round(float(solves['cost'][processed].sum()), 2), profit=round(float(profit.sum()), 2),
+                profit_stats=_stats(profit), margin_stats=_stats(margin_known),
+                margin_histogram=dict(edges=[round(float(e), 4) for e in edges], counts=[int(c) for c in counts]),
+                sections=sections)
+
+
+def infeasibility(orders_dir, since=None, until=None):
+    """Share of orders whose current solve failed, by cause, and how often each limit is involved"""
+    return _cached('infeasibility', orders_dir, (since, until), lambda: _infeasibility(orders_dir, since, until))
+
+
+def _infeasibility(orders_dir, since, until):
+    import numpy as np
+    solves, vocabs, current = _current_solves(orders_dir, since, until)
+    failed = current & (solves['section'] < 0)
+    codes, counts = np.unique(solves['cause'][failed], return_counts=True)
+    causes = [dict(cause=str(vocabs['cause'][c]), orders=int(n), share=round(float(n) / int(failed.sum()), 4))
+              for c, n in sorted(zip(codes, counts), key=lambda cn: -cn[1])]
+    limits = {}
+    for cause in causes:
+        for limit in cause['cause'].split('+'):
+            limits[limit] = limits.get(limit, 0) + cause['orders']
+    total = int(current.sum())
+    return dict(orders=total, failed=int(failed.sum()), rate=round(float(failed.sum()) / total, 4) if total else None,
+                causes=causes, limits=limits)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--orders', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'orders'),
+                        help='Orders folder (default: ./orders)')
+    parser.add_argument('--rebuild', action='store_true', help='Regenerate the store from the order folders first')
+    args = parser.parse_args()
+    if args.rebuild:
+        started = time.perf_counter()
+        print(f"Recorded {rebuild(args.orders)} solve(s) in {time.perf_counter() - started:.2f}s")
+    print(json.dumps({'profit': profit_distribution(args.orders), 'infeasibility': infeasibility(args.orders)},
+                     indent=2))
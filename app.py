@@ -5,32 +5,201 @@ Flask web application for Manufacturing Order Management System
 """
 import os
 import json
+import csv
 import uuid
+import hashlib
+import threading
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from werkzeug.utils import secure_filename
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
-import pandas as pd
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory, make_response, Response, stream_with_context
 
-from solver import load_data_from_csv, solve_two_stage_order_price
+import analytics
+import events
+import reservations
+from config_store import pin, publish, load_settings, version_dir
+from order_store import (atomic_write_json, atomic_write_rows, read_json,
+                         journal_begin, journal_commit, recover)
+from order_pipeline import run_order, run_frontier, update_order_status, quote
+from results_view import assignments_page
+from reoptimize import find_affected_orders, reoptimize_orders
+from blob_store import ingest, open_path
+from plant_import import PlantImportError, import_plant, read_uploads
+from uploads import UploadError, save_upload, write_chunk, received_bytes, uploaded_sha256
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)  # For flash messages
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024  # 100MB max upload
+app.config['MAX_UPLOAD_FILE_SIZE'] = 2 * 1024 * 1024 * 1024  # 2GB per file via chunked uploads
 
 # Directories
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 ORDERS_DIR = os.path.join(BASE_DIR, "orders")
+BLOBS_DIR = os.path.join(BASE_DIR, "blobs")  # content-addressed store for uploaded files
 MANUFACTURER_DATA_DIR = os.path.join(BASE_DIR, "data")
+API_MAX_BATCH = 100      # orders per POST /api/orders
+API_MAX_PAGE_SIZE = 500  # orders per page of GET /api/orders
+FRONTIER_MAX_POINTS = 20
+RESERVATIONS_DEFAULT_DAYS = 7  # window of GET /api/reservations without ?until=
 ALLOWED_EXTENSIONS = {'pdf', 'dwg', 'dxf', 'step', 'stp', 'igs', 'iges', 'stl', 'jpg', 'png', 'zip', 'rar'}
 
 os.makedirs(ORDERS_DIR, exist_ok=True)
+os.makedirs(BLOBS_DIR, exist_ok=True)
 os.makedirs(MANUFACTURER_DATA_DIR, exist_ok=True)
 
+# Order ids being submitted right now; customer_data.json only appears once the solve is done
+_claimed_orders = set()
+_claims_lock = threading.Lock()
+
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def _collect_uploads(order_dir, files, uploaded_names, file_hashes):
+    """
+    Save multipart `files` and accept completed chunked uploads listed in `uploaded_names`;
+    every file is then moved into the blob store (duplicates of stored content are dropped)
+    """
+    filenames = []
+    for file in files:
+        if file and allowed_file(file.filename):
+            filename = secure_filename(file.filename)
+            saved = save_upload(file, order_dir, filename, app.config['MAX_UPLOAD_FILE_SIZE'])
+            file_hashes[filename] = saved['sha256']
+            filenames.append(filename)
+    for name in uploaded_names:
+        filename = secure_filename(name)
+        if allowed_file(filename) and os.path.isfile(os.path.join(order_dir, filename)):
+            file_hashes[filename] = uploaded_sha256(order_dir, filename)
+            filenames.append(filename)
+    for filename in filenames:
+        if os.path.isfile(os.path.join(order_dir, filename)):
+            ingest(BLOBS_DIR, order_dir, filename, file_hashes[filename])
+    return filenames
+
+
+def _load_mfg_config():
+    """
+    Pin the live manufacturer configuration: returns (config.json dict, config folder).
+    Everything for one order is read from that folder, so a concurrent config save
+    cannot hand it a mix of old and new tables.
+    """
+    _, config_dir = pin(MANUFACTURER_DATA_DIR)
+    return load_settings(config_dir), config_dir
+
+
+def _validate_new_order(num_tasks_requested, mfg_config, config_dir):
+    """Return an error message if the order cannot be accepted, else None"""
+    max_tasks = mfg_config.get('max_tasks', 10)
+    
+    # Validate task count
+    if num_tasks_requested > max_tasks:
+        return f'Error: Number of tasks ({num_tasks_requested}) exceeds manufacturer capacity ({max_tasks}). Please reduce the number of parts.'
+    
+    # Check if manufacturer configuration exists
+    if not all([os.path.exists(os.path.join(config_dir, f)) 
+               for f in ['sections.csv', 'machines.csv', 'costs.csv']]):
+        return 'Error: Manufacturer has not configured the system yet. Please contact the manufacturer.'
+    return None
+
+
+def _claim_order(order_id):
+    """Reserve an order id for one submission; False if the order exists or is being submitted"""
+    with _claims_lock:
+        if order_id in _claimed_orders or os.path.exists(os.path.join(ORDERS_DIR, order_id, 'customer_data.json')):
+            return False
+        _claimed_orders.add(order_id)
+        return True
+
+
+def _release_order(order_id):
+    with _claims_lock:
+        _claimed_orders.discard(order_id)
+
+
+def _order_listing_row(customer_data):
+    return {k: customer_data.get(k) for k in ('order_id', 'status', 'customer_name', 'num_cad_files',
+                                              'offered_price', 'desired_delivery_time', 'submission_timestamp')}
+
+
+def _register_order(order_id, order_dir, fields, num_tasks_requested, cad_filenames, doc_filenames,
+                    file_hashes, mfg_config):
+    """
+    Write params.csv and journal a new order; `fields` is a form or JSON mapping.
+    customer_data.json is written once, with the final status, by _optimize_new_order;
+    until then the journal record is what survives a crash.
+    """
+    customer_data = {
+        'order_id': order_id,
+        'customer_name': fields.get('customer_name'),
+        'num_cad_files': num_tasks_requested,
+        'product_description': fields.get('product_description'),
+        'quantity': fields.get('quantity'),
+        'desired_delivery_time': float(fields.get('desired_delivery_time')),
+        'offered_price': float(fields.get('offered_price')),
+        'material_specs': fields.get('material_specs'),
+        'surface_finish': fields.get('surface_finish'),
+        'testing_requirements': fields.get('testing_requirements'),
+        'certifications': fields.get('certifications'),
+        'nda_confirmed': fields.get('nda_confirmed') in ('on', True, 'true'),
+        'special_instructions': fields.get('special_instructions'),
+        'cad_files': cad_filenames,
+        'additional_docs': doc_filenames,
+        'file_hashes': file_hashes,
+        'config_version': mfg_config.get('version'),
+        'submission_timestamp': datetime.now().isoformat(),
+        'status': 'processing'
+    }
+    
+    # Load default cost limit from manufacturer config
+    default_cost_limit = mfg_config.get('default_cost_limit', 999999)
+    
+    # Create params.csv for this order
+    atomic_write_rows(os.path.join(order_dir, 'params.csv'), ["param", "value"], [
+        {"param": "num_tasks_p", "value": num_tasks_requested},
+        {"param": "order_price_Cc", "value": customer_data['offered_price']},
+        {"param": "time_limit_Tdesired", "value": customer_data['desired_delivery_time']},
+        {"param": "cost_limit_Cdesired", "value": default_cost_limit}
+    ])
+    journal_begin(ORDERS_DIR, order_id, customer_data)
+    listing = _order_listing_row(customer_data)
+    events.publish(order_id, 'queued', **{k: v for k, v in listing.items() if k not in ('order_id', 'status')})
+    return customer_data
+
+
+def _optimize_new_order(order_id, order_dir, customer_data, config_dir):
+    """Run the optimization for a freshly registered order and record processed/failed"""
+    try:
+        result = run_order(order_dir, config_dir, precheck=True)
+        
+        # Update status to processed
+        customer_data['status'] = 'processed'
+        customer_data['processing_timestamp'] = datetime.now().isoformat()
+        customer_data.pop('error_message', None)
+        customer_data.pop('error_details', None)
+        atomic_write_json(os.path.join(order_dir, 'customer_data.json'), customer_data)
+        journal_commit(ORDERS_DIR, order_id, 'processed')
+        
+        events.publish(order_id, 'processed', elapsed=result['elapsed'])
+        print(f"✅ Order {order_id} processed successfully!")
+            
+    except Exception as opt_error:
+        # If optimization fails, mark as failed but still save the order
+        import traceback
+        error_details = f"{str(opt_error)}\n\nTraceback:\n{traceback.format_exc()}"
+        print(f"❌ Optimization failed for order {order_id}:")
+        print(error_details)
+        
+        customer_data['status'] = 'failed'
+        customer_data['error_message'] = str(opt_error)
+        customer_data['error_details'] = error_details
+        atomic_write_json(os.path.join(order_dir, 'customer_data.json'), customer_data)
+        journal_commit(ORDERS_DIR, order_id, 'failed')
+        events.publish(order_id, 'failed', error=str(opt_error))
+    return customer_data
+
+
 # ==================== CUSTOMER PORTAL ====================
 
 @app.route('/')
@@ -39,14 +208,13 @@ def index():
     # Load manufacturer config to show compatible constraints
     config_info = {}
     try:
-        if os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, 'config.json')):
-            with open(os.path.join(MANUFACTURER_DATA_DIR, 'config.json'), 'r') as f:
-                mfg_config = json.load(f)
-                config_info = {
-                    'max_tasks': mfg_config.get('max_tasks', 10),
-                    'num_sections': mfg_config.get('num_sections', 3),
-                    'cost_limit': mfg_config.get('default_cost_limit', 999999)
-                }
+        mfg_config, config_dir = _load_mfg_config()
+        if os.path.exists(os.path.join(config_dir, 'config.json')):
+            config_info = {
+                'max_tasks': mfg_config.get('max_tasks', 10),
+                'num_sections': mfg_config.get('num_sections', 3),
+                'cost_limit': mfg_config.get('default_cost_limit', 999999)
+            }
     except:
         # Use defaults if config doesn't exist
         config_info = {
@@ -64,157 +232,31 @@ def submit_order():
     try:
         # Validate against manufacturer configuration
         num_tasks_requested = int(request.form.get('num_cad_files', 0))
-        
-        # Load manufacturer config for validation
-        mfg_config = {}
-        if os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, 'config.json')):
-            with open(os.path.join(MANUFACTURER_DATA_DIR, 'config.json'), 'r') as f:
-                mfg_config = json.load(f)
-        
-        max_tasks = mfg_config.get('max_tasks', 10)
-        
-        # Validate task count
-        if num_tasks_requested > max_tasks:
-            flash(f'Error: Number of tasks ({num_tasks_requested}) exceeds manufacturer capacity ({max_tasks}). Please reduce the number of parts.', 'error')
-            return redirect(url_for('index'))
-        
-        # Check if manufacturer configuration exists
-        if not all([os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, f)) 
-                   for f in ['sections.csv', 'machines.csv', 'costs.csv']]):
-            flash('Error: Manufacturer has not configured the system yet. Please contact the manufacturer.', 'error')
+        mfg_config, config_dir = _load_mfg_config()
+        error = _validate_new_order(num_tasks_requested, mfg_config, config_dir)
+        if error:
+            flash(error, 'error')
             return redirect(url_for('index'))
         
         # Generate unique order ID
-        order_id = request.form.get('order_id') or f"ORD-{uuid.uuid4().hex[:8].upper()}"
+        order_id = secure_filename(request.form.get('order_id') or '') or f"ORD-{uuid.uuid4().hex[:8].upper()}"
         order_dir = os.path.join(ORDERS_DIR, order_id)
         os.makedirs(order_dir, exist_ok=True)
         
-        # Save uploaded CAD files
-        cad_files = request.files.getlist('cad_files')
-        cad_filenames = []
-        for file in cad_files:
-            if file and allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-                file.save(os.path.join(order_dir, filename))
-                cad_filenames.append(filename)
-        
-        # Save additional documents
-        docs = request.files.getlist('additional_docs')
-        doc_filenames = []
-        for doc in docs:
-            if doc and allowed_file(doc.filename):
-                filename = secure_filename(doc.filename)
-                doc.save(os.path.join(order_dir, filename))
-                doc_filenames.append(filename)
+        # Save uploaded files (streamed in chunks, hashed on the fly) and pick up
+        # files that already arrived through the chunked upload endpoint
+        file_hashes = {}
+        cad_filenames = _collect_uploads(order_dir, request.files.getlist('cad_files'),
+                                         request.form.getlist('uploaded_cad_files'), file_hashes)
+        doc_filenames = _collect_uploads(order_dir, request.files.getlist('additional_docs'),
+                                         request.form.getlist('uploaded_additional_docs'), file_hashes)
         
         # Collect customer data
-        customer_data = {
-            'order_id': order_id,
-            'customer_name': request.form.get('customer_name'),
-            'num_cad_files': num_tasks_requested,
-            'product_description': request.form.get('product_description'),
-            'quantity': request.form.get('quantity'),
-            'desired_delivery_time': float(request.form.get('desired_delivery_time')),
-            'offered_price': float(request.form.get('offered_price')),
-            'material_specs': request.form.get('material_specs'),
-            'surface_finish': request.form.get('surface_finish'),
-            'testing_requirements': request.form.get('testing_requirements'),
-            'certifications': request.form.get('certifications'),
-            'nda_confirmed': request.form.get('nda_confirmed') == 'on',
-            'special_instructions': request.form.get('special_instructions'),
-            'cad_files': cad_filenames,
-            'additional_docs': doc_filenames,
-            'submission_timestamp': datetime.now().isoformat(),
-            'status': 'processing'
-        }
-        
-        # Save customer data as JSON
-        with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
-            json.dump(customer_data, f, indent=2)
-        
-        # Load default cost limit from manufacturer config
-        default_cost_limit = mfg_config.get('default_cost_limit', 999999)
-        
-        # Create params.csv for this order
-        params_df = pd.DataFrame([
-            {"param": "num_tasks_p", "value": num_tasks_requested},
-            {"param": "order_price_Cc", "value": customer_data['offered_price']},
-            {"param": "time_limit_Tdesired", "value": customer_data['desired_delivery_time']},
-            {"param": "cost_limit_Cdesired", "value": default_cost_limit}
-        ])
-        params_df.to_csv(os.path.join(order_dir, 'params.csv'), index=False)
+        customer_data = _register_order(order_id, order_dir, request.form, num_tasks_requested,
+                                        cad_filenames, doc_filenames, file_hashes, mfg_config)
         
         # AUTOMATICALLY RUN OPTIMIZATION
-        try:
-            # Copy manufacturer data to order folder
-            for filename in ['sections.csv', 'machines.csv', 'costs.csv', 'times.csv']:
-                src = os.path.join(MANUFACTURER_DATA_DIR, filename)
-                dst = os.path.join(order_dir, filename)
-                if os.path.exists(src):
-                    pd.read_csv(src).to_csv(dst, index=False)
-            
-            # Run optimization
-            print(f"Loading data for order {order_id}...")
-            DATA = load_data_from_csv(order_dir)
-            print(f"Running solver for {DATA['p']} tasks...")
-            result = solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False)
-            
-            # Debug output
-            print(f"Solver result type: {type(result)}")
-            print(f"Solver result keys: {list(result.keys()) if isinstance(result, dict) else 'N/A'}")
-            
-            # Check if result is valid
-            if result is None:
-                raise ValueError("Solver returned None. Check optimization constraints.")
-            if not isinstance(result, dict):
-                raise ValueError(f"Solver returned {type(result)} instead of dict.")
-            
-            # Check if optimization was infeasible
-            if 'summary' not in result:
-                # Solver returned early due to infeasibility
-                status = result.get('status1', 'Unknown')
-                note = result.get('note', 'No details provided')
-                
-                error_msg = f"Optimization infeasible (Status: {status}). "
-                if 'Infeasible' in status:
-                    error_msg += f"Cannot satisfy constraints with current parameters. "
-                    error_msg += f"Try: increasing cost limit (current: {DATA['C_desired']}), "
-                    error_msg += f"increasing time limit (current: {DATA['T_desired']}), "
-                    error_msg += f"or reducing offered price (current: {DATA['Cc']})."
-                else:
-                    error_msg += f"Details: {note}"
-                
-                raise ValueError(error_msg)
-            
-            if 'assignments' not in result:
-                raise ValueError(f"Solver result missing 'assignments' key. Keys present: {list(result.keys())}")
-            
-            # Save results
-            with open(os.path.join(order_dir, 'solution_summary.json'), 'w') as f:
-                json.dump(result['summary'], f, indent=2)
-            
-            result['assignments'].to_csv(os.path.join(order_dir, 'solution_assignments.csv'), index=False)
-            
-            # Update status to processed
-            customer_data['status'] = 'processed'
-            customer_data['processing_timestamp'] = datetime.now().isoformat()
-            with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
-                json.dump(customer_data, f, indent=2)
-            
-            print(f"✅ Order {order_id} processed successfully!")
-                
-        except Exception as opt_error:
-            # If optimization fails, mark as failed but still save the order
-            import traceback
-            error_details = f"{str(opt_error)}\n\nTraceback:\n{traceback.format_exc()}"
-            print(f"❌ Optimization failed for order {order_id}:")
-            print(error_details)
-            
-            customer_data['status'] = 'failed'
-            customer_data['error_message'] = str(opt_error)
-            customer_data['error_details'] = error_details
-            with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
-                json.dump(customer_data, f, indent=2)
+        _optimize_new_order(order_id, order_dir, customer_data, config_dir)
         
         flash(f'Order {order_id} submitted successfully!', 'success')
         return render_template('customer_success.html', order_id=order_id)
@@ -224,6 +266,81 @@ def submit_order():
         return redirect(url_for('index'))
 
 
+@app.route('/quote')
+def quick_quote_check():
+    """
+    Live check of the order form: ?num_cad_files=&desired_delivery_time=&offered_price=
+    Answers from the relaxation bounds in milliseconds (no optimization run)
+    """
+    try:
+        num_tasks = int(request.args.get('num_cad_files', 0))
+        delivery_time = float(request.args.get('desired_delivery_time'))
+        offered_price = float(request.args.get('offered_price'))
+    except (TypeError, ValueError):
+        return jsonify({'verdict': 'unknown', 'message': ''})
+    
+    mfg_config, config_dir = _load_mfg_config()
+    error = _validate_new_order(num_tasks, mfg_config, config_dir) if num_tasks > 0 else 'Enter the number of parts.'
+    if error:
+        return jsonify({'verdict': 'infeasible', 'message': error})
+    quoted = quote(config_dir, num_tasks, offered_price, delivery_time,
+                   mfg_config.get('default_cost_limit', 999999), mfg_config.get('time_model', 'total'), ORDERS_DIR)
+    
+    if quoted['verdict'] == 'infeasible':
+        message = 'This order cannot be scheduled as specified. Try a later delivery time or fewer parts.'
+    elif quoted['upper_bound'] is not None and quoted['upper_bound'] < 0:
+        message = 'The offered price is below our production cost for this order. Consider a higher price.'
+    elif quoted['verdict'] == 'feasible':
+        message = 'Delivery time and price look achievable. Submit to get a confirmed schedule.'
+    else:
+        message = 'Your order will be checked in detail on submission.'
+    return jsonify({'verdict': quoted['verdict'], 'message': message})
+
+
+@app.route('/upload/start', methods=['POST'])
+def start_upload():
+    """Reserve an order folder for chunked uploads ahead of the order form submission"""
+    order_id = secure_filename(request.form.get('order_id') or '') or f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    if os.path.exists(os.path.join(ORDERS_DIR, order_id, 'customer_data.json')):
+        return jsonify({'error': f'Order {order_id} already exists'}), 409
+    os.makedirs(os.path.join(ORDERS_DIR, order_id), exist_ok=True)
+    return jsonify({'order_id': order_id, 'chunk_size': 8 * 1024 * 1024})
+
+
+@app.route('/upload/<order_id>/<filename>', methods=['GET', 'POST'])
+def upload_chunk(order_id, filename):
+    """
+    Resumable chunked upload of one file: POST raw bytes with
+    'Content-Range: bytes <start>-<end>/<total>'; GET returns how many bytes have arrived.
+    """
+    order_id, filename = secure_filename(order_id), secure_filename(filename)
+    order_dir = os.path.join(ORDERS_DIR, order_id)
+    if not order_id or not allowed_file(filename) or not os.path.isdir(order_dir):
+        return jsonify({'error': 'Unknown order or file type not allowed'}), 404
+    if os.path.exists(os.path.join(order_dir, 'customer_data.json')):
+        return jsonify({'error': f'Order {order_id} was already submitted'}), 409
+    
+    if request.method == 'GET':
+        return jsonify({'filename': filename, 'received': received_bytes(order_dir, filename)})
+    
+    try:
+        units, _, byte_range = request.headers.get('Content-Range', '').partition(' ')
+        span, _, total = byte_range.partition('/')
+        start = int(span.split('-')[0])
+        total = int(total)
+        if units != 'bytes':
+            raise ValueError
+    except ValueError:
+        return jsonify({'error': 'Content-Range header "bytes <start>-<end>/<total>" required'}), 400
+    
+    try:
+        state = write_chunk(order_dir, filename, request.stream, start, total,
+                            app.config['MAX_UPLOAD_FILE_SIZE'])
+    except UploadError as e:
+        return jsonify({'error': str(e), 'received': received_bytes(order_dir, filename)}), 416
+    return jsonify({'filename': filename, **state})
+
+
 # ==================== ADMIN PORTAL ====================
 
 @app.route('/admin')
@@ -233,24 +350,36 @@ def admin_dashboard():
     orders = []
     if os.path.exists(ORDERS_DIR):
         for order_id in os.listdir(ORDERS_DIR):
-            order_path = os.path.join(ORDERS_DIR, order_id, 'customer_data.json')
-            if os.path.exists(order_path):
-                with open(order_path, 'r') as f:
-                    order_data = json.load(f)
-                    orders.append(order_data)
+            order_data = read_json(os.path.join(ORDERS_DIR, order_id, 'customer_data.json'))
+            if order_data:
+                orders.append(order_data)
     
     # Load current manufacturer config if exists
+    config_version, config_dir = pin(MANUFACTURER_DATA_DIR)
     config_exists = all([
-        os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, f))
+        os.path.exists(os.path.join(config_dir, f))
         for f in ['sections.csv', 'machines.csv', 'costs.csv']
     ])
     
-    return render_template('admin_dashboard.html', orders=orders, config_exists=config_exists)
+    return render_template('admin_dashboard.html', orders=orders, config_exists=config_exists,
+                           config_version=config_version)
+
+
+@app.route('/admin/events')
+def order_events():
+    """Server-sent event stream of order status transitions for the dashboard"""
+    try:
+        last_id = int(request.headers.get('Last-Event-ID') or request.args.get('last_id') or 0)
+    except ValueError:
+        last_id = 0
+    return Response(stream_with_context(events.stream(last_id)), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @app.route('/admin/config', methods=['GET', 'POST'])
 def admin_config():
     """Manage manufacturer configuration with dynamic form inputs"""
+    import pandas as pd
     if request.method == 'POST':
         try:
             # Get dynamic structure configuration
@@ -273,7 +402,6 @@ def admin_config():
                     "output_score_optional": float(output_score) if output_score else None
                 })
             sections_df = pd.DataFrame(sections_data)
-            sections_df.to_csv(os.path.join(MANUFACTURER_DATA_DIR, 'sections.csv'), index=False)
             
             # Build machines data from dynamic form
             machines_data = []
@@ -293,7 +421,6 @@ def admin_config():
                     base_costs[(section_id, machine_id)] = float(request.form.get(f'machine_{machine_key}_cost'))
             
             machines_df = pd.DataFrame(machines_data)
-            machines_df.to_csv(os.path.join(MANUFACTURER_DATA_DIR, 'machines.csv'), index=False)
             
             # Build costs data - auto-generate for all tasks with small variations
             costs_data = []
@@ -309,12 +436,9 @@ def admin_config():
                     })
             
             costs_df = pd.DataFrame(costs_data)
-            costs_df.to_csv(os.path.join(MANUFACTURER_DATA_DIR, 'costs.csv'), index=False)
             
             # Create empty times.csv
-            pd.DataFrame(columns=["section_id", "machine_id", "task_id", "time_per_task"]).to_csv(
-                os.path.join(MANUFACTURER_DATA_DIR, 'times.csv'), index=False
-            )
+            times_df = pd.DataFrame(columns=["section_id", "machine_id", "task_id", "time_per_task"])
             
             # Save configuration metadata
             config_data = {
@@ -322,12 +446,24 @@ def admin_config():
                 'max_tasks': max_tasks,
                 'num_sections': num_sections,
                 'machines_per_section': machines_per_section,
+                'time_model': 'makespan' if request.form.get('time_model') == 'makespan' else 'total',
+                'engine': request.form.get('engine') if request.form.get('engine') in ('exact', 'heuristic') else 'auto',
+                'time_budget': float(request.form.get('time_budget') or 30),
+                'section_branching': (request.form.get('section_branching')
+                                      if request.form.get('section_branching') in ('sos1', 'priority', 'both') else 'none'),
+                'sensitivity': request.form.get('sensitivity') == 'on',
                 'last_updated': datetime.now().isoformat()
             }
-            with open(os.path.join(MANUFACTURER_DATA_DIR, 'config.json'), 'w') as f:
-                json.dump(config_data, f, indent=2)
             
-            flash('Manufacturer configuration saved successfully! This will be used for all new orders.', 'success')
+            # Publish all tables as one new version (orders in flight keep the version they pinned)
+            version = publish(MANUFACTURER_DATA_DIR, {
+                'sections.csv': sections_df,
+                'machines.csv': machines_df,
+                'costs.csv': costs_df,
+                'times.csv': times_df,
+            }, config_data)
+            
+            flash(f'Manufacturer configuration saved as version {version}! This will be used for all new orders.', 'success')
             return redirect(url_for('admin_dashboard'))
             
         except Exception as e:
@@ -337,27 +473,28 @@ def admin_config():
     
     # Load existing config if available
     config = {}
+    _, config_dir = pin(MANUFACTURER_DATA_DIR)
     try:
-        if os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, 'sections.csv')):
-            config['sections'] = pd.read_csv(os.path.join(MANUFACTURER_DATA_DIR, 'sections.csv')).to_dict('records')
-        if os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, 'machines.csv')):
-            machines_df = pd.read_csv(os.path.join(MANUFACTURER_DATA_DIR, 'machines.csv'))
+        if os.path.exists(os.path.join(config_dir, 'sections.csv')):
+            config['sections'] = pd.read_csv(os.path.join(config_dir, 'sections.csv')).to_dict('records')
+        if os.path.exists(os.path.join(config_dir, 'machines.csv')):
+            machines_df = pd.read_csv(os.path.join(config_dir, 'machines.csv'))
             config['machines'] = machines_df.to_dict('records')
             # Create indexed machine dict for easy lookup in template
             config['machines_dict'] = {}
             for _, row in machines_df.iterrows():
                 key = f"{int(row['section_id'])},{int(row['machine_id'])}"
                 config['machines_dict'][key] = row.to_dict()
-        if os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, 'costs.csv')):
-            costs_df = pd.read_csv(os.path.join(MANUFACTURER_DATA_DIR, 'costs.csv'))
+        if os.path.exists(os.path.join(config_dir, 'costs.csv')):
+            costs_df = pd.read_csv(os.path.join(config_dir, 'costs.csv'))
             config['costs'] = costs_df.to_dict('records')
             # Get base costs (from task 1 for each machine)
             config['base_costs'] = {}
             for _, row in costs_df[costs_df['task_id'] == 1].iterrows():
                 key = f"{int(row['section_id'])},{int(row['machine_id'])}"
                 config['base_costs'][key] = row['variable_cost']
-        if os.path.exists(os.path.join(MANUFACTURER_DATA_DIR, 'config.json')):
-            with open(os.path.join(MANUFACTURER_DATA_DIR, 'config.json'), 'r') as f:
+        if os.path.exists(os.path.join(config_dir, 'config.json')):
+            with open(os.path.join(config_dir, 'config.json'), 'r') as f:
                 settings = json.load(f)
                 config['settings'] = settings
                 # Extract structure info for form generation
@@ -373,6 +510,32 @@ def admin_config():
     return render_template('admin_config_dynamic.html', config=config)
 
 
+def _import_plant_upload():
+    """Publish the plant tables uploaded with the request; returns the new version or raises PlantImportError"""
+    max_tasks = request.form.get('max_tasks')
+    try:
+        max_tasks = int(max_tasks) if max_tasks else None
+    except ValueError:
+        raise PlantImportError(['max_tasks must be a whole number'])
+    mfg_config, _ = _load_mfg_config()
+    tables, errors = read_uploads(request.files)
+    return import_plant(MANUFACTURER_DATA_DIR, tables, mfg_config, max_tasks, errors)
+
+
+@app.route('/admin/config/import', methods=['POST'])
+def admin_config_import():
+    """Bulk import: publish sections / machines / costs / times tables uploaded as CSV or Parquet"""
+    try:
+        version = _import_plant_upload()
+    except PlantImportError as e:
+        flash(f'Import rejected: {e}', 'error')
+        for error in e.errors:
+            flash(error, 'error')
+        return redirect(url_for('admin_config'))
+    flash(f'Plant configuration imported as version {version}! This will be used for all new orders.', 'success')
+    return redirect(url_for('admin_dashboard'))
+
+
 @app.route('/admin/process_order/<order_id>', methods=['POST'])
 def process_order(order_id):
     """Run optimization for a specific order"""
@@ -383,34 +546,26 @@ def process_order(order_id):
         cost_limit = request.form.get('cost_limit')
         if cost_limit:
             params_path = os.path.join(order_dir, 'params.csv')
-            params_df = pd.read_csv(params_path)
-            params_df.loc[params_df['param'] == 'cost_limit_Cdesired', 'value'] = float(cost_limit)
-            params_df.to_csv(params_path, index=False)
-        
-        # Copy manufacturer data to order folder
-        for filename in ['sections.csv', 'machines.csv', 'costs.csv', 'times.csv']:
-            src = os.path.join(MANUFACTURER_DATA_DIR, filename)
-            dst = os.path.join(order_dir, filename)
-            if os.path.exists(src):
-                pd.read_csv(src).to_csv(dst, index=False)
-        
-        # Load data and run solver
-        DATA = load_data_from_csv(order_dir)
-        result = solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False)
-        
-        # Save results
-        with open(os.path.join(order_dir, 'solution_summary.json'), 'w') as f:
-            json.dump(result['summary'], f, indent=2)
+            with open(params_path, newline='') as f:
+                params = list(csv.DictReader(f))
+            for row in params:
+                if row['param'] == 'cost_limit_Cdesired':
+                    row['value'] = float(cost_limit)
+            atomic_write_rows(params_path, ['param', 'value'], params)
         
-        result['assignments'].to_csv(os.path.join(order_dir, 'solution_assignments.csv'), index=False)
-        
-        # Update order status
-        with open(os.path.join(order_dir, 'customer_data.json'), 'r') as f:
-            customer_data = json.load(f)
-        customer_data['status'] = 'processed'
-        customer_data['processing_timestamp'] = datetime.now().isoformat()
-        with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
-            json.dump(customer_data, f, indent=2)
+        # Load data and run solver (a failed re-run leaves the previous status in place)
+        journal_begin(ORDERS_DIR, order_id)
+        outcome = 'unchanged'
+        try:
+            config_version, config_dir = pin(MANUFACTURER_DATA_DIR)
+            options = {'sensitivity': True} if request.form.get('sensitivity') else {}
+            run_order(order_dir, config_dir, **options)
+            
+            # Update order status
+            update_order_status(order_dir, 'processed', config_version=config_version)
+            outcome = 'processed'
+        finally:
+            journal_commit(ORDERS_DIR, order_id, outcome)
         
         flash(f'Order {order_id} processed successfully!', 'success')
         return redirect(url_for('view_results', order_id=order_id))
@@ -420,6 +575,36 @@ def process_order(order_id):
         return redirect(url_for('admin_dashboard'))
 
 
+@app.route('/admin/reoptimize', methods=['POST'])
+def reoptimize_affected():
+    """Re-solve only the orders affected by the current manufacturer configuration"""
+    try:
+        affected = [order_id for order_id, _ in find_affected_orders(ORDERS_DIR, MANUFACTURER_DATA_DIR)]
+        if not affected:
+            flash('No orders are affected by the current configuration.', 'success')
+            return redirect(url_for('admin_dashboard'))
+        
+        report = reoptimize_orders(ORDERS_DIR, MANUFACTURER_DATA_DIR, affected)
+        failed = [r['order_id'] for r in report if r['status'] == 'failed']
+        flash(f'Re-optimized {len(report)} affected order(s): {len(report) - len(failed)} processed, '
+              f'{len(failed)} failed.', 'error' if failed else 'success')
+    except Exception as e:
+        flash(f'Error re-optimizing orders: {str(e)}', 'error')
+    return redirect(url_for('admin_dashboard'))
+
+
+@app.route('/admin/frontier/<order_id>', methods=['POST'])
+def compute_frontier(order_id):
+    """Compute the profit vs. lead-time frontier of an order for quoting faster alternatives"""
+    try:
+        points = min(max(int(request.form.get('points', 5)), 2), FRONTIER_MAX_POINTS)
+        frontier = run_frontier(os.path.join(ORDERS_DIR, secure_filename(order_id)), points)
+        flash(f'Computed {len(frontier)} Pareto-optimal profit / lead-time point(s).', 'success')
+    except Exception as e:
+        flash(f'Error computing frontier: {str(e)}', 'error')
+    return redirect(url_for('view_results', order_id=order_id))
+
+
 @app.route('/admin/results/<order_id>')
 def view_results(order_id):
     """View optimization results for an order"""
@@ -434,29 +619,330 @@ def view_results(order_id):
     assignments = None
     summary_path = os.path.join(order_dir, 'solution_summary.json')
     assignments_path = os.path.join(order_dir, 'solution_assignments.csv')
+    frontier_path = os.path.join(order_dir, 'solution_frontier.csv')
     
     if os.path.exists(summary_path):
         with open(summary_path, 'r') as f:
             solution = json.load(f)
     
     if os.path.exists(assignments_path):
-        assignments = pd.read_csv(assignments_path).to_dict('records')
+        # Paged and sorted server side from a cached parse of the CSV
+        try:
+            page = int(request.args.get('page', 1))
+            per_page = min(max(int(request.args.get('per_page', 100)), 1), 1000)
+        except ValueError:
+            page, per_page = 1, 100
+        assignments = assignments_page(assignments_path, page, per_page,
+                                       sort=request.args.get('sort', 'task_id'),
+                                       descending=request.args.get('order') == 'desc')
+    
+    frontier = None
+    if os.path.exists(frontier_path):
+        import pandas as pd
+        frontier = pd.read_csv(frontier_path).to_dict('records')
     
     return render_template('admin_results.html', 
                          order_id=order_id,
                          customer_data=customer_data,
                          solution=solution,
-                         assignments=assignments)
+                         assignments=assignments,
+                         frontier=frontier,
+                         frontier_max_points=FRONTIER_MAX_POINTS)
 
 
 @app.route('/admin/download/<order_id>/<filename>')
 def download_file(order_id, filename):
-    """Download files from order folder"""
+    """Download files from order folder (uploaded files are served from the blob store)"""
     order_dir = os.path.join(ORDERS_DIR, order_id)
+    data_path = os.path.join(order_dir, 'customer_data.json')
+    if os.path.exists(data_path):
+        with open(data_path, 'r') as f:
+            file_hashes = json.load(f).get('file_hashes')
+        if file_hashes and filename in file_hashes:
+            path = open_path(BLOBS_DIR, order_dir, filename, file_hashes)
+            return send_from_directory(os.path.dirname(path), os.path.basename(path),
+                                       as_attachment=True, download_name=filename)
     return send_from_directory(order_dir, filename, as_attachment=True)
 
 
+# ==================== JSON API ====================
+
+def _api_error(message, code):
+    return jsonify({'error': message}), code
+
+
+def _order_etag(order_dir, filenames):
+    """Weak validator from the size/mtime of the files a response is built from"""
+    parts = []
+    for filename in filenames:
+        path = os.path.join(order_dir, filename)
+        if os.path.exists(path):
+            info = os.stat(path)
+            parts.append(f"{filename}:{info.st_size}:{info.st_mtime_ns}")
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()
+
+
+def _conditional(payload_fn, etag, mimetype='application/json'):
+    """304 if the client's If-None-Match matches, else build the body with payload_fn()"""
+    if etag in request.if_none_match:
+        response = make_response('', 304)
+    else:
+        response = make_response(payload_fn())
+        response.mimetype = mimetype
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def _csv_value(v):
+    for cast in (int, float):
+        try:
+            return cast(v)
+        except ValueError:
+            pass
+    return v
+
+
+def _api_create_order(payload, mfg_config, config_dir):
+    """Register and solve one order from a JSON object; returns a compact result row"""
+    try:
+        num_tasks_requested = int(payload.get('num_cad_files', 0))
+        float(payload.get('desired_delivery_time')), float(payload.get('offered_price'))
+    except (TypeError, ValueError):
+        return {'order_id': payload.get('order_id'), 'status': 'rejected',
+                'error': 'num_cad_files, desired_delivery_time and offered_price must be numbers'}
+    error = _validate_new_order(num_tasks_requested, mfg_config, config_dir)
+    if error:
+        return {'order_id': payload.get('order_id'), 'status': 'rejected', 'error': error}
+    
+    order_id = secure_filename(str(payload.get('order_id') or '')) or f"ORD-{uuid.uuid4().hex[:8].upper()}"
+    order_dir = os.path.join(ORDERS_DIR, order_id)
+    if not _claim_order(order_id):
+        return {'order_id': order_id, 'status': 'rejected', 'error': f'Order {order_id} already exists'}
+    try:
+        os.makedirs(order_dir, exist_ok=True)
+        
+        # Files must already be in the order folder via the chunked upload endpoint
+        file_hashes = {}
+        cad_filenames = _collect_uploads(order_dir, [], payload.get('cad_files') or [], file_hashes)
+        doc_filenames = _collect_uploads(order_dir, [], payload.get('additional_docs') or [], file_hashes)
+        customer_data = _register_order(order_id, order_dir, payload, num_tasks_requested,
+                                        cad_filenames, doc_filenames, file_hashes, mfg_config)
+        customer_data = _optimize_new_order(order_id, order_dir, customer_data, config_dir)
+    finally:
+        _release_order(order_id)
+    
+    row = {'order_id': order_id, 'status': customer_data['status']}
+    if customer_data['status'] == 'failed':
+        row['error'] = customer_data.get('error_message')
+    return row
+
+
+@app.route('/api/orders', methods=['POST'])
+def api_submit_orders():
+    """
+    Batch order submission: JSON body {"orders": [{...}, ...]} (or a bare list) using the
+    customer form field names. Orders are solved concurrently; one result row per order.
+    """
+    payload = request.get_json(silent=True)
+    orders = payload.get('orders') if isinstance(payload, dict) else payload
+    if not isinstance(orders, list) or not all(isinstance(o, dict) for o in orders):
+        return _api_error('Expected {"orders": [ {...}, ... ]}', 400)
+    if len(orders) > API_MAX_BATCH:
+        return _api_error(f'At most {API_MAX_BATCH} orders per request', 413)
+    
+    mfg_config, config_dir = _load_mfg_config()  # one config version for the whole batch
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda o: _api_create_order(o, mfg_config, config_dir), orders))
+    code = 201 if any(r['status'] != 'rejected' for r in results) else 400
+    return jsonify({'results': results}), code
+
+
+@app.route('/api/orders', methods=['GET'])
+def api_list_orders():
+    """Paginated order listing: ?page=1&per_page=50[&status=processed]"""
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 50)), 1), API_MAX_PAGE_SIZE)
+    except ValueError:
+        return _api_error('page and per_page must be integers', 400)
+    status = request.args.get('status')
+    
+    order_ids = sorted(d for d in os.listdir(ORDERS_DIR)
+                       if os.path.exists(os.path.join(ORDERS_DIR, d, 'customer_data.json')))
+    rows = []
+    if status:
+        # filtering needs every order's status; without it only the requested page is read
+        for order_id in order_ids:
+            customer_data = read_json(os.path.join(ORDERS_DIR, order_id, 'customer_data.json'), {})
+            if customer_data.get('status') == status:
+                rows.append(_order_listing_row(customer_data))
+        total = len(rows)
+        rows = rows[(page - 1) * per_page:page * per_page]
+    else:
+        total = len(order_ids)
+        for order_id in order_ids[(page - 1) * per_page:page * per_page]:
+            rows.append(_order_listing_row(read_json(os.path.join(ORDERS_DIR, order_id, 'customer_data.json'), {})))
+    
+    next_page = None
+    if page * per_page < total:
+        next_page = url_for('api_list_orders', page=page + 1, per_page=per_page, status=status)
+    return jsonify({'orders': rows, 'page': page, 'per_page': per_page, 'total': total, 'next': next_page})
+
+
+@app.route('/api/orders/<order_id>', methods=['GET'])
+def api_order_status(order_id):
+    """Order status plus solution summary; supports If-None-Match"""
+    order_dir = os.path.join(ORDERS_DIR, secure_filename(order_id))
+    if not os.path.exists(os.path.join(order_dir, 'customer_data.json')):
+        return _api_error(f'Order {order_id} not found', 404)
+    
+    def payload():
+        with open(os.path.join(order_dir, 'customer_data.json'), 'r') as f:
+            customer_data = json.load(f)
+        body = _order_listing_row(customer_data)
+        body['error'] = customer_data.get('error_message')
+        body['processing_timestamp'] = customer_data.get('processing_timestamp')
+        body['summary'] = None
+        summary_path = os.path.join(order_dir, 'solution_summary.json')
+        if os.path.exists(summary_path):
+            with open(summary_path, 'r') as f:
+                body['summary'] = json.load(f)
+        return json.dumps(body, separators=(',', ':'))
+    
+    etag = _order_etag(order_dir, ['customer_data.json', 'solution_summary.json'])
+    return _conditional(payload, etag)
+
+
+@app.route('/api/orders/<order_id>/assignments', methods=['GET'])
+def api_order_assignments(order_id):
+    """
+    Task assignments as compact JSON ({"columns": [...], "rows": [[...], ...]}) or, with
+    ?format=csv, the raw solution_assignments.csv; supports If-None-Match
+    """
+    order_dir = os.path.join(ORDERS_DIR, secure_filename(order_id))
+    assignments_path = os.path.join(order_dir, 'solution_assignments.csv')
+    if not os.path.exists(assignments_path):
+        return _api_error(f'No assignments for order {order_id}', 404)
+    etag = _order_etag(order_dir, ['solution_assignments.csv'])
+    
+    if request.args.get('format') == 'csv':
+        def payload():
+            with open(assignments_path, 'r') as f:
+                return f.read()
+        return _conditional(payload, etag + '-csv', mimetype='text/csv')
+    
+    def payload():
+        with open(assignments_path, 'r', newline='') as f:
+            reader = csv.reader(f)
+            columns = next(reader, [])
+            rows = [[_csv_value(v) for v in row] for row in reader]
+        return json.dumps({'columns': columns, 'rows': rows}, separators=(',', ':'))
+    return _conditional(payload, etag)
+
+
+@app.route('/api/config/import', methods=['POST'])
+def api_config_import():
+    """Bulk plant import (multipart files sections, machines, costs[, times]; optional max_tasks)"""
+    try:
+        version = _import_plant_upload()
+    except PlantImportError as e:
+        return jsonify({'error': str(e), 'errors': e.errors}), 422
+    return jsonify({'version': version}), 201
+
+
+def _api_window():
+    """?since=&until= (ISO dates/times, until exclusive) as epoch seconds; ValueError when malformed"""
+    return tuple(datetime.fromisoformat(request.args[name]).timestamp() if request.args.get(name) else None
+                 for name in ('since', 'until'))
+
+
+@app.route('/api/analytics/utilization', methods=['GET'])
+def api_analytics_utilization():
+    """Booked machine hours per time bucket and machine, and section saturation: ?bucket=hour|day|week&since=&until="""
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in analytics.BUCKETS:
+        return _api_error(f"bucket must be one of {', '.join(analytics.BUCKETS)}", 400)
+    try:
+        since, until = _api_window()
+    except ValueError:
+        return _api_error('since and until must be ISO dates', 400)
+    return jsonify(analytics.utilization(ORDERS_DIR, bucket, since, until))
+
+
+@app.route('/api/analytics/profit', methods=['GET'])
+def api_analytics_profit():
+    """Profit and margin distribution of processed orders: ?bins=10&since=&until="""
+    try:
+        bins = min(max(int(request.args.get('bins', 10)), 1), 100)
+        since, until = _api_window()
+    except ValueError:
+        return _api_error('bins must be an integer and since/until ISO dates', 400)
+    return jsonify(analytics.profit_distribution(ORDERS_DIR, bins, since, until))
+
+
+@app.route('/api/analytics/infeasibility', methods=['GET'])
+def api_analytics_infeasibility():
+    """Failed orders by the limit that rules them out: ?since=&until="""
+    try:
+        since, until = _api_window()
+    except ValueError:
+        return _api_error('since and until must be ISO dates', 400)
+    return jsonify(analytics.infeasibility(ORDERS_DIR, since, until))
+
+
+@app.route('/api/reservations', methods=['GET'])
+def api_reservations():
+    """Machine bookings overlapping a window: ?since=&until= (ISO; default the next 7 days)"""
+    try:
+        since, until = _api_window()
+    except ValueError:
+        return _api_error('since and until must be ISO dates', 400)
+    since = datetime.now().timestamp() if since is None else since
+    until = since + RESERVATIONS_DEFAULT_DAYS * 86400 if until is None else until
+    return jsonify({'since': since, 'until': until, 'machines': reservations.schedule(ORDERS_DIR, since, until)})
+
+
+# ==================== STARTUP RECOVERY ====================
+
+def _resume_orders(order_ids):
+    """Re-run solves that were interrupted by a crash or restart"""
+    for order_id in order_ids:
+        order_dir = os.path.join(ORDERS_DIR, order_id)
+        customer_data = read_json(os.path.join(order_dir, 'customer_data.json'))
+        if customer_data:
+            # re-run against the version the order was accepted with, if it is still kept
+            config_dir = (version_dir(MANUFACTURER_DATA_DIR, customer_data.get('config_version'))
+                          or pin(MANUFACTURER_DATA_DIR)[1])
+            print(f"Resuming interrupted order {order_id}...")
+            _optimize_new_order(order_id, order_dir, customer_data, config_dir)
+
+
+def startup(background=True):
+    """
+    One-time recovery before serving: re-queue solves interrupted by a crash or restart, drop
+    released and finished bookings, then re-run the interrupted solves (in a thread if `background`).
+    Not run on import: a worker joining a running deployment would re-queue its siblings' live solves.
+    """
+    interrupted = recover(ORDERS_DIR)
+    reservations.compact(ORDERS_DIR)
+    if interrupted:
+        if background:
+            threading.Thread(target=_resume_orders, args=(interrupted,), daemon=True).start()
+        else:
+            _resume_orders(interrupted)
+    return interrupted
+
+
+@app.cli.command('recover')
+def recover_command():
+    """Recover interrupted solves; run once per deployment before starting the workers"""
+    interrupted = startup(background=False)
+    print(f"Recovered {len(interrupted)} interrupted order(s)")
+
+
 if __name__ == '__main__':
+    startup()
     print("=" * 60)
     print("Manufacturing Order Management System")
     print("=" * 60)
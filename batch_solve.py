@@ -0,0 +1,182 @@
+"""
+Streaming batch solver for order files
+- Reads orders as JSON lines from a file or stdin, one object per line, with the fields of the order form:
+  {"order_id": "A-1", "num_cad_files": 40, "desired_delivery_time": 120, "offered_price": 9000}
+  (optional "cost_limit", default the configuration's default_cost_limit)
+- Solves them against one pinned manufacturer config version, --workers at a time (each CBC run is its
+  own process); input is read only as results come back, so memory stays flat however long the stream is
+- Writes one JSON result per line (NDJSON) in completion order; each carries its input line number
+- With --checkpoint the progress is saved atomically every few results, and --resume continues an
+  interrupted run: orders already written are skipped and output after the last checkpoint is discarded
+
+Usage: python batch_solve.py [orders.jsonl | -] [--out results.jsonl] [--checkpoint FILE [--resume]]
+                             [--workers N] [--version V] [--assignments]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from config_store import pin, version_dir, load_settings
+from order_store import atomic_write_json, read_json
+from order_pipeline import order_data, solve_data, solver_settings
+
+IN_FLIGHT_PER_WORKER = 2   # orders read ahead per worker; the input is not read further than this
+CHECKPOINT_EVERY = 100     # results written between checkpoints
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else str(value)  # numpy scalars
+
+
+def solve_line(config_dir, settings, lineno, line, precheck=True, assignments=False):
+    """
+    Solve one input line against a configuration folder.
+    Returns its result record: status "processed" (with summary), "failed" (infeasible or solver
+    error) or "rejected" (malformed order), with error and elapsed seconds.
+    """
+    started = time.perf_counter()
+    record = {'line': lineno, 'order_id': None}
+    try:
+        order = json.loads(line)
+        if not isinstance(order, dict):
+            raise ValueError("order must be a JSON object")
+        record['order_id'] = order.get('order_id')
+        num_tasks = int(order['num_cad_files'])
+        args = (float(order['offered_price']), float(order['desired_delivery_time']),
+                float(order.get('cost_limit', settings['default_cost_limit'])))
+        if not 0 < num_tasks <= settings['max_tasks']:
+            raise ValueError(f"num_cad_files must be between 1 and {settings['max_tasks']} (manufacturer capacity)")
+    except KeyError as e:
+        return dict(record, status='rejected', error=f"missing field {e}")
+    except (TypeError, ValueError) as e:
+        return dict(record, status='rejected', error=str(e))
+
+    try:
+        DATA = order_data(config_dir, num_tasks, *args)
+        result = solve_data(DATA, precheck=precheck, **settings['solver'])
+    except Exception as e:  # infeasible orders and solver failures are reported, the batch goes on
+        message = str(e) if isinstance(e, ValueError) else f"{type(e).__name__}: {e}"
+        return dict(record, status='failed', error=message, elapsed=round(time.perf_counter() - started, 4))
+    record.update(status='processed', summary=result['summary'])
+    if assignments:
+        record['assignments'] = result['assignments'].to_dict('records')
+    record['elapsed'] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def run_batch(lines, out, config_dir, workers=2, checkpoint=None, state=None, precheck=True, assignments=False):
+    """
+    Solve the orders of `lines` (an iterable of JSON lines) and write result records to `out` as they
+    complete. At most workers * IN_FLIGHT_PER_WORKER orders are in flight at a time.
+    checkpoint: path saved every CHECKPOINT_EVERY results and at the end; `out` must then be a seekable file.
+    state: a loaded checkpoint to resume from. Returns the final state (counts of each status).
+    """
+    settings = load_settings(config_dir)
+    context = {'solver': solver_settings(config_dir),
+               'default_cost_limit': settings.get('default_cost_limit', 999999),
+               'max_tasks': settings.get('max_tasks', 10)}
+    state = dict(state or {}, version=settings.get('version'))
+    state.setdefault('counts', {})
+    next_line = state.get('next_line', 1)  # every line below this one has its result written
+    done = set(state.get('done', []))      # lines at or above next_line with a result written
+    pending = {}
+    written = 0
+
+    def save():
+        out.flush()
+        os.fsync(out.fileno())
+        atomic_write_json(checkpoint, dict(state, next_line=next_line, done=sorted(done), output_bytes=out.tell()))
+
+    def collect(futures):
+        nonlocal next_line, written
+        for future in futures:
+            pending.pop(future)
+            record = future.result()
+            out.write(json.dumps(record, default=_json_default) + '\n')
+            state['counts'][record['status']] = state['counts'].get(record['status'], 0) + 1
+            done.add(record['line'])
+            while next_line in done:
+                done.remove(next_line)
+                next_line += 1
+            written += 1
+            if checkpoint and written % CHECKPOINT_EVERY == 0:
+                save()
+        out.flush()
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        for lineno, line in enumerate(lines, 1):
+            if lineno < next_line or lineno in done:
+                continue
+            if not line.strip():
+                done.add(lineno)
+                continue
+            while len(pending) >= workers * IN_FLIGHT_PER_WORKER:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            future = executor.submit(solve_line, config_dir, context, lineno, line, precheck, assignments)
+            pending[future] = lineno
+        while pending:
+            collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        while next_line in done:  # trailing blank lines
+            done.remove(next_line)
+            next_line += 1
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if checkpoint:
+            save()  # only results already written; orders still in flight are solved again on resume
+    return state
+
+
+if __name__ == '__main__':
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Solve a stream of orders from a JSON lines file")
+    parser.add_argument('input', nargs='?', default='-', help="JSON lines file, or - for stdin")
+    parser.add_argument('--out', help="NDJSON result file (default stdout)")
+    parser.add_argument('--data', default=os.path.join(base_dir, 'data'))
+    parser.add_argument('--version', help="config version to solve against (default the live one)")
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--checkpoint', help="file recording progress, for --resume")
+    parser.add_argument('--resume', action='store_true', help="continue the run recorded in --checkpoint")
+    parser.add_argument('--assignments', action='store_true', help="include each order's assignments")
+    parser.add_argument('--no-precheck', action='store_true',
+                        help="send orders the quick quote proves infeasible to the solver anyway")
+    args = parser.parse_args()
+    if args.checkpoint and not args.out:
+        parser.error("--checkpoint needs --out (a file the checkpoint can point into)")
+    if args.resume and not args.checkpoint:
+        parser.error("--resume needs --checkpoint")
+
+    state = read_json(args.checkpoint) if args.resume else None
+    if args.resume and state is None:
+        parser.error(f"no checkpoint to resume at {args.checkpoint}")
+    version = args.version or (state or {}).get('version')  # a resumed run stays on its version
+    if version:
+        config_dir = version_dir(args.data, version)
+        if config_dir is None:
+            parser.error(f"unknown or pruned config version: {version}")
+    else:
+        version, config_dir = pin(args.data)
+
+    stream = sys.stdin if args.input == '-' else open(args.input, 'r', encoding='utf-8')
+    if args.out:
+        out = open(args.out, 'r+' if state else 'w', encoding='utf-8')
+        if state:
+            out.truncate(state['output_bytes'])
+            out.seek(state['output_bytes'])
+    else:
+        out = sys.stdout
+    started = time.perf_counter()
+    try:
+        with stream, out:
+            state = run_batch(stream, out, config_dir, args.workers, args.checkpoint, state,
+                              precheck=not args.no_precheck, assignments=args.assignments)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    seconds = time.perf_counter() - started
+    total = sum(state['counts'].values())
+    counts = ', '.join(f"{n} {status}" for status, n in sorted(state['counts'].items()))
+    print(f"{total} order(s) ({counts or 'none'}) against config {version or 'legacy'} in {seconds:.1f}s",
+          file=sys.stderr)
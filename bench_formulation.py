@@ -0,0 +1,145 @@
+"""
+Benchmark of the section cap formulation (X-scaled caps vs. the big-M gating they replaced)
+- Builds Stage 1 (symmetry off) of each instance with solver.py's model builder, once as shipped
+  (cost*Y + f_j*X_j <= C_desired*X_j, sum(Y) <= Cap_j*X_j) and once with those rows rewritten to the
+  former big-M form (cost*Y + f_j <= C_desired + M*(1 - X_j), sum(Y) <= Cap_j + M*(1 - X_j), M = 1e6)
+- Instances: the shipped data/ plant and seeded random 3-section plants with p parts and cost limits
+  at a few multiples of the cheapest plan, under both lead time models
+- Reports per instance and form the LP relaxation status and bound, the MILP status and optimum,
+  the LP gap, CBC's node count and the MILP solve time, then a summary per form
+
+Usage: python bench_formulation.py [--seeds N] [--parts 15,40] [--json FILE]
+"""
+import os
+import re
+import json
+import time
+import random
+import argparse
+import tempfile
+
+import pulp
+
+import solver
+
+BIG_M = 1e6  # the constant the gated rows used
+COST_FACTORS = (0.99, 1.01, 1.15)  # cost limit as a multiple of the cheapest plan's cost
+SHIPPED_PARAMS = {'num_tasks_p': 8, 'order_price_Cc': 6000, 'time_limit_Tdesired': 30, 'cost_limit_Cdesired': 600}
+
+
+def random_plant(seed, p, cost_factor, sections=3, machines=4):
+    """Solver DATA of a random plant and order; the cost limit is `cost_factor` x the cheapest plan"""
+    rng = random.Random(seed)
+    S = list(range(1, sections + 1))
+    I = {j: list(range(1, machines + 1)) for j in S}
+    C_var = {(j, i, k): round(rng.uniform(5, 60), 2) for j in S for i in I[j] for k in range(1, p + 1)}
+    t_ijk = {(j, i, k): round(rng.uniform(1, 6), 2) for j in S for i in I[j] for k in range(1, p + 1)}
+    A = {(j, i): int(rng.random() > 0.1) for j in S for i in I[j]}
+    f = {j: rng.uniform(50, 300) for j in S}
+    Cap = {j: rng.randint(p - 2, p + 5) for j in S}
+    cheapest = min(f[j] + sum(min(C_var[(j, i, k)] for i in I[j] if A[(j, i)]) for k in range(1, p + 1))
+                   for j in S if any(A[(j, i)] for i in I[j]))
+    return dict(p=p, Cc=40.0 * p, T_desired=3.0 * p, C_desired=cost_factor * cheapest, sections=S, I=I, f=f,
+                Cap=Cap, O={}, A=A, t_ij=None, t_ijk=t_ijk, C_var=C_var)
+
+
+def instances(seeds, parts):
+    """(name, DATA) of every benchmark instance"""
+    found = []
+    if os.path.exists(os.path.join('data', 'sections.csv')):
+        found.append(('data', solver.load_data_from_csv('data', params=SHIPPED_PARAMS)))
+    for seed in range(seeds):
+        for p in parts:
+            for factor in COST_FACTORS:
+                found.append((f"seed{seed}_p{p}_c{factor}", random_plant(seed, p, factor)))
+    return found
+
+
+def gate_with_big_m(m, X, ctx):
+    """Rewrite Stage 1's X-scaled cost and capacity caps to the big-M gated rows"""
+    for j in ctx['sections']:
+        row = m.constraints[f"cost_cap_{j}"]
+        row.expr[X[j]] = BIG_M
+        row.changeRHS(ctx['C_desired'] + BIG_M - ctx['f'][j])
+        row = m.constraints[f"section_cap_{j}"]
+        row.expr[X[j]] = BIG_M
+        row.changeRHS(ctx['Cap'][j] + BIG_M)
+
+
+def solve_stage1(DATA, time_model, big_m):
+    """LP and MILP figures of one instance's Stage 1 in one cap form"""
+    ctx = solver._model_context(DATA, 'off', time_model)
+    models = solver._stage_models(ctx, 1e-3)
+    solver._set_order_params(models, ctx, 1)
+    m1 = models['m1']
+    if big_m:
+        gate_with_big_m(m1, models['X'], ctx)
+
+    m1.solve(pulp.PULP_CBC_CMD(msg=False, mip=False))
+    lp_status, lp = pulp.LpStatus[m1.status], pulp.value(m1.objective)
+
+    fd, log_path = tempfile.mkstemp(suffix='.log')
+    os.close(fd)
+    try:
+        started = time.perf_counter()
+        m1.solve(pulp.PULP_CBC_CMD(msg=False, logPath=log_path))
+        seconds = time.perf_counter() - started
+        with open(log_path, 'r') as f:
+            nodes = re.findall(r'Enumerated nodes:\s+(\d+)', f.read())
+    finally:
+        os.remove(log_path)
+    status, ip = pulp.LpStatus[m1.status], pulp.value(m1.objective)
+    gap = (lp - ip) / max(abs(ip), 1.0) if status == 'Optimal' and lp_status == 'Optimal' else None
+    return dict(lp_status=lp_status, lp=lp if lp_status == 'Optimal' else None, status=status,
+                optimum=ip if status == 'Optimal' else None, gap=gap,
+                nodes=int(nodes[-1]) if nodes else 0, seconds=seconds)
+
+
+def summarize(rows, form):
+    mine = [r[form] for r in rows]
+    infeasible = [r for r in mine if r['status'] == 'Infeasible']
+    gaps = [r['gap'] for r in mine if r['gap'] is not None]
+    return dict(instances=len(mine), infeasible=len(infeasible),
+                infeasible_lp_proves=sum(r['lp_status'] == 'Infeasible' for r in infeasible),
+                max_gap=max(gaps, default=None), nodes=sum(r['nodes'] for r in mine),
+                seconds=sum(r['seconds'] for r in mine))
+
+
+def run(seeds=3, parts=(15, 40)):
+    """Solve every instance in both forms; prints a report and returns {rows, summary}"""
+    rows = []
+    print(f"{'instance':20s} {'time':8s} {'form':7s} {'LP':>11s} {'MILP':>11s} {'gap':>7s} {'nodes':>6s} {'s':>6s}")
+    for name, DATA in instances(seeds, parts):
+        for time_model in ('total', 'makespan'):
+            row = dict(instance=name, time_model=time_model)
+            for form, big_m in (('big_m', True), ('scaled', False)):
+                r = row[form] = solve_stage1(DATA, time_model, big_m)
+                lp = f"{r['lp']:11.2f}" if r['lp'] is not None else f"{r['lp_status']:>11s}"
+                ip = f"{r['optimum']:11.2f}" if r['optimum'] is not None else f"{r['status']:>11s}"
+                gap = f"{r['gap']:7.2%}" if r['gap'] is not None else f"{'-':>7s}"
+                print(f"{name:20s} {time_model:8s} {form:7s} {lp} {ip} {gap} {r['nodes']:6d} {r['seconds']:6.2f}")
+            if (row['big_m']['optimum'] is None) != (row['scaled']['optimum'] is None) or (
+                    row['big_m']['optimum'] is not None and abs(row['big_m']['optimum'] - row['scaled']['optimum']) > 1e-4):
+                print(f"  note: the forms disagree on {name} ({time_model})")
+            rows.append(row)
+
+    summary = {form: summarize(rows, form) for form in ('big_m', 'scaled')}
+    for form, s in summary.items():
+        max_gap = f"{s['max_gap']:.2%}" if s['max_gap'] is not None else '-'
+        print(f"{form:7s} {s['instances']} instances, {s['infeasible']} infeasible "
+              f"({s['infeasible_lp_proves']} proved by the LP relaxation), largest LP gap {max_gap}, "
+              f"{s['nodes']} nodes, {s['seconds']:.2f}s")
+    return dict(rows=rows, summary=summary)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare X-scaled section caps with big-M gating on Stage 1")
+    parser.add_argument('--seeds', type=int, default=3, help="random plants per part count and cost limit")
+    parser.add_argument('--parts', default='15,40', help="comma-separated part counts of the random plants")
+    parser.add_argument('--json', help="also write the rows and summary to this file")
+    args = parser.parse_args()
+
+    report = run(args.seeds, [int(p) for p in args.parts.split(',')])
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
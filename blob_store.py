@@ -0,0 +1,106 @@
+"""
+Content-addressed store for uploaded CAD files and documents
+- Each distinct file content is kept once under blobs/<first 2 hex>/<sha256>
+- Orders reference blobs through the `file_hashes` manifest in customer_data.json and,
+  where the filesystem allows it, a hardlink in the order folder
+- gc() deletes blobs no order manifest references any more
+
+Usage: python blob_store.py gc [--grace-seconds N]
+"""
+import os
+import json
+import stat
+import time
+import argparse
+
+
+def blob_path(blobs_dir, sha256):
+    return os.path.join(blobs_dir, sha256[:2], sha256)
+
+
+def ingest(blobs_dir, order_dir, filename, sha256):
+    """
+    Move a freshly uploaded order file into the store (or drop it if the content is already
+    stored) and leave a hardlink in its place. Returns True if the content was a duplicate.
+    """
+    src = os.path.join(order_dir, filename)
+    dst = blob_path(blobs_dir, sha256)
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+
+    duplicate = os.path.exists(dst)
+    if duplicate:
+        os.remove(src)
+        os.utime(dst)  # restart the gc grace period until the order manifest references it
+    else:
+        os.replace(src, dst)
+        os.chmod(dst, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)  # blobs are shared, keep them immutable
+    try:
+        os.link(dst, src)
+    except OSError:
+        pass  # no hardlink support (e.g. store on another volume): the manifest entry is the reference
+    return duplicate
+
+
+def open_path(blobs_dir, order_dir, filename, file_hashes):
+    """Where to read an order file from: its blob if the manifest has one, else the order folder"""
+    sha256 = (file_hashes or {}).get(filename)
+    if sha256 and os.path.exists(blob_path(blobs_dir, sha256)):
+        return blob_path(blobs_dir, sha256)
+    return os.path.join(order_dir, filename)
+
+
+def reference_counts(orders_dir):
+    """Count how many order manifests reference each blob"""
+    counts = {}
+    if not os.path.exists(orders_dir):
+        return counts
+    for order_id in os.listdir(orders_dir):
+        path = os.path.join(orders_dir, order_id, 'customer_data.json')
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r') as f:
+                file_hashes = json.load(f).get('file_hashes') or {}
+        except ValueError:
+            continue  # unreadable manifest: its blobs stay pinned by the grace period below
+        for sha256 in set(file_hashes.values()):
+            counts[sha256] = counts.get(sha256, 0) + 1
+    return counts
+
+
+def gc(blobs_dir, orders_dir, grace_seconds=3600):
+    """
+    Delete unreferenced blobs. Blobs younger than `grace_seconds` are kept so an upload whose
+    order manifest has not been written yet is never collected. Returns (deleted, bytes_freed).
+    """
+    counts = reference_counts(orders_dir)
+    deleted, freed = 0, 0
+    if not os.path.exists(blobs_dir):
+        return deleted, freed
+    now = time.time()
+    for prefix in os.listdir(blobs_dir):
+        prefix_dir = os.path.join(blobs_dir, prefix)
+        if not os.path.isdir(prefix_dir):
+            continue
+        for sha256 in os.listdir(prefix_dir):
+            path = os.path.join(prefix_dir, sha256)
+            info = os.stat(path)
+            if counts.get(sha256, 0) > 0 or now - info.st_mtime < grace_seconds:
+                continue
+            os.remove(path)
+            deleted += 1
+            freed += info.st_size
+    return deleted, freed
+
+
+if __name__ == '__main__':
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Content-addressed upload store maintenance")
+    parser.add_argument('command', choices=['gc'])
+    parser.add_argument('--blobs', default=os.path.join(base_dir, 'blobs'))
+    parser.add_argument('--orders', default=os.path.join(base_dir, 'orders'))
+    parser.add_argument('--grace-seconds', type=int, default=3600)
+    args = parser.parse_args()
+
+    deleted, freed = gc(args.blobs, args.orders, args.grace_seconds)
+    print(f"Deleted {deleted} unreferenced blob(s), freed {freed / 1024 / 1024:.1f} MB")
@@ -0,0 +1,98 @@
+"""
+Import-time benchmark guarding cold start of the web app and CLI tools
+- Imports each module in a fresh interpreter and reports the best wall time over a few runs
+- Fails if a module loads a heavy library it must only load on the code paths that need it
+  (pandas, numpy, PuLP), exceeds its time budget, or has side effects on import: writes under
+  the app's state folders (orders/, data/, blobs/) or starts threads (e.g. order recovery)
+
+Usage: python check_imports.py [--repeat N] [--no-budget]
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+# module: (seconds budget, libraries it must not import at load time)
+IMPORT_BUDGETS = {
+    'app':            (0.6, ['pandas', 'numpy', 'pulp']),
+    'order_pipeline': (0.3, ['pandas', 'numpy', 'pulp']),
+    'reoptimize':     (0.3, ['pandas', 'numpy', 'pulp']),
+    'batch_solve':    (0.3, ['pandas', 'numpy', 'pulp']),
+    'config_store':   (0.2, ['pandas', 'numpy', 'pulp']),
+    'solver':         (0.4, ['pandas', 'numpy']),
+}
+
+STATE_DIRS = ['orders', 'data', 'blobs']
+
+_PROBE = """
+import os, sys, time, json, threading
+
+def snapshot():
+    files = {{}}
+    for top in {state_dirs!r}:
+        for root, _, names in os.walk(top):
+            for name in names:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                files[path] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+before = snapshot()
+started = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - started
+after = snapshot()
+print(json.dumps({{'seconds': seconds, 'modules': sorted(sys.modules),
+                  'written': sorted(p for p in set(before) | set(after) if before.get(p) != after.get(p)),
+                  'threads': threading.active_count() - 1}}))
+"""
+
+
+def measure(module, repeat=3):
+    """
+    Best import time of `module` over `repeat` fresh interpreters, the top-level packages it loaded,
+    and its side effects: files it wrote under STATE_DIRS and threads it left running
+    """
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    best, loaded, effects = None, set(), set()
+    for _ in range(repeat):
+        probe = _PROBE.format(module=module, state_dirs=STATE_DIRS)
+        out = subprocess.run([sys.executable, '-c', probe], cwd=base_dir,
+                             capture_output=True, text=True, check=True).stdout
+        result = json.loads(out.strip().splitlines()[-1])
+        best = result['seconds'] if best is None else min(best, result['seconds'])
+        loaded = {name.split('.')[0] for name in result['modules']}
+        effects.update(f"writes {path}" for path in result['written'])
+        if result['threads']:
+            effects.add(f"starts {result['threads']} thread(s)")
+    return best, loaded, sorted(effects)
+
+
+def check(repeat=3, budgets=True):
+    """Measure every module in IMPORT_BUDGETS; returns a list of failure messages"""
+    failures = []
+    for module, (budget, forbidden) in IMPORT_BUDGETS.items():
+        seconds, loaded, effects = measure(module, repeat)
+        heavy = [lib for lib in forbidden if lib in loaded]
+        print(f"  {module:15s} {seconds * 1000:7.1f} ms  (budget {budget * 1000:.0f} ms)"
+              + (f"  loads {', '.join(heavy)}" if heavy else ""))
+        if heavy:
+            failures.append(f"{module} imports {', '.join(heavy)} at load time")
+        if effects:
+            failures.append(f"{module} has side effects on import: {'; '.join(effects)}")
+        if budgets and seconds > budget:
+            failures.append(f"{module} took {seconds:.3f}s to import (budget {budget}s)")
+    return failures
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import-time benchmark for cold start")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-budget', action='store_true', help="only check for heavy imports")
+    args = parser.parse_args()
+
+    failures = check(args.repeat, budgets=not args.no_budget)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,100 @@
+"""
+Versioned manufacturer configuration
+- Every save publishes a complete, immutable version folder data/versions/<version>/
+  (sections.csv, machines.csv, costs.csv, times.csv, config.json)
+- data/CURRENT names the live version and is switched with an atomic rename
+- Readers pin() a version once and read only from its folder, so they never see a mix of
+  old and new tables and never need a lock
+
+Without a CURRENT pointer (fresh checkout) the flat files in data/ are the configuration.
+"""
+import os
+import json
+import uuid
+import shutil
+from datetime import datetime
+
+from order_store import atomic_write_bytes
+
+VERSIONS_DIR = 'versions'
+POINTER_NAME = 'CURRENT'
+KEEP_VERSIONS = 20  # older versions are pruned; every order keeps its own snapshot anyway
+
+
+def current_version(data_dir):
+    """Name of the live config version, or None for the legacy flat layout"""
+    try:
+        with open(os.path.join(data_dir, POINTER_NAME), 'r') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def pin(data_dir):
+    """Return (version, folder) of the live configuration; read everything from that folder"""
+    version = current_version(data_dir)
+    if version is None:
+        return None, data_dir
+    return version, os.path.join(data_dir, VERSIONS_DIR, version)
+
+
+def version_dir(data_dir, version):
+    """Folder of a specific version, or None if it is unknown or has been pruned"""
+    if not version:
+        return None
+    path = os.path.join(data_dir, VERSIONS_DIR, version)
+    return path if os.path.isdir(path) else None
+
+
+def _fsync_tree(path):
+    for name in os.listdir(path):
+        with open(os.path.join(path, name), 'rb') as f:
+            os.fsync(f.fileno())
+
+
+def publish(data_dir, tables, settings, keep=KEEP_VERSIONS):
+    """
+    Publish a new configuration version and make it live.
+    tables: {filename: DataFrame} for the CSV tables, settings: the config.json dict.
+    Returns the new version name.
+    """
+    versions_dir = os.path.join(data_dir, VERSIONS_DIR)
+    os.makedirs(versions_dir, exist_ok=True)
+    version = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:6]}"
+
+    # Build the whole version in a hidden folder, then rename it into place
+    staging = os.path.join(versions_dir, f".staging-{version}")
+    os.makedirs(staging)
+    try:
+        for filename, df in tables.items():
+            df.to_csv(os.path.join(staging, filename), index=False)
+        with open(os.path.join(staging, 'config.json'), 'w') as f:
+            json.dump(dict(settings, version=version), f, indent=2)
+        _fsync_tree(staging)
+        os.rename(staging, os.path.join(versions_dir, version))
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    atomic_write_bytes(os.path.join(data_dir, POINTER_NAME), version.encode('utf-8'))
+    prune(data_dir, keep)
+    return version
+
+
+def prune(data_dir, keep=KEEP_VERSIONS):
+    """Delete all but the `keep` newest versions (never the live one)"""
+    versions_dir = os.path.join(data_dir, VERSIONS_DIR)
+    live = current_version(data_dir)
+    versions = sorted(v for v in os.listdir(versions_dir) if not v.startswith('.'))
+    for version in versions[:-keep] if keep else versions:
+        if version != live:
+            shutil.rmtree(os.path.join(versions_dir, version), ignore_errors=True)
+
+
+def load_settings(config_dir):
+    """config.json of a pinned configuration folder ({} if absent or unreadable)"""
+    try:
+        with open(os.path.join(config_dir, 'config.json'), 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
@@ -0,0 +1,432 @@
+"""
+Differential correctness harness for the fast solver paths
+- Generates small random plants and orders (some with machines already booked by other orders, so
+  only part of the delivery window is left on them) and solves each by exhaustive enumeration of
+  every section and machine per part, the oracle, and with every candidate mode; compares status,
+  chosen section, profit and lead time
+- Every returned plan is also checked on its own (each task once, one section, available machines,
+  capacity, time, cost and booked-machine limits, summary figures matching the assignments)
+- The original formulation (reference_solver.py, the baseline solver.py kept byte for byte) runs on
+  the cases it supports (total lead time, nothing booked); it is timed, and its disagreements with
+  the oracle are counted as reference defects rather than failures
+- A failing case is shrunk (sections, machines and parts removed, numbers simplified) to a minimal
+  one that still fails, printed as JSON and optionally saved for --replay
+- Reports each mode's time relative to the reference on the cases both ran. This is a check, not a
+  benchmark: on these small models the exact modes other than template (binary, symmetry, ordering,
+  warm, sos1, priority) run slower than the original formulation, by about 10-30%
+
+Exact modes must match the oracle (a different section is accepted when profit and time tie);
+"bounded" modes (the heuristic) must return valid plans no better than the oracle; "quote"
+checks quick_quote's verdict and bounds against the optimum.
+
+Usage: python differential.py [--cases N] [--seed S] [--modes a,b] [--save DIR] [--replay FILE]
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import itertools
+
+import reference_solver
+from solver import solve_two_stage_order_price, quick_quote
+from heuristic import solve_heuristic
+
+TOL = 1e-6
+SHRINK_STEPS = 200  # candidate reductions tried per failing case
+
+
+# ---------- Cases ----------
+
+def random_case(rng):
+    """A random plant and order as plain lists (see case_data); small enough for CBC in milliseconds"""
+    p = rng.randint(1, 7)
+    integral = rng.random() < 0.5     # integer costs: ties and interchangeable tasks
+    per_task_times = rng.random() < 0.5
+    sections = []
+    for _ in range(rng.randint(1, 4)):
+        machines = []
+        for _ in range(rng.randint(1, 4)):
+            base, speed = rng.uniform(5, 50), rng.uniform(0.5, 4)
+            costs = [round(base * rng.uniform(0.8, 1.2)) if integral else round(base * rng.uniform(0.8, 1.2), 2)
+                     for _ in range(p)]
+            machines.append(dict(available=int(rng.random() < 0.85), time=round(speed, 2), costs=costs,
+                                 times=[round(speed * rng.uniform(0.5, 1.5), 2) for _ in range(p)]
+                                 if per_task_times else None, hours=None))
+        sections.append(dict(f=round(rng.uniform(0, 200)), cap=rng.randint(max(1, p - 2), p + 3), machines=machines))
+    time_model = rng.choice(['total', 'makespan'])
+    typical_time = p * 2.0 / (2.0 if time_model == 'makespan' else 1.0)
+    T = round(typical_time * rng.uniform(0.4, 1.6), 2)
+    if rng.random() < 0.3:  # other orders booked some machines: hours left in the window (T_machine)
+        for section in sections:
+            for machine in section['machines']:
+                if rng.random() < 0.5:
+                    machine['hours'] = round(T * rng.uniform(0.1, 0.9), 2)
+    return dict(p=p, Cc=round(rng.uniform(100, 600)), T=T,
+                C=round(rng.uniform(100, 500)), time_model=time_model, sections=sections)
+
+
+def case_data(case):
+    """Solver DATA of a case (sections and machines numbered from 1)"""
+    sections = list(range(1, len(case['sections']) + 1))
+    I, f, Cap, A, t_ij, t_ijk, C_var, T_machine = {}, {}, {}, {}, {}, {}, {}, {}
+    for j, section in zip(sections, case['sections']):
+        I[j] = list(range(1, len(section['machines']) + 1))
+        f[j], Cap[j] = float(section['f']), int(section['cap'])
+        for i, machine in zip(I[j], section['machines']):
+            A[(j, i)] = machine['available']
+            t_ij[(j, i)] = machine['time']
+            if machine.get('hours') is not None:
+                T_machine[(j, i)] = float(machine['hours'])
+            for k in range(1, case['p'] + 1):
+                C_var[(j, i, k)] = float(machine['costs'][k - 1])
+                if machine['times'] is not None:
+                    t_ijk[(j, i, k)] = machine['times'][k - 1]
+    DATA = dict(p=case['p'], Cc=float(case['Cc']), T_desired=float(case['T']), C_desired=float(case['C']),
+                sections=sections, I=I, f=f, Cap=Cap, O={}, A=A, t_ij=None if t_ijk else t_ij,
+                t_ijk=t_ijk or None, C_var=C_var)
+    if T_machine:
+        DATA['T_machine'] = T_machine
+    return DATA
+
+
+def _shrunk(case):
+    """Smaller / simpler variants of a case, most aggressive first"""
+    sections = case['sections']
+    for s in range(len(sections)):
+        if len(sections) > 1:
+            yield dict(case, sections=sections[:s] + sections[s + 1:])
+    for s, section in enumerate(sections):
+        for m in range(len(section['machines'])):
+            if len(section['machines']) > 1:
+                machines = section['machines'][:m] + section['machines'][m + 1:]
+                yield dict(case, sections=sections[:s] + [dict(section, machines=machines)] + sections[s + 1:])
+    if case['p'] > 1:
+        yield dict(case, p=case['p'] - 1, sections=[
+            dict(section, machines=[dict(machine, costs=machine['costs'][:-1],
+                                         times=machine['times'] and machine['times'][:-1])
+                                    for machine in section['machines']]) for section in sections])
+    simpler = [
+        lambda m: dict(m, hours=None),
+        lambda m: dict(m, times=None),
+        lambda m: dict(m, available=1),
+        lambda m: dict(m, costs=[round(c) for c in m['costs']]),
+        lambda m: dict(m, time=round(m['time'])) if m['time'] >= 1 else m,
+    ]
+    for simplify in simpler:
+        yield dict(case, sections=[dict(section, machines=[simplify(m) for m in section['machines']])
+                                   for section in sections])
+    if any(section['f'] for section in sections):
+        yield dict(case, sections=[dict(section, f=0) for section in sections])
+
+
+# ---------- Modes ----------
+
+def _perturbed(DATA):
+    """Another order on the same plant, used to prime caches and warm starts"""
+    return dict(DATA, Cc=DATA['Cc'] * 1.1, T_desired=DATA['T_desired'] * 1.3, C_desired=DATA['C_desired'] * 1.2)
+
+
+def _template(DATA, time_model):
+    key = f"differential-{uuid.uuid4().hex}"  # one plant, so a fresh key per case
+    solve_two_stage_order_price(_perturbed(DATA), time_model=time_model, template_key=key)
+    started = time.perf_counter()
+    return solve_two_stage_order_price(DATA, time_model=time_model, template_key=key), started
+
+
+def _warm(DATA, time_model):
+    previous = solve_two_stage_order_price(_perturbed(DATA), time_model=time_model)
+    started = time.perf_counter()
+    return solve_two_stage_order_price(DATA, time_model=time_model, warm_start=previous.get('assignments')), started
+
+
+def _timed(solve):
+    def run(DATA, time_model):
+        return solve(DATA, time_model), None
+    return run
+
+
+# name: (kind, run(DATA, time_model) -> (result, start time of the measured part or None))
+MODES = {
+    'binary':    ('exact', _timed(lambda D, tm: solve_two_stage_order_price(D, time_model=tm, symmetry='off'))),
+    'symmetry':  ('exact', _timed(lambda D, tm: solve_two_stage_order_price(D, time_model=tm, symmetry='auto'))),
+    'ordering':  ('exact', _timed(lambda D, tm: solve_two_stage_order_price(D, time_model=tm, symmetry='order'))),
+    'template':  ('exact', _template),
+    'warm':      ('exact', _warm),
+    'sos1':      ('exact', _timed(lambda D, tm: solve_two_stage_order_price(D, time_model=tm, section_branching='sos1'))),
+    'priority':  ('exact', _timed(lambda D, tm: solve_two_stage_order_price(D, time_model=tm,
+                                                                            section_branching='priority'))),
+    'heuristic': ('bounded', _timed(lambda D, tm: solve_heuristic(D, time_budget=2.0, time_model=tm))),
+    'quote':     ('quote', _timed(lambda D, tm: quick_quote(D, time_model=tm))),
+}
+
+
+# ---------- Oracles ----------
+
+_optimum_cache = {}
+
+
+def _lead(DATA, j, plan, time_model):
+    """Lead time of a plan (machine per task) in section j, and each machine's load"""
+    loads = {}
+    for k, i in enumerate(plan, start=1):
+        loads[i] = loads.get(i, 0.0) + (DATA['t_ijk'][(j, i, k)] if DATA['t_ijk'] else DATA['t_ij'][(j, i)])
+    return (max(loads.values()) if time_model == 'makespan' else sum(loads.values())), loads
+
+
+def optimum(case):
+    """
+    The two-stage optimum of a case by enumerating every section and machine per part: the plan of
+    highest profit within the cost, time, capacity and booked-machine limits, then shortest lead time.
+    Returns {"summary": {...}} like the solver, or {"status1": "Infeasible"}.
+    """
+    key = json.dumps(case, sort_keys=True)
+    if key in _optimum_cache:
+        return _optimum_cache[key]
+    DATA, time_model = case_data(case), case['time_model']
+    T_machine = DATA.get('T_machine', {})
+    best = None
+    for j in DATA['sections']:
+        machines = [i for i in DATA['I'][j] if DATA['A'][(j, i)]]
+        if DATA['p'] > DATA['Cap'][j] or not machines:
+            continue
+        for plan in itertools.product(machines, repeat=DATA['p']):
+            cost = DATA['f'][j] + sum(DATA['C_var'][(j, i, k)] for k, i in enumerate(plan, start=1))
+            if cost > DATA['C_desired'] + 1e-9:
+                continue
+            lead, loads = _lead(DATA, j, plan, time_model)
+            if lead > DATA['T_desired'] + 1e-9 or any(load > T_machine.get((j, i), load) + 1e-9
+                                                      for i, load in loads.items()):
+                continue
+            profit = DATA['Cc'] - cost
+            if best is None or profit > best[0] + 1e-9 or (abs(profit - best[0]) <= 1e-9 and lead < best[1] - 1e-9):
+                best = (profit, lead, j)
+    if best is None:
+        result = {"status1": "Infeasible"}
+    else:
+        result = {"summary": dict(total_profit=best[0], time=best[1], chosen_section=best[2])}
+    _optimum_cache[key] = result
+    return result
+
+
+def reference_supports(case):
+    """The original formulation has the total lead time only and no booked-machine limits"""
+    return case['time_model'] == 'total' and all(machine.get('hours') is None
+                                                  for section in case['sections'] for machine in section['machines'])
+
+
+def reference_defects(case, ref):
+    """Where the original formulation's result differs from the enumerated optimum"""
+    if isinstance(ref, Exception):
+        return [f"{type(ref).__name__}: {ref}"]
+    expected = optimum(case)
+    if 'summary' not in ref:
+        return [f"reference {ref.get('status1')}, optimum profit {expected['summary']['total_profit']}"] \
+            if 'summary' in expected else []
+    if ref['summary'].get('status2') != 'Optimal':
+        return [f"reference Stage 2 {ref['summary'].get('status2')}"]
+    problems = check_plan(case_data(case), ref, case['time_model'])
+    if problems or 'summary' not in expected:
+        return problems or ["reference found a plan, the case is infeasible"]
+    return compare('exact', expected, ref, case_data(case), case['time_model'])
+
+
+# ---------- Checks ----------
+
+def _close(a, b):
+    return abs(a - b) <= TOL * max(1.0, abs(a), abs(b)) + 1e-4
+
+
+def check_plan(DATA, result, time_model):
+    """Problems with a returned plan, checked against DATA alone"""
+    summary, rows = result['summary'], result['assignments']
+    j = summary['chosen_section']
+    problems = []
+    if sorted(int(k) for k in rows['task_id']) != list(range(1, DATA['p'] + 1)):
+        problems.append("tasks not assigned exactly once")
+    if set(int(s) for s in rows['section_id']) != {j}:
+        problems.append("assignments span several sections or not the chosen one")
+    if any(not DATA['A'].get((j, int(i)), 0) for i in rows['machine_id']):
+        problems.append("task on an unavailable or unknown machine")
+    if DATA['p'] > DATA['Cap'][j]:
+        problems.append(f"{DATA['p']} parts exceed capacity {DATA['Cap'][j]}")
+    if problems:
+        return problems
+    times = [DATA['t_ijk'][(j, int(i), int(k))] if DATA['t_ijk'] else DATA['t_ij'][(j, int(i))]
+             for i, k in zip(rows['machine_id'], rows['task_id'])]
+    loads = {}
+    for i, t in zip(rows['machine_id'], times):
+        loads[int(i)] = loads.get(int(i), 0.0) + t
+    lead = max(loads.values()) if time_model == 'makespan' else sum(loads.values())
+    for i, load in loads.items():
+        if load > DATA.get('T_machine', {}).get((j, i), load) + 1e-6:
+            problems.append(f"machine {i} booked for {load:.4f}h, {DATA['T_machine'][(j, i)]}h left")
+    cost = DATA['f'][j] + sum(DATA['C_var'][(j, int(i), int(k))] for i, k in zip(rows['machine_id'], rows['task_id']))
+    if lead > DATA['T_desired'] + 1e-6:
+        problems.append(f"lead time {lead:.4f} over the limit {DATA['T_desired']}")
+    if cost > DATA['C_desired'] + 1e-6:
+        problems.append(f"cost {cost:.4f} over the limit {DATA['C_desired']}")
+    if not _close(summary['total_profit'], DATA['Cc'] - cost):
+        problems.append(f"summary profit {summary['total_profit']} != {DATA['Cc'] - cost} from the assignments")
+    if not _close(summary['time'], lead):
+        problems.append(f"summary time {summary['time']} != {lead} from the assignments")
+    return problems
+
+
+def compare(kind, ref, cand, DATA, time_model):
+    """Problems of a candidate result against the optimum `ref`"""
+    if kind == 'quote':
+        ref_profit = ref['summary']['total_profit'] if 'summary' in ref else None
+        problems = []
+        if cand['verdict'] == 'infeasible' and ref_profit is not None:
+            problems.append("quote says infeasible, the optimum is a plan")
+        if cand['verdict'] == 'feasible' and ref_profit is None:
+            problems.append(f"quote says feasible, the case is {ref.get('status1')}")
+        if ref_profit is not None and cand['upper_bound'] is not None and cand['upper_bound'] < ref_profit - 1e-4:
+            problems.append(f"upper bound {cand['upper_bound']} below the optimum {ref_profit}")
+        if ref_profit is not None and cand['lower_bound'] is not None and cand['lower_bound'] > ref_profit + 1e-4:
+            problems.append(f"lower bound {cand['lower_bound']} above the optimum {ref_profit}")
+        return problems
+
+    if 'summary' not in cand:
+        if 'summary' in ref and kind == 'exact':
+            return [f"candidate {cand.get('status1')}, optimum profit {ref['summary']['total_profit']}"]
+        return []
+    problems = check_plan(DATA, cand, time_model)
+    if 'summary' not in ref:
+        return problems + [f"candidate found a plan, the case is {ref.get('status1')}"]
+    r, c = ref['summary'], cand['summary']
+    if kind == 'bounded':
+        if c['total_profit'] > r['total_profit'] + 1e-4:
+            problems.append(f"profit {c['total_profit']} beats the optimum {r['total_profit']}")
+        return problems
+    # a different chosen section is only wrong if it changes profit or time (otherwise both are optimal)
+    if not _close(r['total_profit'], c['total_profit']):
+        problems.append(f"section {c['chosen_section']} profit {c['total_profit']} != "
+                        f"optimum section {r['chosen_section']} profit {r['total_profit']}")
+    elif not _close(r['time'], c['time']):
+        problems.append(f"section {c['chosen_section']} time {c['time']} != "
+                        f"optimum section {r['chosen_section']} time {r['time']}")
+    return problems
+
+
+def run_reference(case):
+    """(result or exception, seconds) of the original formulation on a case it supports"""
+    started = time.perf_counter()
+    try:
+        ref = reference_solver.solve_two_stage_order_price(case_data(case))
+    except Exception as e:  # the original reads Stage 2 values even when Stage 2 failed
+        ref = e
+    return ref, time.perf_counter() - started
+
+
+def run_mode(mode, case):
+    """(problems, candidate seconds, optimum, candidate result) of one mode on one case"""
+    DATA, time_model = case_data(case), case['time_model']
+    expected = optimum(case)
+    kind, run = MODES[mode]
+    started = time.perf_counter()
+    try:
+        cand, measured_from = run(case_data(case), time_model)
+    except Exception as e:
+        return [f"{type(e).__name__}: {e}"], time.perf_counter() - started, expected, None
+    seconds = time.perf_counter() - (measured_from or started)
+    try:
+        problems = compare(kind, expected, cand, DATA, time_model)
+    except Exception as e:
+        problems = [f"result could not be checked: {type(e).__name__}: {e}"]
+    return problems, seconds, expected, cand
+
+
+def shrink(mode, case):
+    """Smallest variant of a failing case that still fails in `mode`, and its problems"""
+    problems = run_mode(mode, case)[0]
+    for _ in range(SHRINK_STEPS):
+        for smaller in _shrunk(case):
+            if smaller == case:
+                continue
+            found = run_mode(mode, smaller)[0]
+            if found:
+                case, problems = smaller, found
+                break
+        else:
+            break
+    return case, problems
+
+
+# ---------- Driver ----------
+
+def run(cases=50, seed=0, modes=None, save=None):
+    """Run every mode on `cases` random cases; prints a report and returns the list of failures"""
+    modes = list(modes or MODES)
+    stats = {mode: dict(cases=0, failed=0, cand=0.0, ref=0.0, shared=0.0, missed=0) for mode in modes}
+    supported, defects = 0, []
+    failures = []
+    for n in range(cases):
+        case = random_case(random.Random(seed * 100003 + n))
+        ref_seconds = None
+        if reference_supports(case):
+            ref, ref_seconds = run_reference(case)
+            supported += 1
+            found = reference_defects(case, ref)
+            if found:
+                defects.append(n)
+                print(f"reference defect, case {n}: {'; '.join(found)}")
+        for mode in modes:
+            problems, seconds, expected, cand = run_mode(mode, case)
+            s = stats[mode]
+            s['cases'] += 1
+            s['cand'] += seconds
+            if ref_seconds is not None:
+                s['ref'] += ref_seconds
+                s['shared'] += seconds
+            if MODES[mode][0] == 'bounded' and 'summary' in expected and cand is not None and 'summary' not in cand:
+                s['missed'] += 1
+            if problems:
+                s['failed'] += 1
+                small, small_problems = shrink(mode, case)
+                failures.append(dict(mode=mode, case_number=n, seed=seed, problems=small_problems, case=small))
+                print(f"FAIL {mode} case {n}: {'; '.join(small_problems)}")
+                print(json.dumps(small))
+                if save:
+                    os.makedirs(save, exist_ok=True)
+                    with open(os.path.join(save, f"{mode}-{seed}-{n}.json"), 'w') as f:
+                        json.dump(failures[-1], f, indent=2)
+
+    # "time vs ref": the mode's time over the reference's on the cases the reference supports (> 1 is slower)
+    print(f"{'mode':10s} {'cases':>6s} {'failed':>7s} {'mode s':>9s} {'time vs ref':>12s}")
+    for mode, s in stats.items():
+        ratio = f"{s['shared'] / s['ref']:11.2f}x" if s['ref'] > 0 else f"{'-':>12s}"
+        extra = f"  (no plan in {s['missed']} feasible case(s))" if s['missed'] else ""
+        print(f"{mode:10s} {s['cases']:6d} {s['failed']:7d} {s['cand']:9.3f} {ratio}{extra}")
+    print(f"reference ran on {supported} case(s); {len(defects)} differ from the enumerated optimum")
+    return failures
+
+
+def replay(path):
+    """Re-run a saved failing case in its mode; returns its current problems"""
+    with open(path, 'r') as f:
+        failure = json.load(f)
+    problems = run_mode(failure['mode'], failure['case'])[0]
+    print(f"{failure['mode']}: " + ('; '.join(problems) if problems else "passes now"))
+    return problems
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Differential tests of the fast solver paths against the reference")
+    parser.add_argument('--cases', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--modes', help=f"comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument('--save', help="folder for shrunk failing cases")
+    parser.add_argument('--replay', help="re-run a saved failing case")
+    args = parser.parse_args()
+
+    if args.replay:
+        sys.exit(1 if replay(args.replay) else 0)
+    modes = args.modes.split(',') if args.modes else None
+    unknown = [m for m in modes or [] if m not in MODES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    sys.exit(1 if run(args.cases, args.seed, modes, args.save) else 0)
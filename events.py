@@ -0,0 +1,52 @@
+"""
+In-process order status events for the admin dashboard (server-sent events)
+- publish() records a status transition (queued, solving_stage1, solving_stage2, processed, failed)
+- stream() yields SSE frames to a subscriber, replaying what it missed via Last-Event-ID
+
+Events live in this process only: with several app workers each dashboard sees the
+transitions of the worker it is connected to.
+"""
+import json
+import time
+import threading
+from collections import deque
+
+HISTORY = 500         # events kept for reconnecting clients
+KEEPALIVE_SECONDS = 15
+
+_events = deque(maxlen=HISTORY)
+_next_id = 1
+_cond = threading.Condition()
+
+
+def publish(order_id, status, **info):
+    """Record a status transition of an order and wake up all subscribers"""
+    global _next_id
+    with _cond:
+        event = dict(info, id=_next_id, order_id=order_id, status=status, ts=time.time())
+        _next_id += 1
+        _events.append(event)
+        _cond.notify_all()
+    return event
+
+
+def _frame(event):
+    return f"id: {event['id']}\nevent: order_status\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+
+
+def stream(last_id=0, keepalive=KEEPALIVE_SECONDS):
+    """Generator of SSE frames: missed events first, then live ones; a comment line keeps proxies open"""
+    if not last_id:
+        with _cond:
+            last_id = _next_id - 1  # new subscribers start from now
+    while True:
+        with _cond:
+            if not any(e['id'] > last_id for e in _events):
+                _cond.wait(timeout=keepalive)
+            pending = [e for e in _events if e['id'] > last_id]
+        if not pending:
+            yield ": keepalive\n\n"
+            continue
+        for event in pending:
+            last_id = event['id']
+            yield _frame(event)
@@ -0,0 +1,248 @@
+"""
+Large-neighbourhood search engine for orders too big for the exact two-stage MILP
+- Construction: per section, every task goes to the machine minimizing cost + lam*time, where lam is
+  the multiplier of the relaxed time cap (as in solver.quick_quote), then the plan is repaired
+  into a feasible one
+- LNS: repeatedly free a subset of tasks (random, or everything on two machines) and re-solve that
+  sub-assignment exactly with CBC against the time the fixed tasks leave, keeping improvements
+- Sections whose relaxation bound cannot beat the incumbent are not searched
+
+Returns the same summary/assignments shape as solve_two_stage_order_price, plus the gap to the bound.
+"""
+import time
+import random
+import numpy as np
+import pulp
+
+from solver import quick_quote
+
+NEIGHBOURHOOD = 40      # tasks freed per LNS step
+MAX_STALL = 25          # non-improving LNS steps before a section is left alone
+MIN_STEP_SECONDS = 0.1  # least budget left for an LNS step (a CBC run); with less the search stops
+TIME_WEIGHT = 1e-3      # tie-break toward faster plans at equal cost (the role of Stage 2)
+TOL = 1e-9
+
+
+def _section_arrays(DATA, j):
+    """Available machines of section j with (tasks x machines) cost and time matrices and their hour caps"""
+    machs = [int(i) for i in DATA["I"][j] if int(DATA["A"][(j, int(i))])]
+    tasks = range(1, int(DATA["p"]) + 1)
+    c = np.array([[DATA["C_var"][(j,i,k)] for i in machs] for k in tasks], dtype=float)
+    if DATA["t_ijk"]:
+        t = np.array([[DATA["t_ijk"][(j,i,k)] for i in machs] for k in tasks], dtype=float)
+    else:
+        t = np.tile(np.array([DATA["t_ij"][(j,i)] for i in machs], dtype=float), (len(tasks), 1))
+    T = float(DATA["T_desired"])
+    caps = np.array([min(T, float(DATA.get("T_machine", {}).get((j, i), T))) for i in machs])
+    return machs, c, t, caps
+
+
+def _loads(plan, t):
+    return np.bincount(plan, weights=t[np.arange(len(plan)), plan], minlength=t.shape[1])
+
+
+def _lead_time(loads, time_model):
+    return float(loads.max() if time_model == "makespan" else loads.sum())
+
+
+def _fits(loads, T, caps, time_model):
+    """Whether machine loads meet the per-machine caps and, for "total", the summed time cap"""
+    return bool((loads <= caps + TOL).all()) and (time_model == "makespan" or loads.sum() <= T + TOL)
+
+
+def _construct(c, t, T, caps, time_model):
+    """Lagrangian-guided plan, repaired to meet the time caps; None if no feasible plan was found"""
+    cap = caps.sum() if time_model == "makespan" else min(T, caps.sum())
+    plan_for = lambda lam: np.argmin(c + lam*t + TOL*t, axis=1)
+    plan = plan_for(0.0)
+    if _loads(plan, t).sum() > cap + TOL:
+        lo, hi = 0.0, 1.0
+        while _loads(plan_for(hi), t).sum() > cap + TOL:
+            hi *= 2.0
+        for _ in range(40):
+            mid = (lo + hi) / 2.0
+            lo, hi = (mid, hi) if _loads(plan_for(mid), t).sum() > cap + TOL else (lo, mid)
+        plan = plan_for(hi)
+    loads = _loads(plan, t)
+    if _fits(loads, T, caps, time_model):
+        return plan
+
+    # Move tasks off machines over their cap at the least extra cost
+    for _ in range(len(plan) * t.shape[1]):
+        over = int((loads - caps).argmax())
+        if loads[over] <= caps[over] + TOL:
+            break
+        ks = np.flatnonzero(plan == over)
+        fits = loads[None, :] + t[ks] <= caps[None, :] + TOL
+        if time_model != "makespan":
+            fits &= loads.sum() + t[ks] - t[ks, over][:, None] <= T + TOL
+        fits[:, over] = False
+        if not fits.any():
+            break
+        delta = np.where(fits, c[ks] - c[ks, over][:, None], np.inf)
+        row, target = np.unravel_index(np.argmin(delta), delta.shape)
+        k = ks[row]
+        loads[over] -= t[k, over]
+        loads[target] += t[k, target]
+        plan[k] = target
+    if _fits(loads, T, caps, time_model):
+        return plan
+
+    # Fall back to earliest-finish placement of the longest tasks first (LPT)
+    plan, loads = np.zeros(len(plan), dtype=int), np.zeros(t.shape[1])
+    for k in np.argsort(-t.min(axis=1), kind="stable"):
+        finish = loads + t[k]
+        ok = (finish <= caps + TOL) & (time_model == "makespan" or loads.sum() + t[k] <= T + TOL)
+        target = int(np.argmin(np.where(ok, c[k], np.inf)))
+        if not ok[target]:
+            return None
+        plan[k] = target
+        loads[target] += t[k, target]
+    return plan
+
+
+def _lns_step(plan, free, c, t, T, caps, time_model, time_limit):
+    """
+    Re-solve the assignment of the `free` tasks exactly within time_limit seconds (CBC keeps the
+    current plan as its start, so a timed-out step returns it or better); returns the plan or None
+    """
+    fixed = np.ones(len(plan), dtype=bool)
+    fixed[free] = False
+    fixed_loads = np.bincount(plan[fixed], weights=t[np.flatnonzero(fixed), plan[fixed]], minlength=t.shape[1])
+    machines = range(t.shape[1])
+
+    m = pulp.LpProblem("LNS", pulp.LpMinimize)
+    z = {(k, x): pulp.LpVariable(f"z_{k}_{x}", cat=pulp.LpBinary) for k in free for x in machines
+         if fixed_loads[x] + t[k, x] <= caps[x] + TOL}
+    m += pulp.lpSum([(c[k, x] + TIME_WEIGHT*t[k, x]) * var for (k, x), var in z.items()])
+    for k in free:
+        m += pulp.lpSum([z[(k, x)] for x in machines if (k, x) in z]) == 1
+    for x in machines:
+        if time_model == "makespan" or caps[x] < T:
+            m += pulp.lpSum([t[k, x] * z[(k, x)] for k in free if (k, x) in z]) <= caps[x] - fixed_loads[x]
+    if time_model != "makespan":
+        m += pulp.lpSum([t[k, x] * var for (k, x), var in z.items()]) <= T - fixed_loads.sum()
+    for (k, x), var in z.items():
+        var.setInitialValue(1 if plan[k] == x else 0)
+
+    m.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit, warmStart=True))
+    if pulp.LpStatus[m.status] not in ("Optimal", "Not Solved"):
+        return None
+    new_plan = plan.copy()
+    for k in free:
+        chosen = [x for x in machines if (k, x) in z and (pulp.value(z[(k, x)]) or 0) > 0.5]
+        if len(chosen) != 1:
+            return None
+        new_plan[k] = chosen[0]
+    return new_plan
+
+
+def solve_heuristic(DATA, time_budget=10.0, time_model="total", warm_start=None, seed=0, progress=None):
+    """
+    Bounded-time plan for large orders: construction + LNS within `time_budget` wall-clock seconds.
+    warm_start: optional assignments DataFrame from a previous solve, used if it is still feasible.
+    Returns {"summary": ..., "assignments": DataFrame} like solve_two_stage_order_price, with
+    status1/status2 "Heuristic", upper_bound (relaxation bound) and gap (relative to it), or
+    {"status1": ..., "note": ...} when no feasible plan is found.
+    """
+    started = time.perf_counter()
+    deadline = started + time_budget
+    rng = random.Random(seed)
+    p = int(DATA["p"]); Cc = float(DATA["Cc"]); T = float(DATA["T_desired"]); C_desired = float(DATA["C_desired"])
+
+    quoted = quick_quote(DATA, time_model=time_model)
+    if quoted["verdict"] == "infeasible":
+        return {"status1": "Infeasible", "note": "; ".join(f"section {j}: {r}" for j, r in quoted["reasons"].items())}
+
+    # Construct a plan in every section that could still take the order
+    candidates = {}
+    for j, bound in sorted(quoted["bounds"].items(), key=lambda item: -item[1]):
+        machs, c, t, caps = _section_arrays(DATA, j)
+        plan = _construct(c, t, T, caps, time_model)
+        if warm_start is not None and len(warm_start) and int(warm_start["section_id"].iloc[0]) == j:
+            index = {i: x for x, i in enumerate(machs)}
+            rows = warm_start.sort_values("task_id")
+            if len(rows) == p and rows["machine_id"].isin(list(index)).all():
+                previous = np.array([index[int(i)] for i in rows["machine_id"]])
+                if (_fits(_loads(previous, t), T, caps, time_model) and
+                        (plan is None or c[np.arange(p), previous].sum() < c[np.arange(p), plan].sum())):
+                    plan = previous
+        if plan is not None:
+            candidates[j] = dict(machs=machs, c=c, t=t, caps=caps, plan=plan, bound=bound, stall=0)
+
+    def profit(j):
+        cand = candidates[j]
+        return Cc - float(DATA["f"][j]) - float(cand["c"][np.arange(p), cand["plan"]].sum())
+
+    if progress:
+        progress("solving_stage1", build_seconds=round(time.perf_counter() - started, 4))
+
+    # LNS, always on the section with the most room between its plan and its bound
+    while candidates:
+        best = max(profit(j) for j in candidates)
+        open_sections = [j for j in candidates if candidates[j]["stall"] < MAX_STALL
+                         and candidates[j]["bound"] > max(best, profit(j)) + 1e-6]
+        if not open_sections:
+            break
+        j = max(open_sections, key=lambda j: candidates[j]["bound"] - profit(j))
+        cand = candidates[j]
+        plan, c, t = cand["plan"], cand["c"], cand["t"]
+        if p <= NEIGHBOURHOOD:
+            free = np.arange(p)
+        elif rng.random() < 0.5 and t.shape[1] > 1:
+            pair = rng.sample(range(t.shape[1]), 2)
+            free = np.flatnonzero(np.isin(plan, pair))
+            if len(free) > NEIGHBOURHOOD:
+                free = np.array(sorted(rng.sample(list(free), NEIGHBOURHOOD)))
+        else:
+            free = np.array(sorted(rng.sample(range(p), NEIGHBOURHOOD)))
+        remaining = deadline - time.perf_counter()
+        if remaining < MIN_STEP_SECONDS:
+            break
+        new_plan = _lns_step(plan, free, c, t, T, cand["caps"], time_model, remaining)
+        rows = np.arange(p)
+        if new_plan is not None and (c[rows, new_plan] + TIME_WEIGHT*t[rows, new_plan]).sum() < \
+                (c[rows, plan] + TIME_WEIGHT*t[rows, plan]).sum() - 1e-9:
+            cand["plan"], cand["stall"] = new_plan, 0
+        else:
+            cand["stall"] += 1
+        if p <= NEIGHBOURHOOD and new_plan is not None:
+            cand["stall"] = MAX_STALL  # solved exactly
+
+    feasible = [j for j in candidates if Cc - profit(j) <= C_desired + 1e-6]
+    if not feasible:
+        return {"status1": "Not Solved", "note": "No feasible plan found within the time budget."}
+    chosen = max(feasible, key=profit)
+    cand = candidates[chosen]
+    plan, c, t, machs = cand["plan"], cand["c"], cand["t"], cand["machs"]
+
+    import pandas as pd
+    assign_df = pd.DataFrame([dict(section_id=chosen, machine_id=machs[x], task_id=k + 1,
+                                   var_cost=DATA["C_var"][(chosen, machs[x], k + 1)], time=float(t[k, x]))
+                              for k, x in sorted(enumerate(plan), key=lambda kx: (machs[kx[1]], kx[0]))])
+    T_val = _lead_time(_loads(plan, t), time_model)
+    profit_val = profit(chosen)
+    upper = quoted["upper_bound"]
+    O = float(DATA["O"].get(chosen, 0.0))
+    summary = dict(
+        status1="Heuristic", status2="Heuristic",
+        chosen_section=int(chosen),
+        total_revenue=Cc,
+        total_cost=float(Cc - profit_val),
+        total_profit=float(profit_val),
+        time=T_val,
+        time_limit=T,
+        cost_limit=C_desired,
+        assignments=p,
+        active_machines=int(len(np.unique(plan))),
+        tasks_enforced=p,
+        tasks_scheduled=p,
+        capacity_of_chosen=int(DATA["Cap"][chosen]),
+        efficiency_proxy=(O / (T_val * p) if O > 0 and T_val > 0 and p > 0 else None),
+        formulation="lns",
+        time_model=time_model,
+        upper_bound=float(upper),
+        gap=float(max(upper - profit_val, 0.0) / max(abs(upper), 1.0)),
+        elapsed=round(time.perf_counter() - started, 4),
+    )
+    return {"summary": summary, "assignments": assign_df}
@@ -0,0 +1,376 @@
+"""
+Load generator for the web portal
+- Virtual users submit orders (POST /submit_order with a small CAD file) and browse /admin,
+  /admin/results/<id> and /admin/download/<id>/<file> in a configurable mix and concurrency
+- Runs against the Flask test client in this process (orders, uploads and configuration in a
+  scratch folder; importing app touches none of the live folders, see check_imports.py) or against
+  a running server with --url
+- Reports requests, errors, throughput and p50/p95/p99 latency per route, and how many submitted
+  orders were processed or failed (an infeasible order is still a 200); --json saves the report
+  and --baseline fails the run when a route's throughput or p95 regressed beyond --tolerance
+- Optional profiles: --profile writes cProfile stats of the request handling (in-process only),
+  --flamegraph records an SVG with py-spy (of this process, or of --server-pid with --url)
+
+Usage: python loadtest.py [--url URL] [--concurrency N] [--duration S] [--mix submit=1,admin=2,...]
+                          [--json FILE] [--baseline FILE] [--profile FILE] [--flamegraph FILE]
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import shutil
+import signal
+import tempfile
+import argparse
+import threading
+import subprocess
+import urllib.error
+import urllib.request
+
+ROUTES = ['submit', 'admin', 'results', 'download']
+DEFAULT_MIX = {'submit': 1, 'admin': 2, 'results': 4, 'download': 3}
+SEED_ORDERS = 4             # orders submitted before measuring, so results / download have targets
+CAD_FILE = b'%PDF-1.4\n' + b'0' * 4096 + b'\n%%EOF\n'
+
+
+# ---------- Clients ----------
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None  # report the 302 itself (the portal redirects on rejected orders)
+
+
+class HttpClient:
+    """Requests to a running server"""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.opener = urllib.request.build_opener(_NoRedirect)
+
+    def request(self, method, path, fields=None, files=None):
+        body, headers = None, {}
+        if method == 'POST':
+            boundary = uuid.uuid4().hex
+            parts = [f'--{boundary}\r\nContent-Disposition: form-data; name="{k}"\r\n\r\n{v}\r\n'.encode()
+                     for k, v in (fields or {}).items()]
+            for name, (filename, data) in (files or {}).items():
+                parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                             f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode()
+                             + data + b'\r\n')
+            body = b''.join(parts) + f'--{boundary}--\r\n'.encode()
+            headers['Content-Type'] = f'multipart/form-data; boundary={boundary}'
+        req = urllib.request.Request(self.url + path, data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=300) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+
+    def get_json(self, path):
+        try:
+            with self.opener.open(self.url + path, timeout=300) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, None
+
+
+class TestClient:
+    """Requests through the Flask test client, in the calling thread"""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, fields=None, files=None):
+        if method == 'POST':
+            import io
+            data = dict(fields or {})
+            data.update({name: (io.BytesIO(content), filename) for name, (filename, content) in (files or {}).items()})
+            response = self.client.post(path, data=data, content_type='multipart/form-data')
+        else:
+            response = self.client.get(path)
+        response.get_data()
+        status = response.status_code
+        response.close()
+        return status
+
+    def get_json(self, path):
+        response = self.client.get(path)
+        return response.status_code, response.get_json(silent=True)
+
+
+def in_process_app():
+    """
+    Import the portal with its folders pointed at a scratch copy of the live configuration.
+    Importing app only defines the portal (no recovery runs; that is app.startup()), so the live
+    orders are never read or written. Returns (app module, scratch folder).
+    """
+    import app as portal
+    from config_store import pin
+    from order_pipeline import CONFIG_FILES
+    scratch = tempfile.mkdtemp(prefix='loadtest-')
+    data_dir = os.path.join(scratch, 'data')
+    os.makedirs(data_dir)
+    _, config_dir = pin(portal.MANUFACTURER_DATA_DIR)
+    for filename in CONFIG_FILES + ['config.json']:
+        if os.path.exists(os.path.join(config_dir, filename)):
+            shutil.copy(os.path.join(config_dir, filename), data_dir)
+    portal.MANUFACTURER_DATA_DIR = data_dir
+    portal.ORDERS_DIR = os.path.join(scratch, 'orders')
+    portal.BLOBS_DIR = os.path.join(scratch, 'blobs')
+    os.makedirs(portal.ORDERS_DIR)
+    os.makedirs(portal.BLOBS_DIR)
+    return portal, scratch
+
+
+# ---------- Load ----------
+
+def _order_form(rng, max_parts):
+    order_id = f"LT-{uuid.uuid4().hex[:10].upper()}"
+    fields = {'order_id': order_id, 'customer_name': 'Load Test', 'product_description': 'load test order',
+              'quantity': '1', 'num_cad_files': str(rng.randint(1, max_parts)),
+              'desired_delivery_time': str(round(rng.uniform(5, 200), 1)),
+              'offered_price': str(round(rng.uniform(3000, 9000), 2)), 'nda_confirmed': 'on'}
+    return order_id, fields, {'cad_files': ('part.pdf', CAD_FILE)}
+
+
+class LoadRun:
+    """Shared state of one run: known orders and per-route latencies"""
+
+    def __init__(self, mix, max_parts, seed):
+        self.routes = [r for r in ROUTES if mix.get(r)]
+        self.weights = [mix[r] for r in self.routes]
+        self.max_parts = max_parts
+        self.seed = seed
+        self.orders = []
+        self.lock = threading.Lock()
+        self.latencies = {r: [] for r in ROUTES}
+        self.errors = {r: 0 for r in ROUTES}
+        self.statuses = {r: {} for r in ROUTES}
+
+    def submit(self, client, rng):
+        order_id, fields, files = _order_form(rng, self.max_parts)
+        status = client.request('POST', '/submit_order', fields, files)
+        if status == 200:
+            with self.lock:
+                self.orders.append(order_id)
+        return status
+
+    def one(self, client, rng, route):
+        """Issue one request of `route`; returns its status code"""
+        if route == 'submit':
+            return self.submit(client, rng)
+        if route == 'admin':
+            return client.request('GET', '/admin')
+        order_id = rng.choice(self.orders)
+        if route == 'results':
+            return client.request('GET', f'/admin/results/{order_id}')
+        return client.request('GET', f'/admin/download/{order_id}/part.pdf')
+
+    def user(self, make_client, number, deadline, remaining, profiler=None):
+        client = make_client()
+        rng = random.Random(self.seed * 7919 + number)
+        if profiler is not None:
+            profiler.enable()
+        try:
+            while time.perf_counter() < deadline:
+                with self.lock:
+                    if remaining is not None:
+                        if remaining[0] <= 0:
+                            break
+                        remaining[0] -= 1
+                route = rng.choices(self.routes, self.weights)[0] if self.orders else 'submit'
+                started = time.perf_counter()
+                try:
+                    status = self.one(client, rng, route)
+                except Exception:
+                    status = 'exception'
+                seconds = time.perf_counter() - started
+                with self.lock:
+                    self.latencies[route].append(seconds)
+                    self.statuses[route][status] = self.statuses[route].get(status, 0) + 1
+                    if status == 'exception' or status >= 400 or (route == 'submit' and status != 200):
+                        self.errors[route] += 1
+        finally:
+            if profiler is not None:
+                profiler.disable()
+
+
+def _percentile(sorted_values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, max(0, int(round(q / 100.0 * len(sorted_values))) - 1))]
+
+
+def report(run, seconds):
+    """Per-route statistics of a finished run (latencies in milliseconds)"""
+    routes = {}
+    for route in ROUTES:
+        values = sorted(run.latencies[route])
+        if not values:
+            continue
+        ms = lambda v: round(v * 1000, 2)
+        routes[route] = dict(requests=len(values), errors=run.errors[route],
+                             throughput=round(len(values) / seconds, 3),
+                             p50=ms(_percentile(values, 50)), p95=ms(_percentile(values, 95)),
+                             p99=ms(_percentile(values, 99)), max=ms(values[-1]),
+                             statuses={str(k): v for k, v in sorted(run.statuses[route].items(), key=str)})
+    total = sum(r['requests'] for r in routes.values())
+    return dict(seconds=round(seconds, 3), requests=total, throughput=round(total / seconds, 3), routes=routes)
+
+
+def order_outcomes(client, order_ids):
+    """Final status of the submitted orders from GET /api/orders/<id>: {'processed': n, 'failed': n, ...}"""
+    outcomes = {}
+    for order_id in order_ids:
+        status, body = client.get_json(f'/api/orders/{order_id}')
+        outcome = body.get('status', 'unknown') if status == 200 and body else f'http {status}'
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+    return dict(sorted(outcomes.items()))
+
+
+def regressions(result, baseline, tolerance=0.2):
+    """Routes whose throughput fell or p95 rose by more than `tolerance` against a baseline report"""
+    found = []
+    for route, base in baseline.get('routes', {}).items():
+        now = result['routes'].get(route)
+        if now is None:
+            continue
+        if now['throughput'] < base['throughput'] * (1 - tolerance):
+            found.append(f"{route}: throughput {now['throughput']}/s < baseline {base['throughput']}/s")
+        if now['p95'] > base['p95'] * (1 + tolerance):
+            found.append(f"{route}: p95 {now['p95']} ms > baseline {base['p95']} ms")
+    return found
+
+
+def run_load(make_client, concurrency=4, duration=30.0, requests=None, mix=None, max_parts=6, seed=0,
+             profile=None):
+    """
+    Seed a few orders, then run `concurrency` virtual users for `duration` seconds (or until
+    `requests` requests). profile: path for merged cProfile stats of the users. Returns the report.
+    """
+    run = LoadRun(mix or DEFAULT_MIX, max_parts, seed)
+    client, rng = make_client(), random.Random(seed)
+    for _ in range(SEED_ORDERS):
+        run.submit(client, rng)
+    profilers = []
+    if profile:
+        import cProfile
+        profilers = [cProfile.Profile() for _ in range(concurrency)]
+    remaining = [requests] if requests else None
+    started = time.perf_counter()
+    deadline = started + (duration if duration else float('inf'))
+    threads = [threading.Thread(target=run.user, args=(make_client, n, deadline, remaining,
+                                                       profilers[n] if profilers else None))
+               for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result = report(run, time.perf_counter() - started)
+    result.update(concurrency=concurrency, mix=mix or DEFAULT_MIX, orders=order_outcomes(client, run.orders))
+    if profilers:
+        import pstats
+        stats = pstats.Stats(profilers[0])
+        for profiler in profilers[1:]:
+            stats.add(profiler)
+        stats.dump_stats(profile)
+    return result
+
+
+def start_flamegraph(path, pid):
+    """Start py-spy recording `pid` into an SVG flame graph; returns the process to stop"""
+    if shutil.which('py-spy') is None:
+        raise RuntimeError("--flamegraph needs py-spy (pip install py-spy)")
+    return subprocess.Popen(['py-spy', 'record', '--pid', str(pid), '--output', path, '--format', 'flamegraph',
+                             '--subprocesses', '--nonblocking'])
+
+
+def stop_flamegraph(proc):
+    proc.send_signal(signal.SIGINT)  # py-spy writes the SVG when interrupted
+    proc.wait(timeout=60)
+
+
+def print_report(result):
+    print(f"{'route':10s} {'requests':>9s} {'errors':>7s} {'req/s':>8s} {'p50 ms':>9s} {'p95 ms':>9s} "
+          f"{'p99 ms':>9s} {'max ms':>9s}")
+    for route, r in result['routes'].items():
+        print(f"{route:10s} {r['requests']:9d} {r['errors']:7d} {r['throughput']:8.2f} {r['p50']:9.1f} "
+              f"{r['p95']:9.1f} {r['p99']:9.1f} {r['max']:9.1f}")
+    print(f"{result['requests']} requests in {result['seconds']:.1f}s ({result['throughput']:.2f} req/s) "
+          f"with {result['concurrency']} users")
+    print(f"Submitted orders: {', '.join(f'{n} {status}' for status, n in result['orders'].items()) or 'none'}")
+
+
+def _parse_mix(text):
+    mix = {}
+    for item in text.split(','):
+        route, _, weight = item.partition('=')
+        if route not in ROUTES:
+            raise ValueError(f"unknown route {route!r}; use {', '.join(ROUTES)}")
+        mix[route] = float(weight or 1)
+    return mix
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the web portal")
+    parser.add_argument('--url', help="running server (default: Flask test client in this process)")
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=30.0, help="seconds of load (0: until --requests)")
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--mix', default=','.join(f"{k}={v}" for k, v in DEFAULT_MIX.items()),
+                        help="route weights, e.g. submit=1,admin=2,results=4,download=3")
+    parser.add_argument('--max-parts', type=int, default=6, help="largest num_cad_files of generated orders")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the report to this file")
+    parser.add_argument('--baseline', help="earlier --json report; exit 1 on regressions")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative regression")
+    parser.add_argument('--profile', help="cProfile stats of request handling (in-process only)")
+    parser.add_argument('--flamegraph', help="SVG flame graph recorded with py-spy")
+    parser.add_argument('--server-pid', type=int, help="process to profile with --flamegraph and --url")
+    parser.add_argument('--keep', action='store_true', help="keep the scratch folder of an in-process run")
+    args = parser.parse_args()
+    try:
+        mix = _parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    if not args.duration and not args.requests:
+        parser.error("--duration 0 needs --requests")
+    if args.url and args.profile:
+        parser.error("--profile only works in-process; use --flamegraph with --server-pid")
+    if args.url and args.flamegraph and not args.server_pid:
+        parser.error("--flamegraph with --url needs --server-pid")
+    if args.flamegraph and shutil.which('py-spy') is None:
+        parser.error("--flamegraph needs py-spy (pip install py-spy)")
+
+    scratch = None
+    if args.url:
+        make_client = lambda: HttpClient(args.url)
+    else:
+        portal, scratch = in_process_app()
+        make_client = lambda: TestClient(portal.app)
+    recorder = start_flamegraph(args.flamegraph, args.server_pid or os.getpid()) if args.flamegraph else None
+    try:
+        result = run_load(make_client, args.concurrency, args.duration, args.requests, mix, args.max_parts,
+                          args.seed, args.profile)
+    finally:
+        if recorder is not None:
+            stop_flamegraph(recorder)
+        if scratch and not args.keep:
+            shutil.rmtree(scratch, ignore_errors=True)
+    result['target'] = args.url or 'in-process'
+    print_report(result)
+    if scratch and args.keep:
+        print(f"Scratch folder kept: {scratch}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(result, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            found = regressions(result, json.load(f), args.tolerance)
+        for regression in found:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if found else 0)
@@ -0,0 +1,260 @@
+"""
+Order processing pipeline shared by the web portal and batch tools
+- Snapshot the manufacturer configuration into an order folder
+- Load the order, run the two-stage solver (or the LNS heuristic for large orders) and save the solution files
+- Compute the profit vs. lead-time frontier of a solved order
+- Quick feasibility / profit quotes from the relaxation, without running CBC
+- Orders are solved against the plant left free by the machine bookings of processed orders
+  (reservations.py) and book their own machines when solved
+- Every finished solve (processed or infeasible) is appended to the analytics store
+"""
+import os
+import time
+import threading
+from datetime import datetime
+
+import analytics
+import events
+import reservations
+from order_store import atomic_write_bytes, atomic_write_csv, atomic_write_json, read_json
+
+# solver, heuristic and pandas are imported where a solve needs them, so importing this module
+# (and the web app) stays cheap
+
+CONFIG_FILES = ['sections.csv', 'machines.csv', 'costs.csv', 'times.csv']
+FRONTIER_FILES = ['solution_frontier.csv', 'solution_frontier_assignments.csv']
+HEURISTIC_MIN_TASKS = 500   # engine "auto" switches to the heuristic from this many parts
+HEURISTIC_BUDGET = 30.0     # default wall-clock seconds for the heuristic
+
+_quote_data = {}  # config folder -> (file mtimes, DATA) for order_data()
+_quote_lock = threading.Lock()
+
+
+def snapshot_config(data_dir, order_dir):
+    """Copy manufacturer data (tables and config.json settings) to order folder"""
+    for filename in CONFIG_FILES:
+        src = os.path.join(data_dir, filename)
+        dst = os.path.join(order_dir, filename)
+        if os.path.exists(src):
+            with open(src, 'rb') as f:
+                atomic_write_bytes(dst, f.read())
+    settings = read_json(os.path.join(data_dir, 'config.json'))
+    if settings is not None:
+        atomic_write_json(os.path.join(order_dir, 'config.json'), settings)
+
+
+def solver_settings(order_dir):
+    """
+    Solver options chosen in the manufacturer settings snapshotted with the order.
+    template_key is the config version, so orders of one version share cached solver models.
+    """
+    settings = read_json(os.path.join(order_dir, 'config.json'), {})
+    return {'time_model': settings.get('time_model', 'total'),
+            'engine': settings.get('engine', 'auto'),
+            'time_budget': float(settings.get('time_budget', HEURISTIC_BUDGET)),
+            'section_branching': settings.get('section_branching', 'none'),
+            'sensitivity': bool(settings.get('sensitivity', False)),
+            'template_key': settings.get('version')}
+
+
+def load_previous_assignments(order_dir):
+    """Return the saved solution_assignments.csv of an order, or None"""
+    path = os.path.join(order_dir, 'solution_assignments.csv')
+    if not os.path.exists(path):
+        return None
+    import pandas as pd
+    return pd.read_csv(path)
+
+
+def _infeasible_quote_message(quoted):
+    reasons = '; '.join(f"section {j}: {reason}" for j, reason in sorted(quoted['reasons'].items()))
+    return f"Optimization infeasible (quick quote). No section can take this order: {reasons}."
+
+
+def order_data(config_dir, num_tasks, offered_price, delivery_time, cost_limit):
+    """
+    Solver data of a prospective order against a configuration folder, without an order folder.
+    The parsed configuration is cached per folder until its files change.
+    """
+    from solver import load_data_from_csv
+    paths = [os.path.join(config_dir, f) for f in CONFIG_FILES]
+    stamp = tuple(os.stat(p).st_mtime_ns if os.path.exists(p) else None for p in paths)
+    with _quote_lock:
+        cached = _quote_data.get(config_dir)
+    if cached is None or cached[0] != stamp:
+        base = load_data_from_csv(config_dir, params={'num_tasks_p': 0, 'order_price_Cc': 0,
+                                                      'time_limit_Tdesired': 0, 'cost_limit_Cdesired': 0})
+        cached = (stamp, base)
+        with _quote_lock:
+            _quote_data[config_dir] = cached
+    return dict(cached[1], p=int(num_tasks), Cc=float(offered_price),
+                T_desired=float(delivery_time), C_desired=float(cost_limit))
+
+
+def quote(config_dir, num_tasks, offered_price, delivery_time, cost_limit, time_model='total', orders_dir=None):
+    """
+    Quick quote of a prospective order against a configuration folder (see solver.quick_quote),
+    and against the bookings of the orders in `orders_dir` if given
+    """
+    from solver import quick_quote
+    DATA = order_data(config_dir, num_tasks, offered_price, delivery_time, cost_limit)
+    if orders_dir:
+        DATA, _ = reservations.residual_data(orders_dir, DATA)
+    return quick_quote(DATA, time_model=time_model)
+
+
+def solve_data(DATA, warm_start=None, precheck=False, progress=None, **solver_opts):
+    """
+    Solve loaded order data with the engine and options of solver_settings (engine, time_budget,
+    time_model, ...). Returns the solver result with summary and assignments; with sensitivity=True
+    the summary also carries solver.sensitivity_report of the plan.
+    Raises ValueError with an admin-readable message when the order is infeasible.
+    """
+    from solver import quick_quote, solve_two_stage_order_price
+    from heuristic import solve_heuristic
+    solver_opts = dict(solver_opts)
+    engine = solver_opts.pop('engine', 'auto')
+    time_budget = solver_opts.pop('time_budget', HEURISTIC_BUDGET)
+    sensitivity = solver_opts.pop('sensitivity', False)
+    if precheck:
+        quoted = quick_quote(DATA, time_model=solver_opts.get('time_model', 'total'))
+        if quoted['verdict'] == 'infeasible':
+            raise ValueError(_infeasible_quote_message(quoted))
+    if engine == 'heuristic' or (engine == 'auto' and DATA['p'] >= HEURISTIC_MIN_TASKS):
+        result = solve_heuristic(DATA, time_budget=time_budget, warm_start=warm_start, progress=progress,
+                                 time_model=solver_opts.get('time_model', 'total'))
+    else:
+        result = solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False,
+                                             warm_start=warm_start, progress=progress, **solver_opts)
+
+    # Check if result is valid
+    if result is None:
+        raise ValueError("Solver returned None. Check optimization constraints.")
+    if not isinstance(result, dict):
+        raise ValueError(f"Solver returned {type(result)} instead of dict.")
+
+    # Check if optimization was infeasible
+    if 'summary' not in result:
+        # Solver returned early due to infeasibility
+        status = result.get('status1', 'Unknown')
+        note = result.get('note', 'No details provided')
+
+        error_msg = f"Optimization infeasible (Status: {status}). "
+        if 'Infeasible' in status:
+            error_msg += f"Cannot satisfy constraints with current parameters. "
+            error_msg += f"Try: increasing cost limit (current: {DATA['C_desired']}), "
+            error_msg += f"increasing time limit (current: {DATA['T_desired']}), "
+            error_msg += f"or reducing offered price (current: {DATA['Cc']})."
+        else:
+            error_msg += f"Details: {note}"
+
+        raise ValueError(error_msg)
+
+    if 'assignments' not in result:
+        raise ValueError(f"Solver result missing 'assignments' key. Keys present: {list(result.keys())}")
+    if sensitivity:
+        from solver import sensitivity_report
+        result['summary']['sensitivity'] = sensitivity_report(DATA, result['assignments'],
+                                                              solver_opts.get('time_model', 'total'))
+    return result
+
+
+def run_order(order_dir, data_dir, warm_start=None, precheck=False, **solver_opts):
+    """
+    Snapshot config, solve the order in `order_dir` against the machines, machine hours and capacity
+    left free in its delivery window by other orders' bookings, book the plan's machines, save
+    solution files (or release the order's bookings when it is infeasible, or when its machines were
+    booked past its deadline by another order meanwhile) and record the solve in the analytics store
+    of the orders folder. An order already processed keeps its bookings when the re-run fails, as
+    it keeps its status and solution files; a caller that marks it failed releases them.
+    With precheck=True a quick quote runs first and orders it proves infeasible never reach CBC.
+    Raises ValueError with an admin-readable message when the order is infeasible.
+    """
+    from solver import load_data_from_csv
+    order_id = os.path.basename(os.path.normpath(order_dir))
+    orders_dir = os.path.dirname(os.path.normpath(order_dir))
+    started, now = time.perf_counter(), time.time()
+    snapshot_config(data_dir, order_dir)
+
+    def progress(stage, **timings):
+        events.publish(order_id, stage, elapsed=round(time.perf_counter() - started, 4), **timings)
+
+    # Run optimization
+    print(f"Loading data for order {order_id}...")
+    DATA, booked = reservations.residual_data(orders_dir, load_data_from_csv(order_dir), now, exclude=order_id)
+    print(f"Running solver for {DATA['p']} tasks...")
+    settings = dict(solver_settings(order_dir), **solver_opts)
+    if booked and settings.get('template_key'):
+        settings['template_key'] = f"{settings['template_key']}+{booked}"  # cached models hold A and Cap
+    try:
+        result = solve_data(DATA, warm_start=warm_start, precheck=precheck, progress=progress, **settings)
+        reservations.reserve(orders_dir, order_id, result['assignments'], now,
+                             deadline=now + float(DATA['T_desired']) * 3600)
+    except ValueError:
+        # a processed order keeps its saved plan and status when a re-run fails, so it keeps its bookings
+        if (read_json(os.path.join(order_dir, 'customer_data.json')) or {}).get('status') != 'processed':
+            reservations.release(orders_dir, order_id)
+        _record_solve(order_dir, DATA, None, settings)
+        raise
+
+    # Save results (assignments first: a summary on disk always has its assignments)
+    atomic_write_csv(os.path.join(order_dir, 'solution_assignments.csv'), result['assignments'])
+    atomic_write_json(os.path.join(order_dir, 'solution_summary.json'), result['summary'])
+    for filename in FRONTIER_FILES:  # computed from the previous snapshot
+        path = os.path.join(order_dir, filename)
+        if os.path.exists(path):
+            os.remove(path)
+    _record_solve(order_dir, DATA, result, settings)
+    result['elapsed'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def _record_solve(order_dir, DATA, result, settings):
+    """Append a finished solve to the analytics store; the store is derived data, so failures only warn"""
+    order_dir = os.path.normpath(order_dir)
+    try:
+        analytics.record(os.path.dirname(order_dir), os.path.basename(order_dir), DATA, result,
+                         time_model=settings.get('time_model', 'total'), config_version=settings.get('template_key'))
+    except Exception as e:
+        print(f"⚠️ Analytics not recorded for order {os.path.basename(order_dir)}: {e}")
+
+
+def run_frontier(order_dir, points=5, **solver_opts):
+    """
+    Compute the profit vs. lead-time frontier of an order from its config snapshot and the plant
+    left free by other orders' bookings, and save solution_frontier.csv (one row per point) and
+    solution_frontier_assignments.csv.
+    Returns the frontier DataFrame; raises ValueError when the order is infeasible.
+    """
+    from solver import load_data_from_csv, pareto_frontier
+    if not all(os.path.exists(os.path.join(order_dir, f)) for f in ['params.csv'] + CONFIG_FILES[:3]):
+        raise ValueError("Order has no configuration snapshot yet; process it first.")
+    solver_opts = dict(solver_settings(order_dir), **solver_opts)
+    for option in ('engine', 'time_budget', 'section_branching', 'template_key', 'sensitivity'):
+        solver_opts.pop(option)
+    order_dir = os.path.normpath(order_dir)
+    DATA, _ = reservations.residual_data(os.path.dirname(order_dir), load_data_from_csv(order_dir),
+                                         exclude=os.path.basename(order_dir))
+    result = pareto_frontier(DATA, points=points, msg=False, **solver_opts)
+    if 'frontier' not in result:
+        raise ValueError(f"Optimization infeasible (Status: {result.get('status')}). {result.get('note', '')}")
+    atomic_write_csv(os.path.join(order_dir, 'solution_frontier_assignments.csv'), result['assignments'])
+    atomic_write_csv(os.path.join(order_dir, 'solution_frontier.csv'), result['frontier'])
+    return result['frontier']
+
+
+def update_order_status(order_dir, status, **fields):
+    """Rewrite customer_data.json with a new status (and extra fields) and publish the transition"""
+    path = os.path.join(order_dir, 'customer_data.json')
+    customer_data = read_json(path)
+    if customer_data is None:
+        raise ValueError(f"Order data missing or unreadable: {path}")
+    customer_data['status'] = status
+    if status == 'processed':
+        customer_data['processing_timestamp'] = datetime.now().isoformat()
+        customer_data.pop('error_message', None)
+        customer_data.pop('error_details', None)
+    customer_data.update(fields)
+    atomic_write_json(path, customer_data)
+    events.publish(customer_data.get('order_id'), status, error=customer_data.get('error_message'))
+    return customer_data
@@ -0,0 +1,185 @@
+"""
+Crash-safe order state
+- Atomic writes: temp file in the same folder, fsync, rename over the target
+- Write-ahead journal (orders/.journal.jsonl): a 'begin' record (with the order's customer data)
+  before a solve starts and a 'commit' record once its final status is on disk. After a crash,
+  recover() finds solves that began but never committed so they can be re-queued.
+- process_lock() serializes writers of shared files across threads and processes
+"""
+import os
+import io
+import csv
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+JOURNAL_NAME = '.journal.jsonl'
+TMP_SUFFIX = '.tmp'
+
+_process_locks = {}
+_process_locks_guard = threading.Lock()
+
+
+def _fsync_dir(path):
+    if hasattr(os, 'O_DIRECTORY'):  # POSIX only; rename durability on Windows needs no dir fsync
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+@contextmanager
+def process_lock(path):
+    """
+    Exclusive section for writers of a shared file: a thread lock per `path`, plus an flock on
+    the lock file `path` so the app and CLI tools (reoptimize.py) exclude each other on POSIX.
+    """
+    with _process_locks_guard:
+        lock = _process_locks.setdefault(os.path.abspath(path), threading.Lock())
+    with lock:
+        with open(path, 'a') as handle:
+            if fcntl:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            yield  # closing the file releases the flock
+
+
+def atomic_write_bytes(path, data):
+    """Replace `path` with `data` so readers only ever see the old or the new file"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}{TMP_SUFFIX}"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
+
+
+def atomic_write_json(path, obj):
+    atomic_write_bytes(path, json.dumps(obj, indent=2).encode('utf-8'))
+
+
+def atomic_write_csv(path, df):
+    """Atomically write a DataFrame as CSV (index dropped, like the rest of the app)"""
+    buf = io.StringIO()
+    df.to_csv(buf, index=False)
+    atomic_write_bytes(path, buf.getvalue().encode('utf-8'))
+
+
+def atomic_write_rows(path, columns, rows):
+    """Atomically write dict rows as CSV with the stdlib writer (for small files on paths that avoid pandas)"""
+    buf = io.StringIO()
+    writer = csv.DictWriter(buf, fieldnames=columns, lineterminator='\n')
+    writer.writeheader()
+    writer.writerows(rows)
+    atomic_write_bytes(path, buf.getvalue().encode('utf-8'))
+
+
+def read_json(path, default=None):
+    """Load a JSON file, returning `default` if it is missing or unreadable"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def _journal_path(orders_dir):
+    return os.path.join(orders_dir, JOURNAL_NAME)
+
+
+def _append_journal(orders_dir, record):
+    line = json.dumps(dict(record, ts=time.time()), separators=(',', ':')) + '\n'
+    path = _journal_path(orders_dir)
+    with process_lock(path + '.lock'):
+        with open(path, 'a') as f:
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def journal_begin(orders_dir, order_id, customer_data=None):
+    """Record that a solve of `order_id` starts (with the order payload to restore it from)"""
+    _append_journal(orders_dir, {'op': 'begin', 'order_id': order_id, 'customer_data': customer_data})
+
+
+def journal_commit(orders_dir, order_id, status):
+    """Record that the final status of `order_id` is durably written"""
+    _append_journal(orders_dir, {'op': 'commit', 'order_id': order_id, 'status': status})
+
+
+def _read_journal(path):
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break  # torn last line from a crash mid-append
+    return records
+
+
+def recover(orders_dir):
+    """
+    Bring the order store back to a consistent state after a restart:
+    - delete leftover temp files from interrupted atomic writes
+    - for every solve that began but never committed, restore customer_data.json from the
+      journal if it is missing or unreadable and mark the order 'queued'
+    - compact the journal down to those pending records (not rewritten if that changes nothing)
+    Returns the order ids whose solve has to be re-run. Every solve without a commit counts as
+    interrupted, so call it once before the app's workers start, never while they run.
+    """
+    if not os.path.exists(orders_dir):
+        return []
+    for order_id in os.listdir(orders_dir):
+        order_dir = os.path.join(orders_dir, order_id)
+        if os.path.isdir(order_dir):
+            for filename in os.listdir(order_dir):
+                if filename.endswith(TMP_SUFFIX):
+                    os.remove(os.path.join(order_dir, filename))
+
+    journal_path = _journal_path(orders_dir)
+    if not os.path.exists(journal_path):
+        return []
+    with process_lock(journal_path + '.lock'):
+        pending = {}
+        for record in _read_journal(journal_path):
+            if record.get('op') == 'begin':
+                previous = pending.get(record['order_id'])
+                if previous and previous.get('customer_data') and not record.get('customer_data'):
+                    record['customer_data'] = previous['customer_data']
+                pending[record['order_id']] = record
+            elif record.get('op') == 'commit':
+                pending.pop(record['order_id'], None)
+
+        requeue = []
+        for order_id, record in pending.items():
+            order_dir = os.path.join(orders_dir, order_id)
+            data_path = os.path.join(order_dir, 'customer_data.json')
+            customer_data = read_json(data_path) or record.get('customer_data')
+            if not customer_data or not os.path.isdir(order_dir):
+                continue
+            customer_data['status'] = 'queued'
+            atomic_write_json(data_path, customer_data)
+            requeue.append(order_id)
+
+        # keep only the re-queued begins; leave the file alone when that changes nothing
+        lines = ''.join(json.dumps(pending[o], separators=(',', ':')) + '\n' for o in requeue).encode('utf-8')
+        with open(journal_path, 'rb') as f:
+            unchanged = f.read() == lines
+        if not unchanged:
+            atomic_write_bytes(journal_path, lines)
+    return requeue
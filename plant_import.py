@@ -0,0 +1,204 @@
+"""
+Bulk import of a whole plant configuration from uploaded tables
+- sections, machines, costs and (optionally) times as CSV or Parquet files with the column names
+  of the published CSVs
+- Validation is done per column over whole tables (missing columns, non-numeric or negative values,
+  duplicate keys, unknown sections / machines, (section, machine, task) combinations without a cost
+  or time) and every problem is reported at once
+- Valid tables are published as one new config version
+"""
+import os
+from datetime import datetime
+
+from config_store import publish
+
+# file: (key columns, value columns, optional value columns)
+TABLES = {
+    'sections.csv': (['section_id'], ['fixed_setup_cost', 'capacity'], ['output_score_optional']),
+    'machines.csv': (['section_id', 'machine_id'], ['available', 'time_per_task'], []),
+    'costs.csv':    (['section_id', 'machine_id', 'task_id'], ['variable_cost'], []),
+    'times.csv':    (['section_id', 'machine_id', 'task_id'], ['time_per_task'], []),
+}
+OPTIONAL_TABLES = ['times.csv']  # machines.csv time_per_task is used when absent or empty
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+MAX_EXAMPLES = 5  # rows / keys listed per error
+
+
+class PlantImportError(ValueError):
+    """Uploaded tables failed validation; `errors` lists every problem found"""
+
+    def __init__(self, errors):
+        super().__init__(f"{len(errors)} problem(s) in the uploaded tables")
+        self.errors = errors
+
+
+def read_table(stream, filename):
+    """Read one uploaded table; Parquet by file extension (needs pyarrow), CSV otherwise"""
+    import pandas as pd
+    if filename.lower().endswith(PARQUET_EXTENSIONS):
+        try:
+            return pd.read_parquet(stream)
+        except ImportError:
+            raise ValueError("reading Parquet needs pyarrow installed; upload CSV instead")
+    return pd.read_csv(stream)
+
+
+def _rows(mask):
+    """File row numbers (header is row 1) of the True entries of `mask`"""
+    rows = [int(i) + 2 for i in mask[mask].index[:MAX_EXAMPLES]]
+    more = int(mask.sum()) - len(rows)
+    return ', '.join(map(str, rows)) + (f" and {more} more" if more > 0 else "")
+
+
+def _keys(df, columns):
+    keys = [tuple(int(v) for v in key) for key in df[columns].head(MAX_EXAMPLES).itertuples(index=False)]
+    text = ', '.join(str(key[0]) if len(key) == 1 else str(key) for key in keys)
+    return text + (f" and {len(df) - len(keys)} more" if len(df) > len(keys) else "")
+
+
+def _check_table(filename, df, errors):
+    """
+    Column, type and sign checks of one table. Returns it with numeric columns, or None when its
+    key columns are unusable (the cross-table checks then skip it).
+    """
+    import pandas as pd
+    keys, values, optional = TABLES[filename]
+    missing = [c for c in keys + values if c not in df.columns]
+    if missing:
+        errors.append(f"{filename}: missing column(s) {', '.join(missing)}")
+        return None
+    df = df[keys + values + [c for c in optional if c in df.columns]].copy()
+    keys_ok = True
+    for column in df.columns:
+        raw = df[column]
+        df[column] = pd.to_numeric(raw, errors='coerce')
+        blank = df[column].isna() & (raw.isna() | (raw.astype(str).str.strip() == ''))
+        bad = df[column].isna() & ~blank
+        if column in optional:
+            blank[:] = False
+        problems = [(blank, "is empty"), (bad, "is not a number"), (df[column] < 0, "is negative")]
+        if column in keys or column in ('capacity', 'available'):
+            problems.append((df[column].notna() & (df[column] % 1 != 0), "must be a whole number"))
+        if column == 'available':
+            problems.append((df[column].notna() & ~df[column].isin([0, 1]), "must be 0 or 1"))
+        valid = True
+        for mask, problem in problems:
+            if mask.any():
+                errors.append(f"{filename}: {column} {problem} in row(s) {_rows(mask)}")
+                valid = False
+        if valid and (column in keys or column in ('capacity', 'available')):
+            df[column] = df[column].astype(int)
+        keys_ok = keys_ok and (valid or column not in keys)
+    if not keys_ok:
+        return None
+    duplicated = df.duplicated(keys, keep='first')
+    if duplicated.any():
+        errors.append(f"{filename}: duplicate {'/'.join(keys)} in row(s) {_rows(duplicated)}")
+    return df
+
+
+def _check_coverage(filename, df, machines, max_tasks, errors):
+    """Every (section, machine, task) of the plant has a row and no row is for an unknown machine"""
+    import pandas as pd
+    keys = TABLES[filename][0]
+    outside = ~df['task_id'].between(1, max_tasks)
+    if outside.any():
+        errors.append(f"{filename}: task_id outside 1..{max_tasks} in row(s) {_rows(outside)}")
+    expected = machines[['section_id', 'machine_id']].drop_duplicates().merge(
+        pd.DataFrame({'task_id': range(1, max_tasks + 1)}), how='cross')
+    joined = expected.merge(df[keys].drop_duplicates(), on=keys, how='outer', indicator=True)
+    missing = joined[joined['_merge'] == 'left_only']
+    if len(missing):
+        errors.append(f"{filename}: no row for {len(missing)} (section, machine, task) combination(s): "
+                      f"{_keys(missing, keys)}")
+    unknown = joined[(joined['_merge'] == 'right_only') & joined['task_id'].between(1, max_tasks)]
+    if len(unknown):
+        errors.append(f"{filename}: {len(unknown)} row(s) for machines not in machines.csv: "
+                      f"{_keys(unknown.drop_duplicates(['section_id', 'machine_id']), ['section_id', 'machine_id'])}")
+
+
+def validate_tables(tables, max_tasks=None, errors=()):
+    """
+    Validate uploaded tables {filename: DataFrame}; a None table could not be read (its error is
+    in `errors`, which is reported together with the validation problems).
+    max_tasks defaults to the largest task_id in costs.csv.
+    Returns the cleaned tables ready for config_store.publish; raises PlantImportError with all problems.
+    """
+    import pandas as pd
+    errors = list(errors)
+    for filename in TABLES:
+        if filename not in tables and filename not in OPTIONAL_TABLES:
+            errors.append(f"{filename}: no file uploaded")
+    clean = {}
+    for filename, df in tables.items():
+        if filename not in TABLES:
+            errors.append(f"{filename}: not a configuration table ({', '.join(TABLES)})")
+            continue
+        if df is None:
+            continue
+        if filename in OPTIONAL_TABLES and df.empty:
+            clean[filename] = pd.DataFrame(columns=TABLES[filename][0] + TABLES[filename][1])
+            continue
+        checked = _check_table(filename, df, errors)
+        if checked is not None:
+            clean[filename] = checked
+
+    sections, machines, costs = (clean.get(f) for f in ('sections.csv', 'machines.csv', 'costs.csv'))
+    if sections is not None and machines is not None:
+        orphan = ~machines['section_id'].isin(sections['section_id'])
+        if orphan.any():
+            errors.append(f"machines.csv: section_id not in sections.csv in row(s) {_rows(orphan)}")
+        empty = ~sections['section_id'].isin(machines['section_id'])
+        if empty.any():
+            errors.append(f"sections.csv: section(s) without machines: {_keys(sections[empty], ['section_id'])}")
+    if max_tasks is None and costs is not None:
+        max_tasks = int(costs['task_id'].max()) if len(costs) else 0
+    if max_tasks is not None and max_tasks < 1:
+        errors.append("max_tasks must be at least 1" if costs is None or len(costs) else "costs.csv has no rows")
+    elif max_tasks is not None and machines is not None:
+        for filename in ('costs.csv', 'times.csv'):
+            if clean.get(filename) is not None and len(clean[filename]):
+                _check_coverage(filename, clean[filename], machines, max_tasks, errors)
+
+    if errors:
+        raise PlantImportError(errors)
+    clean['times.csv'] = clean.get('times.csv', pd.DataFrame(columns=TABLES['times.csv'][0] + TABLES['times.csv'][1]))
+    for filename, df in clean.items():
+        clean[filename] = df.sort_values(TABLES[filename][0]).reset_index(drop=True)
+    clean['max_tasks'] = max_tasks
+    return clean
+
+
+def import_plant(data_dir, tables, settings, max_tasks=None, errors=()):
+    """
+    Validate uploaded tables and publish them as a new config version, keeping the other settings
+    (cost limit, solver options) of `settings`. Returns the new version name.
+    """
+    clean = validate_tables(tables, max_tasks, errors)
+    max_tasks = clean.pop('max_tasks')
+    machines = clean['machines.csv']
+    counts = machines.groupby('section_id').size()
+    settings = {k: v for k, v in settings.items() if k != 'version'}
+    settings.update(max_tasks=max_tasks, num_sections=int(len(clean['sections.csv'])),
+                    machines_per_section=[int(counts[s]) for s in clean['sections.csv']['section_id']],
+                    last_updated=datetime.now().isoformat())
+    settings.setdefault('default_cost_limit', 999999)
+    return publish(data_dir, clean, settings)
+
+
+def read_uploads(files):
+    """
+    Read uploaded files keyed by table name (sections, machines, costs, times).
+    Returns ({filename: DataFrame or None if unreadable}, read errors) for import_plant.
+    """
+    tables, errors = {}, []
+    for filename in TABLES:
+        upload = files.get(os.path.splitext(filename)[0])
+        if upload is None or not upload.filename:
+            continue
+        try:
+            tables[filename] = read_table(upload.stream, upload.filename)
+        except Exception as e:
+            tables[filename] = None
+            errors.append(f"{filename}: {e}")
+    return tables, errors
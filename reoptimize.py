@@ -0,0 +1,201 @@
+"""
+Incremental re-optimization after a manufacturer config change
+- Diff each order's config snapshot against the live manufacturer config version
+- Re-solve only the orders the diff can affect, warm-started from their previous solution
+
+Usage: python reoptimize.py [--dry-run] [--workers N]
+"""
+import os
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import events
+import reservations
+from config_store import pin
+from order_store import journal_begin, journal_commit, read_json
+from order_pipeline import run_order, load_previous_assignments, update_order_status
+
+# (file, key columns, {value column: direction}) — direction +1 means a higher value is better
+# for the order (e.g. capacity), -1 means lower is better (costs, times), 0 means neutral
+TABLE_SPECS = {
+    'sections.csv': (['section_id'],
+                     {'fixed_setup_cost': -1, 'capacity': +1, 'output_score_optional': 0}),
+    'machines.csv': (['section_id', 'machine_id'],
+                     {'available': +1, 'time_per_task': -1}),
+    'costs.csv':    (['section_id', 'machine_id', 'task_id'], {'variable_cost': -1}),
+    'times.csv':    (['section_id', 'machine_id', 'task_id'], {'time_per_task': -1}),
+}
+
+
+def _read_table(base_path, filename):
+    path = os.path.join(base_path, filename)
+    if not os.path.exists(path):
+        return None
+    import pandas as pd
+    return pd.read_csv(path)
+
+
+def diff_config(old_dir, new_dir):
+    """
+    Compare the config tables in two folders.
+    Returns a list of changes: dict(table, key, column, old, new, improving)
+    A change of the lead time model (config.json) or of times.csv between empty and non-empty
+    is reported with key=None.
+    """
+    import pandas as pd
+    changes = []
+    old_model = (read_json(os.path.join(old_dir, 'config.json')) or {}).get('time_model', 'total')
+    new_model = (read_json(os.path.join(new_dir, 'config.json')) or {}).get('time_model', 'total')
+    if old_model != new_model:
+        changes.append(dict(table='config.json', key=None, column='time_model', old=old_model, new=new_model,
+                            improving=True))
+    for filename, (keys, columns) in TABLE_SPECS.items():
+        old_df, new_df = _read_table(old_dir, filename), _read_table(new_dir, filename)
+        old_empty = old_df is None or old_df.empty
+        new_empty = new_df is None or new_df.empty
+        if old_empty and new_empty:
+            continue
+        if filename == 'times.csv' and old_empty != new_empty:
+            # switching between t_ij and t_ijk changes every order's time model
+            changes.append(dict(table=filename, key=None, column=None, old=None, new=None, improving=True))
+            continue
+        if old_empty or new_empty:
+            old_df = old_df if not old_empty else pd.DataFrame(columns=keys + list(columns))
+            new_df = new_df if not new_empty else pd.DataFrame(columns=keys + list(columns))
+
+        cols = [c for c in columns if c in old_df.columns or c in new_df.columns]
+        merged = old_df.reindex(columns=keys + cols).merge(
+            new_df.reindex(columns=keys + cols), on=keys, how='outer', suffixes=('_old', '_new'))
+        for row in merged.to_dict('records'):
+            key = tuple(int(row[k]) for k in keys)
+            for c in cols:
+                old, new = row[f'{c}_old'], row[f'{c}_new']
+                if pd.isna(old) and pd.isna(new):
+                    continue
+                if not pd.isna(old) and not pd.isna(new) and float(old) == float(new):
+                    continue
+                if pd.isna(old):
+                    improving = True       # new section / machine / task option
+                elif pd.isna(new):
+                    improving = False      # option removed
+                else:
+                    improving = (float(new) - float(old)) * columns[c] > 0
+                changes.append(dict(table=filename, key=key, column=c,
+                                    old=None if pd.isna(old) else float(old),
+                                    new=None if pd.isna(new) else float(new),
+                                    improving=improving))
+    return changes
+
+
+def is_order_affected(order_dir, changes):
+    """
+    An order needs a re-solve if a change touches what its solution uses (chosen section's
+    setup/capacity, a used machine, a used (machine, task) cost) or if a change is improving
+    anywhere (it could open a better section or machine). Worsening changes to options the
+    solution does not use cannot change either stage's optimum.
+    Returns (affected, reason).
+    """
+    customer_data = read_json(os.path.join(order_dir, 'customer_data.json'), {})
+    p = int(customer_data.get('num_cad_files') or 0)
+
+    used_sections, used_machines, used_tasks = set(), set(), set()
+    assignments = load_previous_assignments(order_dir) if customer_data.get('status') == 'processed' else None
+    if assignments is not None:
+        for r in assignments.itertuples():
+            used_sections.add(int(r.section_id))
+            used_machines.add((int(r.section_id), int(r.machine_id)))
+            used_tasks.add((int(r.section_id), int(r.machine_id), int(r.task_id)))
+
+    for ch in changes:
+        key = ch['key']
+        if key is None:
+            return True, f"{ch['table']} switched time model"
+        if len(key) == 3 and key[2] > p:
+            continue  # task beyond this order's part count
+        touches = (key in used_tasks if len(key) == 3 else
+                   key in used_machines if len(key) == 2 else
+                   key[0] in used_sections)
+        if touches or ch['improving']:
+            return True, f"{ch['table']} {key} {ch['column']}: {ch['old']} -> {ch['new']}"
+    return False, None
+
+
+def find_affected_orders(orders_dir, data_dir):
+    """Return [(order_id, reason)] for processed/failed orders whose snapshot differs in a relevant way"""
+    affected = []
+    if not os.path.exists(orders_dir):
+        return affected
+    version, config_dir = pin(data_dir)
+    for order_id in sorted(os.listdir(orders_dir)):
+        order_dir = os.path.join(orders_dir, order_id)
+        data_path = os.path.join(order_dir, 'customer_data.json')
+        if not os.path.exists(data_path) or not os.path.exists(os.path.join(order_dir, 'params.csv')):
+            continue
+        customer_data = read_json(data_path) or {}
+        if customer_data.get('status') not in ('processed', 'failed'):
+            continue  # still in flight
+        if version and customer_data.get('config_version') == version:
+            continue  # already solved against the live version
+        hit, reason = is_order_affected(order_dir, diff_config(order_dir, config_dir))
+        if hit:
+            affected.append((order_id, reason))
+    return affected
+
+
+def _reoptimize_one(orders_dir, config_dir, config_version, order_id):
+    order_dir = os.path.join(orders_dir, order_id)
+    warm_start = load_previous_assignments(order_dir)
+    journal_begin(orders_dir, order_id)
+    try:
+        result = run_order(order_dir, config_dir, warm_start=warm_start)
+        update_order_status(order_dir, 'processed', reoptimized=True, config_version=config_version)
+        journal_commit(orders_dir, order_id, 'processed')
+        return dict(order_id=order_id, status='processed',
+                    chosen_section=result['summary']['chosen_section'],
+                    total_profit=result['summary']['total_profit'], time=result['summary']['time'])
+    except Exception as e:
+        # stale solution files would no longer match the snapshot, nor would their bookings
+        for filename in ['solution_summary.json', 'solution_assignments.csv']:
+            path = os.path.join(order_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+        reservations.release(orders_dir, order_id)
+        update_order_status(order_dir, 'failed', error_message=str(e), reoptimized=True,
+                            config_version=config_version)
+        journal_commit(orders_dir, order_id, 'failed')
+        return dict(order_id=order_id, status='failed', error=str(e))
+
+
+def reoptimize_orders(orders_dir, data_dir, order_ids=None, max_workers=4):
+    """
+    Re-solve the given orders (default: every affected order) against the current config.
+    The config version is pinned once, so every order in the batch sees the same tables.
+    Solves run concurrently (each CBC call is its own process). Returns one report row per order.
+    """
+    if order_ids is None:
+        order_ids = [order_id for order_id, _ in find_affected_orders(orders_dir, data_dir)]
+    if not order_ids:
+        return []
+    config_version, config_dir = pin(data_dir)
+    for order_id in order_ids:
+        events.publish(order_id, 'queued')
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(lambda oid: _reoptimize_one(orders_dir, config_dir, config_version, oid), order_ids))
+
+
+if __name__ == '__main__':
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    parser = argparse.ArgumentParser(description="Re-solve orders affected by a manufacturer config change")
+    parser.add_argument('--orders', default=os.path.join(base_dir, 'orders'))
+    parser.add_argument('--data', default=os.path.join(base_dir, 'data'))
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--dry-run', action='store_true', help="only list affected orders")
+    args = parser.parse_args()
+
+    affected = find_affected_orders(args.orders, args.data)
+    for order_id, reason in affected:
+        print(f"  {order_id}: {reason}")
+    print(f"{len(affected)} order(s) affected")
+    if not args.dry_run:
+        for row in reoptimize_orders(args.orders, args.data, [o for o, _ in affected], args.workers):
+            print(row)
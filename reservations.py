@@ -0,0 +1,266 @@
+"""
+Machine reservation calendar of processed orders (orders/.reservations.jsonl)
+- reserve() books every machine of an order's plan for its hours, queued after the machine's
+  existing bookings, and refuses bookings that would end after the order's deadline; a re-solve
+  replaces the order's bookings, and a failed one releases them unless the order stays processed
+- The log is append-only ('reserve' / 'release' records, compacted at startup); each process
+  keeps an index of it per (section, machine): time bucket -> bookings overlapping the bucket,
+  with the occupied buckets sorted, so a delivery window is a bisect plus its few bookings
+- residual_data() feeds the booked plant into solver DATA: a booked machine's load is capped by
+  the hours between the end of its last booking and the end of the delivery window (T_machine),
+  it becomes unavailable (A = 0) without time for even its fastest task, and a section's
+  capacity drops by the most parts booked on it at any one time in the window
+"""
+import os
+import json
+import math
+import time
+import hashlib
+import threading
+from bisect import bisect_left, insort
+
+from order_store import atomic_write_bytes, process_lock
+
+LOG_NAME = '.reservations.jsonl'
+BUCKET_SECONDS = 3600
+
+_indexes = {}  # orders folder -> (log inode, bytes replayed, Calendar)
+_index_lock = threading.Lock()
+
+
+class Calendar:
+    """Bookings (section, machine, start, end, tasks) of every order, indexed by machine and time bucket"""
+
+    def __init__(self):
+        self.orders = {}    # order_id -> [booking]
+        self.buckets = {}   # (section, machine) -> {bucket: [(order_id, start, end, tasks)]}
+        self.occupied = {}  # (section, machine) -> sorted buckets that hold bookings
+
+    @staticmethod
+    def _span(start, end):
+        return range(int(start // BUCKET_SECONDS), int(math.ceil(end / BUCKET_SECONDS)))
+
+    def add(self, order_id, bookings):
+        self.remove(order_id)
+        self.orders[order_id] = bookings
+        for j, i, start, end, tasks in bookings:
+            index = self.buckets.setdefault((j, i), {})
+            occupied = self.occupied.setdefault((j, i), [])
+            for bucket in self._span(start, end):
+                if bucket not in index:
+                    index[bucket] = []
+                    insort(occupied, bucket)
+                index[bucket].append((order_id, start, end, tasks))
+
+    def remove(self, order_id):
+        for j, i, start, end, _ in self.orders.pop(order_id, []):
+            index, occupied = self.buckets[(j, i)], self.occupied[(j, i)]
+            for bucket in self._span(start, end):
+                index[bucket] = [entry for entry in index[bucket] if entry[0] != order_id]
+                if not index[bucket]:
+                    del index[bucket]
+                    del occupied[bisect_left(occupied, bucket)]
+
+    def window(self, machine, since, until, exclude=None):
+        """Bookings of `machine` overlapping [since, until) as {(order_id, start): (start, end, tasks)}"""
+        occupied = self.occupied.get(machine, [])
+        index = self.buckets.get(machine, {})
+        found = {}
+        first, last = bisect_left(occupied, int(since // BUCKET_SECONDS)), bisect_left(occupied, math.ceil(until / BUCKET_SECONDS))
+        for bucket in occupied[first:last]:
+            for order_id, start, end, tasks in index[bucket]:
+                if order_id != exclude and start < until and end > since:
+                    found[(order_id, start)] = (start, end, tasks)
+        return found
+
+    def free_from(self, machine, exclude=None):
+        """End of the machine's last booking (0 when it has none)"""
+        occupied = self.occupied.get(machine, [])
+        index = self.buckets.get(machine, {})
+        for bucket in reversed(occupied):
+            ends = [end for order_id, _, end, _ in index[bucket] if order_id != exclude]
+            if ends:
+                return max(ends)
+        return 0.0
+
+
+def log_path(orders_dir):
+    return os.path.join(orders_dir, LOG_NAME)
+
+
+def _calendar(orders_dir):
+    """This process's index of the log, brought up to date with records appended since; call under _index_lock"""
+    path = log_path(orders_dir)
+    inode = os.stat(path).st_ino if os.path.exists(path) else None
+    cached = _indexes.get(orders_dir)
+    if cached is None or cached[0] != inode:
+        cached = (inode, 0, Calendar())  # first use, or compact() replaced the log
+    inode, offset, calendar = cached
+    if inode is not None:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # torn last line from a crash mid-append; the next append starts a new one
+                offset += len(line)
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('op') == 'reserve':
+                    calendar.add(record['order_id'], [tuple(b) for b in record['bookings']])
+                elif record.get('op') == 'release':
+                    calendar.remove(record['order_id'])
+    _indexes[orders_dir] = (inode, offset, calendar)
+    return calendar
+
+
+def _append(orders_dir, record):
+    path = log_path(orders_dir)
+    line = json.dumps(dict(record, ts=time.time()), separators=(',', ':')) + '\n'
+    with open(path, 'ab') as f:
+        if f.tell() and not _ends_with_newline(path):
+            f.write(b'\n')
+        f.write(line.encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _ends_with_newline(path):
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+def reserve(orders_dir, order_id, assignments, now=None, deadline=None):
+    """
+    Book the machines of a solved order from its assignments (section_id, machine_id, time in hours):
+    each machine for its load, from `now` or the end of its last booking if that is later.
+    Replaces earlier bookings of the order. Returns the bookings [(section, machine, start, end, tasks)].
+    Raises ValueError and books nothing if a booking would end after `deadline` (epoch seconds),
+    e.g. when another order booked the machine after this one was solved.
+    """
+    now = time.time() if now is None else now
+    loads = {}
+    for j, i, hours in zip(assignments['section_id'], assignments['machine_id'], assignments['time']):
+        load = loads.setdefault((int(j), int(i)), [0.0, 0])
+        load[0] += float(hours)
+        load[1] += 1
+    with process_lock(log_path(orders_dir) + '.lock'):
+        with _index_lock:
+            calendar = _calendar(orders_dir)
+            bookings = []
+            for (j, i), (hours, tasks) in sorted(loads.items()):
+                start = max(now, calendar.free_from((j, i), exclude=order_id))
+                bookings.append((j, i, round(start, 3), round(start + hours * 3600, 3), tasks))
+            late = [b for b in bookings if deadline is not None and b[3] > deadline + 1.0]
+            if late:
+                j, i, start, end, _ = late[0]
+                raise ValueError(f"Machine {i} of section {j} is booked until "
+                                 f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(start))}; the plan's "
+                                 f"{(end - start) / 3600:.2f}h on it would end after the delivery deadline. "
+                                 f"Re-process the order against the current bookings.")
+            _append(orders_dir, {'op': 'reserve', 'order_id': order_id, 'bookings': bookings})
+            calendar.add(order_id, bookings)
+    return bookings
+
+
+def release(orders_dir, order_id):
+    """Free all bookings of an order (no-op if it has none)"""
+    with process_lock(log_path(orders_dir) + '.lock'):
+        with _index_lock:
+            calendar = _calendar(orders_dir)
+            if order_id in calendar.orders:
+                _append(orders_dir, {'op': 'release', 'order_id': order_id})
+                calendar.remove(order_id)
+
+
+def residual_data(orders_dir, DATA, now=None, exclude=None):
+    """
+    DATA of an order against the booked plant for its delivery window [now, now + T_desired hours);
+    bookings of `exclude` (the order itself, when re-solved) are ignored. reserve() queues an order
+    after a machine's last booking, so a booked machine gets the hours from there to the end of the
+    window as its cap T_machine {(section, machine): hours}.
+    Returns (DATA, signature): signature is '' when the bookings change no availability or capacity,
+    else a short digest of the changes (cached solver models are built from them; the hour caps are
+    set per order).
+    """
+    now = time.time() if now is None else now
+    until = now + float(DATA['T_desired']) * 3600
+    A, Cap, T_machine = dict(DATA['A']), dict(DATA['Cap']), dict(DATA.get('T_machine', {}))
+    p = int(DATA['p'])
+    with _index_lock:
+        calendar = _calendar(orders_dir)
+        if not calendar.orders:
+            return DATA, ''
+        for j in DATA['sections']:
+            changes = []  # (time, parts) as bookings of the section start and end
+            for i in DATA['I'][j]:
+                for start, end, tasks in calendar.window((j, i), now, until, exclude=exclude).values():
+                    changes += [(max(start, now), tasks), (end, -tasks)]
+                free = calendar.free_from((j, i), exclude=exclude)
+                if free <= now:
+                    continue
+                left = max(until - free, 0.0) / 3600
+                T_machine[(j, i)] = min(left, T_machine.get((j, i), left))
+                fastest = (min(float(DATA['t_ijk'][(j, i, k)]) for k in range(1, p + 1)) if DATA['t_ijk']
+                           else float(DATA['t_ij'][(j, i)]))
+                if left < fastest - 1e-9:
+                    A[(j, i)] = 0
+            parts = peak = 0
+            for _, change in sorted(changes):  # ends sort before starts at the same time
+                parts += change
+                peak = max(peak, parts)
+            Cap[j] = max(int(Cap[j]) - peak, 0)
+    changed = sorted(key for key in A if A[key] != DATA['A'][key]) + sorted(
+        (j, Cap[j]) for j in Cap if Cap[j] != DATA['Cap'][j])
+    if not T_machine:
+        return DATA, ''
+    if not changed:
+        return dict(DATA, T_machine=T_machine), ''
+    return dict(DATA, A=A, Cap=Cap, T_machine=T_machine), hashlib.sha1(repr(changed).encode('utf-8')).hexdigest()[:12]
+
+
+def booked(orders_dir, since=None, until=None):
+    """
+    Every booking overlapping [since, until) (None: unbounded) as (section, machine, order_id, start,
+    end, tasks); bookings that had finished when the log was last compacted are gone
+    """
+    with _index_lock:
+        calendar = _calendar(orders_dir)
+        return sorted((j, i, order_id, start, end, tasks)
+                      for order_id, bookings in calendar.orders.items() for j, i, start, end, tasks in bookings
+                      if (since is None or end > since) and (until is None or start < until))
+
+
+def schedule(orders_dir, since, until):
+    """Bookings overlapping [since, until) per machine: [{section_id, machine_id, booked_hours, bookings}]"""
+    with _index_lock:
+        calendar = _calendar(orders_dir)
+        machines = []
+        for machine in sorted(calendar.occupied):
+            bookings = calendar.window(machine, since, until)
+            if bookings:
+                machines.append(dict(
+                    section_id=machine[0], machine_id=machine[1],
+                    booked_hours=round(sum(min(e, until) - max(s, since) for s, e, _ in bookings.values()) / 3600, 4),
+                    bookings=[dict(order_id=order_id, start=start, end=end, tasks=tasks)
+                              for (order_id, _), (start, end, tasks) in sorted(bookings.items(), key=lambda b: b[1][0])]))
+    return machines
+
+
+def compact(orders_dir, now=None):
+    """Rewrite the log with only the orders that still have a booking ending after `now`; returns how many"""
+    now = time.time() if now is None else now
+    path = log_path(orders_dir)
+    if not os.path.exists(path):
+        return 0
+    with process_lock(path + '.lock'):
+        with _index_lock:
+            calendar = _calendar(orders_dir)
+            live = {o: b for o, b in calendar.orders.items() if any(end > now for _, _, _, end, _ in b)}
+            atomic_write_bytes(path, ''.join(
+                json.dumps({'op': 'reserve', 'order_id': o, 'bookings': b, 'ts': now}, separators=(',', ':')) + '\n'
+                for o, b in live.items()).encode('utf-8'))
+            _indexes.pop(orders_dir, None)
+    return len(live)
@@ -0,0 +1,73 @@
+"""
+Cached, paged access to solution_assignments.csv for the results page
+- Each assignments file is parsed once per change (keyed by size/mtime) and kept in a small LRU
+- Per-machine totals and load timelines are computed once per parse
+- Sort orders are computed lazily and cached, pages are plain slices
+"""
+import os
+import threading
+from collections import OrderedDict
+
+CACHE_SIZE = 32
+SORT_COLUMNS = ['task_id', 'machine_id', 'var_cost', 'time']
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _build_entry(path):
+    import pandas as pd
+    df = pd.read_csv(path)
+    df = df.sort_values(['machine_id', 'task_id'], kind='stable').reset_index(drop=True)
+
+    # Tasks on one machine run back to back: start offsets are the running time per machine
+    ends = df.groupby('machine_id')['time'].cumsum()
+    df['start'] = ends - df['time']
+    df['end'] = ends
+
+    machines = (df.groupby(['section_id', 'machine_id'])
+                  .agg(tasks=('task_id', 'size'), total_cost=('var_cost', 'sum'), total_time=('time', 'sum'))
+                  .reset_index())
+    busiest = float(machines['total_time'].max()) if len(machines) else 0.0
+    machines['load_pct'] = (machines['total_time'] / busiest * 100.0) if busiest > 0 else 0.0
+    return {'df': df, 'machines': machines.to_dict('records'), 'makespan': busiest, 'orders': {}}
+
+
+def _entry(path):
+    info = os.stat(path)
+    key = (info.st_size, info.st_mtime_ns)
+    with _cache_lock:
+        cached = _cache.get(path)
+        if cached is not None and cached[0] == key:
+            _cache.move_to_end(path)
+            return cached[1]
+    entry = _build_entry(path)
+    with _cache_lock:
+        _cache[path] = (key, entry)
+        _cache.move_to_end(path)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+
+def assignments_page(path, page=1, per_page=100, sort='task_id', descending=False):
+    """
+    One page of assignments plus whole-order aggregates.
+    Returns dict(rows, page, pages, per_page, total, sort, descending, machines, makespan)
+    """
+    entry = _entry(path)
+    df = entry['df']
+    sort = sort if sort in SORT_COLUMNS else 'task_id'
+
+    order_key = (sort, descending)
+    order = entry['orders'].get(order_key)
+    if order is None:
+        order = df.sort_values([sort, 'task_id'], ascending=[not descending, True], kind='stable').index.to_numpy()
+        entry['orders'][order_key] = order
+
+    total = len(df)
+    pages = max((total + per_page - 1) // per_page, 1)
+    page = min(max(page, 1), pages)
+    rows = df.iloc[order[(page - 1) * per_page:page * per_page]].to_dict('records')
+    return dict(rows=rows, page=page, pages=pages, per_page=per_page, total=total,
+                sort=sort, descending=descending, machines=entry['machines'], makespan=entry['makespan'])
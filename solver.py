@@ -3,19 +3,39 @@ Core optimization solver module - NO CHANGES TO LOGIC
 Extracted from original solve_order.py to keep optimization logic separate
 """
 import os
-import pandas as pd
+import csv
+import time
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pulp
 
+SECTION_BRANCHING = ("none", "sos1", "priority", "both")
+TEMPLATE_CACHE_SIZE = 8  # built Stage 1/Stage 2 model pairs kept per (config version, order size, options)
 
-def load_data_from_csv(base_path="./data"):
-    """Load all input CSVs and build DATA dictionary for solver"""
-    sections_df = pd.read_csv(f"{base_path}/sections.csv")
-    machines_df = pd.read_csv(f"{base_path}/machines.csv")
-    costs_df    = pd.read_csv(f"{base_path}/costs.csv")
-    params_df   = pd.read_csv(f"{base_path}/params.csv")
+_templates = OrderedDict()  # key -> [idle template, ...], most recently used last
+_templates_lock = threading.Lock()
+
+
+def _read_rows(path):
+    """Rows of a CSV file as dicts of strings (the stdlib reader keeps solver start-up free of pandas)"""
+    with open(path, newline="") as fh:
+        return list(csv.DictReader(fh))
+
+
+def load_data_from_csv(base_path="./data", params=None):
+    """Load all input CSVs and build DATA dictionary for solver (params: {param: value} instead of params.csv)"""
+    sections_rows = _read_rows(f"{base_path}/sections.csv")
+    machines_rows = _read_rows(f"{base_path}/machines.csv")
+    costs_rows    = _read_rows(f"{base_path}/costs.csv")
+    num = lambda v: int(float(v))
 
     # Params — robustly find order price key
-    param_map = {str(r["param"]).strip(): float(r["value"]) for _, r in params_df.iterrows()}
+    if params is None:
+        param_map = {str(r["param"]).strip(): float(r["value"]) for r in _read_rows(f"{base_path}/params.csv")}
+    else:
+        param_map = {str(k): float(v) for k, v in params.items()}
     p = int(param_map["num_tasks_p"])
     # accept either of these names; interpret as TOTAL order price
     Cc = float(param_map.get("order_price_Cc", param_map.get("customer_price_per_unit_Cc", None)))
@@ -24,43 +44,200 @@ def load_data_from_csv(base_path="./data"):
     T_desired = float(param_map["time_limit_Tdesired"])
     C_desired = float(param_map["cost_limit_Cdesired"])
 
-    sections = [int(x) for x in sections_df["section_id"].tolist()]
-    I = {int(j): [int(i) for i in machines_df[machines_df.section_id==j]["machine_id"].tolist()] for j in sections}
+    sections = [num(r["section_id"]) for r in sections_rows]
+    I = {j: [num(r["machine_id"]) for r in machines_rows if num(r["section_id"]) == j] for j in sections}
 
-    f = {int(r.section_id): float(r.fixed_setup_cost) for _, r in sections_df.iterrows()}
-    Cap = {int(r.section_id): int(r.capacity) for _, r in sections_df.iterrows()}
-    O = {}
-    if "output_score_optional" in sections_df.columns:
-        for _, r in sections_df.iterrows():
-            if pd.notna(r["output_score_optional"]):
-                O[int(r.section_id)] = float(r["output_score_optional"])
+    f = {num(r["section_id"]): float(r["fixed_setup_cost"]) for r in sections_rows}
+    Cap = {num(r["section_id"]): num(r["capacity"]) for r in sections_rows}
+    O = {num(r["section_id"]): float(r["output_score_optional"]) for r in sections_rows
+         if (r.get("output_score_optional") or "").strip()}
 
-    A = {(int(r.section_id), int(r.machine_id)): int(r.available) for _, r in machines_df.iterrows()}
+    A = {(num(r["section_id"]), num(r["machine_id"])): num(r["available"]) for r in machines_rows}
 
     # Times: prefer task-specific if present
     t_ijk, t_ij = None, None
     times_path = f"{base_path}/times.csv"
     if os.path.exists(times_path):
-        tmp = pd.read_csv(times_path)
-        if not tmp.empty:
-            t_ijk = {(int(r.section_id), int(r.machine_id), int(r.task_id)): float(r.time_per_task)
-                     for _, r in tmp.iterrows()}
+        tmp = _read_rows(times_path)
+        if tmp:
+            t_ijk = {(num(r["section_id"]), num(r["machine_id"]), num(r["task_id"])): float(r["time_per_task"])
+                     for r in tmp}
     if t_ijk is None:
-        t_ij = {(int(r.section_id), int(r.machine_id)): float(r.time_per_task) for _, r in machines_df.iterrows()}
+        t_ij = {(num(r["section_id"]), num(r["machine_id"])): float(r["time_per_task"]) for r in machines_rows}
 
-    C_var = {(int(r.section_id), int(r.machine_id), int(r.task_id)): float(r.variable_cost)
-             for _, r in costs_df.iterrows()}
+    C_var = {(num(r["section_id"]), num(r["machine_id"]), num(r["task_id"])): float(r["variable_cost"])
+             for r in costs_rows}
 
     return dict(p=p, Cc=Cc, T_desired=T_desired, C_desired=C_desired,
                 sections=sections, I=I, f=f, Cap=Cap, O=O, A=A, t_ij=t_ij, t_ijk=t_ijk, C_var=C_var)
 
 
-def solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False):
+def _task_symmetry(sections, I, tasks, C_var, t_ijk, ordering=False):
     """
-    Two-stage optimization solver - CORE LOGIC UNCHANGED
-    Stage 1: Maximize profit
-    Stage 2: Minimize time while maintaining optimal profit
+    Detect interchangeable tasks when every task on a machine takes the same time (t_ij).
+    Returns {section: mode} plus the task classes / orderings used by the reformulation:
+      - "counts":  tasks with identical cost columns are merged into one integer count per machine
+      - "ordered": costs are Monge (cheap machines gain most from expensive tasks), so staircase
+                   ordering constraints remove equivalent permutations without cutting off the optimum
+                   (only with ordering=True: CBC usually solves these faster without the extra rows)
+      - "binary":  no exploitable structure, plain per-task binaries
+    The admin form's cost tables (base cost x (1 + 1.5% per task number)) give every task its own
+    cost column, so "counts" never applies to them and auto keeps the binary model. They are Monge,
+    so ordering=True orders them, but CBC solved them slower that way at every size measured
+    (10-40 parts, both time models), so auto leaves ordering off.
+    """
+    info = {}
+    for j in sections:
+        groups = {}
+        for k in tasks:
+            groups.setdefault(tuple(C_var[(j,i,k)] for i in I[j]), []).append(k)
+        classes = sorted(groups.values(), key=lambda g: g[0])
+        info[j] = {"mode": "binary", "classes": [[k] for k in tasks], "order": None}
+        if t_ijk:
+            continue
+        if len(classes) < len(tasks):
+            info[j].update(mode="counts", classes=classes)
+            continue
+        if not ordering or len(I[j]) < 2 or len(tasks) < 2:
+            continue
+        # machines by ascending cost, tasks by descending cost; adjacent 2x2 Monge check is sufficient
+        machs = sorted(I[j], key=lambda i: (sum(C_var[(j,i,k)] for k in tasks), i))
+        order = sorted(tasks, key=lambda k: (-sum(C_var[(j,i,k)] for i in I[j]), k))
+        monge = all(C_var[(j,a,k)] + C_var[(j,b,l)] <= C_var[(j,a,l)] + C_var[(j,b,k)] + 1e-9
+                    for a, b in zip(machs, machs[1:]) for k, l in zip(order, order[1:]))
+        if monge:
+            info[j].update(mode="ordered", order=(machs, order))
+    return info
+
+
+def _lpt_schedule(ctx):
     """
+    Greedy makespan plan for a warm start: per section, tasks in decreasing order of their fastest
+    time are each placed on the available machine where they finish earliest (LPT rule for
+    unrelated machines). Returns the most profitable plan that meets the time (per machine), cost
+    and capacity caps as [(section, machine, task), ...], or None if no section's plan does.
+    """
+    best, best_cost = None, None
+    for j in ctx["sections"]:
+        machs = [i for i in ctx["I"][j] if ctx["A"][(j,i)]]
+        if not machs or ctx["p"] > ctx["Cap"][j]:
+            continue
+        rep, time, cost = ctx["rep"], ctx["time"], ctx["cost"]
+        tasks = sorted(range(1, ctx["p"]+1), key=lambda k: (-min(time[(j,i,rep[(j,k)])] for i in machs), k))
+        load = {i: 0.0 for i in machs}
+        cap = {i: ctx["T_machine"][(j,i)] for i in machs}
+        plan, total = [], ctx["f"][j]
+        for k in tasks:
+            g = rep[(j,k)]
+            i = min(machs, key=lambda i: (load[i] + time[(j,i,g)] > cap[i] + 1e-9, load[i] + time[(j,i,g)],
+                                          cost[(j,i,g)]))
+            load[i] += time[(j,i,g)]
+            total += cost[(j,i,g)]
+            plan.append((j, i, k))
+        if all(load[i] <= cap[i] + 1e-9 for i in machs) and total <= ctx["C_desired"] + 1e-9:
+            if best is None or total < best_cost:  # same order price in every section
+                best, best_cost = plan, total
+    return best
+
+
+def _plan_time(rows, time_model):
+    """Lead time of a plan: summed over machines ("total") or the busiest machine ("makespan")"""
+    if time_model != "makespan":
+        return sum(r["time"] for r in rows)
+    loads = {}
+    for r in rows:
+        loads[r["machine_id"]] = loads.get(r["machine_id"], 0.0) + r["time"]
+    return max(loads.values(), default=0.0)
+
+
+def _set_warm_start(X, Y, ctx, assigned):
+    """Seed initial values from a previous assignment [(section, machine, task), ...]"""
+    counts = {}
+    for j, i, k in assigned:
+        g = ctx["rep"].get((j, k))
+        if g is not None and (j, i, g) in Y:
+            counts[(j, i, g)] = counts.get((j, i, g), 0) + 1
+    chosen = {j for j, _, _ in assigned}
+    for j, var in X.items():
+        var.setInitialValue(1 if j in chosen else 0)
+    for c, var in Y.items():
+        var.setInitialValue(counts.get(c, 0))
+
+
+def _build_stage_model(name, sense, ctx):
+    """
+    Build the shared part of a stage model: section choice, time definition/cap, per-machine
+    time caps, X-scaled cost & capacity caps and the assign-every-part rows.
+    Columns are keyed (j, i, g) where g is the first task of a task class; a class of
+    n interchangeable tasks becomes one integer count in [0, n] (plain binary when n == 1).
+    """
+    sections, I, A = ctx["sections"], ctx["I"], ctx["A"]
+    f, Cap, T_desired, C_desired = ctx["f"], ctx["Cap"], ctx["T_desired"], ctx["C_desired"]
+    cols, size, cost, time = ctx["cols"], ctx["size"], ctx["cost"], ctx["time"]
+
+    m = pulp.LpProblem(name, sense)
+    X = pulp.LpVariable.dicts("X", sections, lowBound=0, upBound=1, cat=pulp.LpBinary)
+    Y = {(j,i,g): pulp.LpVariable(f"Y_{j}_{i}_{g}", lowBound=0, upBound=size[(j,g)],
+                                  cat=(pulp.LpBinary if size[(j,g)] == 1 else pulp.LpInteger))
+         for (j,i,g) in cols}
+    T = {j: pulp.LpVariable(f"T_{j}", lowBound=0) for j in sections}
+    jcols = {j: [(i,g) for (jj,i,g) in cols if jj == j] for j in sections}
+
+    # Choose exactly one section
+    m += pulp.lpSum([X[j] for j in sections]) == 1
+
+    # Time definition + cap: machines run one after another ("total") or in parallel ("makespan",
+    # T is at least every machine's load). Each machine's load is also capped by the hours it has
+    # left in the delivery window (T_machine; redundant unless other orders booked it)
+    for j in sections:
+        for i in I[j]:
+            load = pulp.lpSum([time[(j,i,g)]*Y[(j,i,g)] for g in ctx["groups"][j]])
+            if ctx["time_model"] == "makespan":
+                L = pulp.LpVariable(f"L_{j}_{i}", lowBound=0)
+                m += L == load
+                m += T[j] >= L
+                load = L
+            m += load <= ctx["T_machine"][(j,i)] * X[j], f"machine_cap_{j}_{i}"
+        if ctx["time_model"] != "makespan":
+            m += T[j] >= pulp.lpSum([time[(j,i,g)]*Y[(j,i,g)] for (i,g) in jcols[j]])
+        m += T[j] <= T_desired * X[j], f"time_cap_{j}"
+
+    # Cost & capacity caps, scaled by X[j]: the section's columns are all 0 unless it is chosen, so
+    # no big-M is needed and the LP relaxation keeps each cap at its fraction of the section
+    for j in sections:
+        m += (pulp.lpSum([cost[(j,i,g)]*Y[(j,i,g)] for (i,g) in jcols[j]]) + f[j] * X[j]
+              <= C_desired * X[j]), f"cost_cap_{j}"
+        m += pulp.lpSum([Y[(j,i,g)] for (i,g) in jcols[j]]) <= Cap[j] * X[j], f"section_cap_{j}"
+
+        for (i,g) in jcols[j]:
+            m += Y[(j,i,g)] <= size[(j,g)] * X[j]
+            m += Y[(j,i,g)] <= size[(j,g)] * A[(j,i)]
+
+    # Every part must be assigned exactly once in the chosen section
+    for j in sections:
+        for g in ctx["groups"][j]:
+            m += pulp.lpSum([Y[(j,i,g)] for i in I[j]]) == size[(j,g)] * X[j]
+
+    # Symmetry breaking: task r (in descending-cost order) never sits on a later machine than task r+1
+    for j in sections:
+        order = ctx["symmetry"][j]["order"]
+        if order is None:
+            continue
+        machs, ranked = order
+        for k, l in zip(ranked, ranked[1:]):
+            for q in range(len(machs) - 1):
+                m += (pulp.lpSum([Y[(j,i,l)] for i in machs[:q+1]])
+                      <= pulp.lpSum([Y[(j,i,k)] for i in machs[:q+1]]))
+
+    var_cost = pulp.lpSum([cost[c]*Y[c] for c in cols])
+    setup_cost = pulp.lpSum([f[j]*X[j] for j in sections])
+    return m, X, Y, T, var_cost, setup_cost
+
+
+def _model_context(DATA, symmetry="auto", time_model="total"):
+    """Normalize DATA and build the column context shared by every stage model (see _build_stage_model)"""
+    if time_model not in ("total", "makespan"):
+        raise ValueError(f"Unknown time_model {time_model!r}; use 'total' or 'makespan'.")
     p = int(DATA["p"]); Cc = float(DATA["Cc"]); T_desired = float(DATA["T_desired"]); C_desired = float(DATA["C_desired"])
     sections = list(map(int, DATA["sections"]))
     I = {int(j): [int(i) for i in DATA["I"][j]] for j in sections}
@@ -70,127 +247,234 @@ def solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False):
     A = {(int(j), int(i)): int(v) for (j,i), v in DATA["A"].items()}
     t_ij = DATA["t_ij"]; t_ijk = DATA["t_ijk"]
     C_var = {(int(j), int(i), int(k)): float(v) for (j,i,k), v in DATA["C_var"].items()}
+    T_machine = {(j, i): min(T_desired, float(DATA.get("T_machine", {}).get((j, i), T_desired)))
+                 for j in sections for i in I[j]}
 
     tasks = list(range(1, p+1))
-    BIG_M = 1e6
 
-    # ---------- Stage 1: Max Profit ----------
-    m1 = pulp.LpProblem("Stage1_MaxProfit", pulp.LpMaximize)
-    X = pulp.LpVariable.dicts("X", sections, lowBound=0, upBound=1, cat=pulp.LpBinary)
-    Y = {(j,i,k): pulp.LpVariable(f"Y_{j}_{i}_{k}", lowBound=0, upBound=1, cat=pulp.LpBinary)
-         for j in sections for i in I[j] for k in tasks}
-    T = {j: pulp.LpVariable(f"T_{j}", lowBound=0) for j in sections}
+    if symmetry == "off":
+        sym = {j: {"mode": "binary", "classes": [[k] for k in tasks], "order": None} for j in sections}
+    else:
+        sym = _task_symmetry(sections, I, tasks, C_var, t_ijk, ordering=(symmetry == "order"))
+    members = {(j, cls[0]): cls for j in sections for cls in sym[j]["classes"]}
+    cols = [(j,i,g) for j in sections for i in I[j] for cls in sym[j]["classes"] for g in cls[:1]]
+    return dict(
+        p=p, Cc=Cc, O=O, time_model=time_model,
+        sections=sections, I=I, A=A, f=f, Cap=Cap, T_desired=T_desired, C_desired=C_desired, T_machine=T_machine,
+        symmetry=sym, cols=cols, members=members,
+        groups={j: [cls[0] for cls in sym[j]["classes"]] for j in sections},
+        size={key: len(cls) for key, cls in members.items()},
+        rep={(j, k): g for (j, g), cls in members.items() for k in cls},
+        cost={(j,i,g): C_var[(j,i,g)] for (j,i,g) in cols},
+        time={(j,i,g): (t_ijk[(j,i,g)] if t_ijk else t_ij[(j,i)]) for (j,i,g) in cols},
+    )
 
-    # Order-level revenue (single price for the whole order)
-    revenue = pulp.lpSum([X[j]*Cc for j in sections])
-    var_cost = pulp.lpSum([C_var[(j,i,k)]*Y[(j,i,k)] for j in sections for i in I[j] for k in tasks])
-    setup_cost = pulp.lpSum([f[j]*X[j] for j in sections])
-    m1 += revenue - (var_cost + setup_cost)
 
-    # Choose exactly one section
-    m1 += pulp.lpSum([X[j] for j in sections]) == 1
+def _extract_assignment(ctx, X, Y):
+    """Chosen section and its [(machine, task)] list, dealing each class's tasks out by the machine counts"""
+    chosen = [j for j in ctx["sections"] if pulp.value(X[j]) > 0.5][0]
+    used = []
+    for g in ctx["groups"][chosen]:
+        pending = list(ctx["members"][(chosen, g)])
+        for i in ctx["I"][chosen]:
+            n = int(round(pulp.value(Y[(chosen,i,g)]) or 0))
+            used += [(i, k) for k in pending[:n]]
+            pending = pending[n:]
+    return chosen, used
 
-    # Time definition + cap
-    for j in sections:
-        if t_ijk:
-            m1 += T[j] >= pulp.lpSum([t_ijk[(j,i,k)]*Y[(j,i,k)] for i in I[j] for k in tasks])
-        else:
-            m1 += T[j] >= pulp.lpSum([t_ij[(j,i)]*Y[(j,i,k)] for i in I[j] for k in tasks])
-        m1 += T[j] <= T_desired * X[j]
 
-    # Cost & capacity caps (gated)
-    for j in sections:
-        m1 += (pulp.lpSum([C_var[(j,i,k)]*Y[(j,i,k)] for i in I[j] for k in tasks]) + f[j]
-               <= C_desired + BIG_M*(1 - X[j]))
-        m1 += pulp.lpSum([Y[(j,i,k)] for i in I[j] for k in tasks]) \
-               <= Cap[j] + BIG_M*(1 - X[j])
+def _assignment_rows(DATA, chosen, used):
+    return [dict(section_id=chosen, machine_id=i, task_id=k, var_cost=DATA["C_var"][(chosen,i,k)],
+                 time=(DATA["t_ijk"][(chosen,i,k)] if DATA["t_ijk"] else DATA["t_ij"][(chosen,i)]))
+            for (i,k) in sorted(used, key=lambda x:(x[0], x[1]))]
 
-        for i in I[j]:
-            for k in tasks:
-                m1 += Y[(j,i,k)] <= X[j]
-                m1 += Y[(j,i,k)] <= A[(j,i)]
 
-    # Every part must be assigned exactly once in the chosen section
-    for j in sections:
-        for k in tasks:
-            m1 += pulp.lpSum([Y[(j,i,k)] for i in I[j]]) == X[j]
+def _stage_models(ctx, tiny_tie_break):
+    """
+    Build the Stage 1 / Stage 2 model pair of an order shape. Only these coefficients depend on the
+    order itself and are (re)set by _set_order_params: the time_cap_j, machine_cap_j_i and cost_cap_j
+    rows, the Stage 1 objective (price and sense) and the Stage 2 profit_lo lock row.
+    """
+    sections, cols = ctx["sections"], ctx["cols"]
+    m1, X, Y, T, var_cost, setup_cost = _build_stage_model("Stage1_MaxProfit", pulp.LpMaximize, ctx)
+    m1 += pulp.lpSum([X[j]*ctx["Cc"] for j in sections]) - (var_cost + setup_cost)
 
-    _ = m1.solve(pulp.PULP_CBC_CMD(msg=msg))
-    status1 = pulp.LpStatus[m1.status]
-    if status1 != "Optimal":
-        return {"status1": status1, "note": "Stage 1 not optimal or infeasible."}
+    m2, X2, Y2, T2, var_cost2, setup_cost2 = _build_stage_model("Stage2_MinTime", pulp.LpMinimize, ctx)
+    m2 += (pulp.lpSum([T2[j] for j in sections])
+           + tiny_tie_break * pulp.lpSum([Y2[c] for c in cols]))
+    profit2 = pulp.lpSum([X2[j]*ctx["Cc"] for j in sections]) - (var_cost2 + setup_cost2)
+    m2 += profit2 >= 0, "profit_lo"
+    return dict(m1=m1, X=X, Y=Y, T=T, m2=m2, X2=X2, Y2=Y2, T2=T2,
+                variables=m1.variables() + m2.variables())
+
+
+def _set_order_params(models, ctx, sign):
+    """Write an order's price, time (total and per machine) and cost limits into a model pair and clear values of a previous solve"""
+    m1, X, Y = models["m1"], models["X"], models["Y"]
+    Cc, f = ctx["Cc"], ctx["f"]
+    for j in ctx["sections"]:
+        m1.constraints[f"time_cap_{j}"].expr[X[j]] = -ctx["T_desired"]
+        m1.constraints[f"cost_cap_{j}"].expr[X[j]] = f[j] - ctx["C_desired"]
+        m1.objective[X[j]] = sign * (Cc - f[j])
+        models["m2"].constraints["profit_lo"].expr[models["X2"][j]] = Cc - f[j]
+        models["m2"].constraints[f"time_cap_{j}"].expr[models["X2"][j]] = -ctx["T_desired"]
+        models["m2"].constraints[f"cost_cap_{j}"].expr[models["X2"][j]] = f[j] - ctx["C_desired"]
+        for i in ctx["I"][j]:
+            m1.constraints[f"machine_cap_{j}_{i}"].expr[X[j]] = -ctx["T_machine"][(j,i)]
+            models["m2"].constraints[f"machine_cap_{j}_{i}"].expr[models["X2"][j]] = -ctx["T_machine"][(j,i)]
+    for c in ctx["cols"]:
+        m1.objective[Y[c]] = -sign * ctx["cost"][c]
+    m1.sense = pulp.LpMinimize if sign < 0 else pulp.LpMaximize
+    for var in models["variables"]:
+        var.varValue = None
+
+
+def _solve_cbc(m, X, msg=False, warm_start=False, branching="none"):
+    """
+    Run CBC on a stage model. branching "sos1" declares the section choice X as an SOS1 set,
+    "priority" has CBC branch on X before any task column, "both" does both.
+    """
+    m.sos1 = {"sections": {var: k + 1 for k, var in enumerate(X.values())}} if branching in ("sos1", "both") else {}
+    if branching == "none":
+        return m.solve(pulp.PULP_CBC_CMD(msg=msg, warmStart=warm_start))
+    options, priorities = [], None
+    if branching in ("priority", "both"):
+        fd, priorities = tempfile.mkstemp(suffix=".csv")
+        with os.fdopen(fd, "w") as fh:
+            fh.write("name,priority\n" + "".join(f"{var.name},1\n" for var in X.values()))
+        options.append(f"priorityIn {priorities}")
+    try:
+        # PuLP's MPS writer renames columns and drops SOS sets; the LP file keeps both
+        return m.solve(pulp.PULP_CBC_CMD(msg=msg, warmStart=warm_start, options=options), use_mps=False)
+    finally:
+        if priorities:
+            os.remove(priorities)
+
+
+def _acquire_models(key, ctx, tiny_tie_break):
+    """An idle model pair for `key` from the template cache, or a newly built one (key None: never cached)"""
+    if key is not None:
+        with _templates_lock:
+            idle = _templates.get(key)
+            if idle:
+                _templates.move_to_end(key)
+                return idle.pop()
+    return _stage_models(ctx, tiny_tie_break)
+
+
+def _release_models(key, models):
+    """Return a model pair to the template cache, evicting the least recently used shapes"""
+    if key is None:
+        return
+    with _templates_lock:
+        _templates.setdefault(key, []).append(models)
+        _templates.move_to_end(key)
+        while len(_templates) > TEMPLATE_CACHE_SIZE:
+            _templates.popitem(last=False)
+
+
+def solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False, symmetry="auto", warm_start=None,
+                                progress=None, time_model="total", template_key=None, section_branching="none"):
+    """
+    Two-stage optimization solver - CORE LOGIC UNCHANGED
+    Stage 1: Maximize profit
+    Stage 2: Minimize time while maintaining optimal profit
 
-    profit1 = pulp.value(m1.objective)
+    symmetry="auto" merges interchangeable tasks into integer counts (t_ij times, see _task_symmetry),
+    symmetry="order" additionally adds staircase ordering rows for Monge cost tables, and
+    symmetry="off" keeps the reference one-binary-per-(section, machine, task) model. With costs
+    from the admin form no two tasks cost the same, so "auto" solves the same model as "off".
 
-    # ---------- Stage 2: Min Time (lock profit) ----------
-    m2 = pulp.LpProblem("Stage2_MinTime", pulp.LpMinimize)
-    X2 = pulp.LpVariable.dicts("X", sections, lowBound=0, upBound=1, cat=pulp.LpBinary)
-    Y2 = {(j,i,k): pulp.LpVariable(f"Y_{j}_{i}_{k}", lowBound=0, upBound=1, cat=pulp.LpBinary)
-          for j in sections for i in I[j] for k in tasks}
-    T2 = {j: pulp.LpVariable(f"T_{j}", lowBound=0) for j in sections}
+    warm_start: optional assignments DataFrame from a previous solve (solution_assignments.csv);
+    it seeds Stage 1 and Stage 2 is then seeded with the Stage-1 optimum.
 
-    m2 += (pulp.lpSum([T2[j] for j in sections])
-           + tiny_tie_break * pulp.lpSum([Y2[(j,i,k)] for j in sections for i in I[j] for k in tasks]))
-    m2 += pulp.lpSum([X2[j] for j in sections]) == 1
+    progress: optional callback progress(stage, **timings) called with "solving_stage1" and
+    "solving_stage2" (timings in seconds) before each CBC run.
 
-    for j in sections:
-        if t_ijk:
-            m2 += T2[j] >= pulp.lpSum([t_ijk[(j,i,k)]*Y2[(j,i,k)] for i in I[j] for k in tasks])
-        else:
-            m2 += T2[j] >= pulp.lpSum([t_ij[(j,i)]*Y2[(j,i,k)] for i in I[j] for k in tasks])
-        m2 += T2[j] <= T_desired * X2[j]
+    time_model="total" sums the time of every assignment in the section (machines one after another);
+    time_model="makespan" takes the busiest machine's load (machines in parallel) and, without a
+    warm_start, seeds Stage 1 with a greedy LPT schedule. Optional DATA["T_machine"] {(section, machine):
+    hours} caps single machines' load below T_desired (time left by other orders' bookings).
 
-        m2 += (pulp.lpSum([C_var[(j,i,k)]*Y2[(j,i,k)] for i in I[j] for k in tasks]) + f[j]
-               <= C_desired + BIG_M*(1 - X2[j]))
-        m2 += pulp.lpSum([Y2[(j,i,k)] for i in I[j] for k in tasks]) \
-               <= Cap[j] + BIG_M*(1 - X2[j])
+    section_branching: "sos1", "priority" or "both" make CBC settle the section choice first
+    (X as an SOS1 set and/or branching priority on X, see _solve_cbc); "none" leaves CBC's defaults.
 
-        for i in I[j]:
-            for k in tasks:
-                m2 += Y2[(j,i,k)] <= X2[j]
-                m2 += Y2[(j,i,k)] <= A[(j,i)]
+    template_key: identifies the manufacturer configuration (its config version). Built models are
+    then kept per (template_key, p, options) and later orders of the same size only rewrite their
+    price, time and cost limits into them instead of rebuilding both stages (see _set_order_params).
+    """
+    if section_branching not in SECTION_BRANCHING:
+        raise ValueError(f"Unknown section_branching {section_branching!r}; use one of {', '.join(SECTION_BRANCHING)}.")
+    started = time.perf_counter()
+    ctx = _model_context(DATA, symmetry, time_model)
+    p, Cc, T_desired, C_desired = ctx["p"], ctx["Cc"], ctx["T_desired"], ctx["C_desired"]
+    sections, f, Cap, O, cols = ctx["sections"], ctx["f"], ctx["Cap"], ctx["O"], ctx["cols"]
 
-    # Profit lock to Stage-1 optimum
-    eps = 1e-6
-    profit2 = (pulp.lpSum([X2[j]*Cc for j in sections])
-               - (pulp.lpSum([C_var[(j,i,k)]*Y2[(j,i,k)] for j in sections for i in I[j] for k in tasks])
-                  + pulp.lpSum([f[j]*X2[j] for j in sections])))
-    m2 += profit2 >= profit1 - eps
-    m2 += profit2 <= profit1 + eps
+    # ---------- Stage 1: Max Profit ----------
+    seed = None
+    if warm_start is not None and len(warm_start):
+        seed = [(int(r.section_id), int(r.machine_id), int(r.task_id)) for r in warm_start.itertuples()]
+    elif time_model == "makespan":
+        seed = _lpt_schedule(ctx)
+
+    # CBC stops at a MIP start when run with -max, so a seeded Stage 1 minimizes the negated profit
+    sign = -1 if seed else 1
+    key = None if template_key is None else (template_key, p, symmetry, time_model, tiny_tie_break)
+    models = _acquire_models(key, ctx, tiny_tie_break)
+    _set_order_params(models, ctx, sign)
+    m1, X, Y, m2, X2, Y2, T2 = (models[k] for k in ("m1", "X", "Y", "m2", "X2", "Y2", "T2"))
+
+    if seed:
+        _set_warm_start(X, Y, ctx, seed)
+    if progress:
+        progress("solving_stage1", build_seconds=round(time.perf_counter() - started, 4))
+    t1 = time.perf_counter()
+    _ = _solve_cbc(m1, X, msg=msg, warm_start=bool(seed), branching=section_branching)
+    status1 = pulp.LpStatus[m1.status]
+    if status1 != "Optimal":
+        _release_models(key, models)
+        return {"status1": status1, "note": "Stage 1 not optimal or infeasible."}
 
-    # Same "every part once in the chosen section"
-    for j in sections:
-        for k in tasks:
-            m2 += pulp.lpSum([Y2[(j,i,k)] for i in I[j]]) == X2[j]
+    profit1 = sign * pulp.value(m1.objective)
 
-    _ = m2.solve(pulp.PULP_CBC_CMD(msg=msg))
+    # ---------- Stage 2: Min Time (lock profit to Stage-1 optimum) ----------
+    # profit1 is the maximum, so only the lower side is locked; a +-eps band on both sides made CBC
+    # report some feasible Stage 2 models infeasible and the solve fell back to the Stage-1 plan's time
+    eps = 1e-6
+    m2.constraints["profit_lo"].changeRHS(profit1 - eps)
+
+    if seed:
+        for j in sections:
+            X2[j].setInitialValue(round(pulp.value(X[j]) or 0))
+        for c in cols:
+            Y2[c].setInitialValue(round(pulp.value(Y[c]) or 0))
+    if progress:
+        progress("solving_stage2", stage1_seconds=round(time.perf_counter() - t1, 4))
+    _ = _solve_cbc(m2, X2, msg=msg, warm_start=bool(seed), branching=section_branching)
     status2 = pulp.LpStatus[m2.status]
 
-    # Extract solution
-    chosen = [j for j in sections if pulp.value(X2[j]) > 0.5][0]
-    used = [(i,k) for i in I[chosen] for k in tasks if pulp.value(Y2[(chosen,i,k)]) > 0.5]
+    # Extract solution (deal the tasks of each class out to machines by their counts)
+    if status2 == "Optimal":
+        chosen, used = _extract_assignment(ctx, X2, Y2)
+        T_val = float(pulp.value(T2[chosen]))
+    else:
+        # the profit lock can trip CBC's tolerances; the Stage-1 plan is still profit-optimal
+        chosen, used = _extract_assignment(ctx, X, Y)
+        T_val = float(_plan_time(_assignment_rows(DATA, chosen, used), time_model))
+    _release_models(key, models)
     n_assgn = len(used)
     n_machs = len({i for i,_ in used})
-    T_val = float(pulp.value(T2[chosen]))
 
     revenue_val = float(Cc)  # order-level price
-    var_cost_val = float(sum(DATA["C_var"][(chosen,i,k)]*pulp.value(Y2[(chosen,i,k)]) for i in I[chosen] for k in tasks))
+    var_cost_val = float(sum(DATA["C_var"][(chosen,i,k)] for i,k in used))
     cost_val = var_cost_val + f[chosen]
     profit_val = revenue_val - cost_val
 
     Oj = O.get(chosen, 0.0)
     eff_proxy = (Oj/(T_val*n_assgn)) if (Oj>0 and T_val>0 and n_assgn>0) else None
 
-    assign_rows = []
-    for (i,k) in sorted(used, key=lambda x:(x[0], x[1])):
-        assign_rows.append(dict(
-            section_id=chosen,
-            machine_id=i,
-            task_id=k,
-            var_cost=DATA["C_var"][(chosen,i,k)],
-            time=(DATA["t_ijk"][(chosen,i,k)] if t_ijk else DATA["t_ij"][(chosen,i)])
-        ))
-    assign_df = pd.DataFrame(assign_rows)
+    import pandas as pd
+    assign_df = pd.DataFrame(_assignment_rows(DATA, chosen, used))
 
     summary = dict(
         status1=status1, status2=status2,
@@ -206,6 +490,308 @@ def solve_two_stage_order_price(DATA, tiny_tie_break=1e-3, msg=False):
         tasks_enforced=p,
         tasks_scheduled=p,  # all parts enforced
         capacity_of_chosen=int(Cap[chosen]),
-        efficiency_proxy=(float(eff_proxy) if eff_proxy is not None else None)
+        efficiency_proxy=(float(eff_proxy) if eff_proxy is not None else None),
+        formulation=ctx["symmetry"][chosen]["mode"],
+        time_model=time_model
     )
     return {"summary": summary, "assignments": assign_df}
+
+
+def pareto_frontier(DATA, points=5, msg=False, symmetry="auto", tiny_tie_break=1e-3, max_workers=4,
+                    time_model="total"):
+    """
+    Profit vs. lead-time trade-off by the epsilon-constraint method.
+    Each point maximizes profit subject to time <= eps, for `points` values of eps spread from the
+    fastest feasible time to the time of the max-profit solution; a tiny time penalty picks the
+    fastest of equally profitable assignments and dominated points are dropped.
+
+    The model is built once; every point solves a copy of it with only the eps row's right-hand side
+    changed, and points are solved concurrently (each CBC run is its own process).
+
+    Returns {"frontier": DataFrame, "assignments": DataFrame with a point column}, or
+    {"status": ..., "note": ...} when the order is infeasible even without the eps bound.
+    """
+    ctx = _model_context(DATA, symmetry, time_model)
+    sections, Cc, f, T_desired = ctx["sections"], ctx["Cc"], ctx["f"], ctx["T_desired"]
+
+    m, X, Y, T, var_cost, setup_cost = _build_stage_model("Frontier_MaxProfit", pulp.LpMaximize, ctx)
+    total_time = pulp.lpSum([T[j] for j in sections])
+    m += pulp.lpSum([X[j]*Cc for j in sections]) - (var_cost + setup_cost) - tiny_tie_break*total_time
+    m += total_time <= T_desired, "time_cap"
+    template = m.toDict()
+
+    def solve(eps, fastest=False):
+        variables, mp = pulp.LpProblem.fromDict(template)
+        mp.constraints["time_cap"].changeRHS(eps + 1e-6*max(1.0, eps))
+        if fastest:
+            mp.sense = pulp.LpMinimize
+            mp.setObjective(pulp.lpSum([variables[f"T_{j}"] for j in sections]))
+        mp.solve(pulp.PULP_CBC_CMD(msg=msg))
+        status = pulp.LpStatus[mp.status]
+        if status != "Optimal":
+            return dict(eps=eps, status=status)
+        chosen, used = _extract_assignment(ctx, {j: variables[f"X_{j}"] for j in sections},
+                                           {c: variables["Y_%d_%d_%d" % c] for c in ctx["cols"]})
+        rows = _assignment_rows(DATA, chosen, used)
+        cost = f[chosen] + sum(r["var_cost"] for r in rows)
+        return dict(eps=eps, status=status, chosen=chosen, rows=rows, cost=cost, profit=Cc - cost,
+                    time=_plan_time(rows, time_model), machines=len({r["machine_id"] for r in rows}))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        best, fastest = pool.map(lambda fast: solve(T_desired, fast), [False, True])
+        if best["status"] != "Optimal":
+            return {"status": best["status"], "note": "Order infeasible even at the maximum time."}
+        T_min, T_max = fastest["time"], best["time"]
+        grid = []
+        if points > 1 and T_max - T_min > 1e-9:
+            grid = [T_min + (T_max - T_min) * n / (points - 1) for n in range(points - 1)]
+        results = list(pool.map(solve, grid)) + [best]
+
+    # Keep the non-dominated points: walking from fastest to slowest, profit must strictly improve
+    frontier, assignments, best_profit = [], [], None
+    for r in sorted((r for r in results if r["status"] == "Optimal"), key=lambda r: (r["time"], -r["profit"])):
+        if best_profit is not None and r["profit"] <= best_profit + 1e-6:
+            continue
+        best_profit = r["profit"]
+        point = len(frontier) + 1
+        frontier.append(dict(point=point, time_cap=round(r["eps"], 6), chosen_section=int(r["chosen"]),
+                             total_profit=float(r["profit"]), total_cost=float(r["cost"]),
+                             time=float(r["time"]), active_machines=r["machines"]))
+        assignments += [dict(point=point, **row) for row in r["rows"]]
+    import pandas as pd
+    return {"frontier": pd.DataFrame(frontier), "assignments": pd.DataFrame(assignments)}
+
+
+def _time_to_beat(DATA, j, max_cost, time_model="total", msg=False):
+    """
+    Smallest time limit at which section j has an LP plan costing at most max_cost (the LP relaxation
+    of its assignment, booked machines at the hours they have left), or None when it has none at
+    any time limit. The integer plan needs at least this much time.
+    """
+    p = int(DATA["p"])
+    machs = [int(i) for i in DATA["I"][j] if int(DATA["A"][(j, i)])]
+    if p > int(DATA["Cap"][j]) or not machs:
+        return None
+    tasks = range(1, p + 1)
+    t = lambda i, k: float(DATA["t_ijk"][(j, i, k)] if DATA["t_ijk"] else DATA["t_ij"][(j, i)])
+    m = pulp.LpProblem("TimeToBeat", pulp.LpMinimize)
+    y = {(i, k): pulp.LpVariable(f"y_{i}_{k}", 0, 1) for i in machs for k in tasks}
+    lead = pulp.LpVariable("lead", lowBound=0)
+    m += lead
+    for k in tasks:
+        m += pulp.lpSum([y[(i, k)] for i in machs]) == 1
+    m += float(DATA["f"][j]) + pulp.lpSum([float(DATA["C_var"][(j, i, k)]) * var for (i, k), var in y.items()]) <= max_cost
+    booked = DATA.get("T_machine", {})
+    for i in machs:
+        load = pulp.lpSum([t(i, k) * y[(i, k)] for k in tasks])
+        if time_model == "makespan":
+            m += load <= lead
+        if (j, i) in booked:
+            m += load <= float(booked[(j, i)])
+    if time_model != "makespan":
+        m += pulp.lpSum([t(i, k) * var for (i, k), var in y.items()]) <= lead
+    m.solve(pulp.PULP_CBC_CMD(msg=msg))
+    if pulp.LpStatus[m.status] != "Optimal":
+        return None
+    return float(pulp.value(lead))
+
+
+def sensitivity_report(DATA, assignments, time_model="total", msg=False):
+    """
+    Shadow prices and optimality ranges of a solved order, from one LP solve.
+    The section choice is fixed to the plan's section and the task assignment relaxed to an LP
+    (y_ik in [0, 1], unavailable machines at 0); its duals price the section's caps:
+      - time_limit / cost_limit: limit, amount used by the plan, slack, shadow_price (profit gained
+        per extra unit of the limit, LP estimate) and optimal_range [low, high]: the plan stays
+        optimal for any limit in it. low is what the plan uses; high is None (unbounded) while
+        the LP leaves the cap slack, else the current limit (the dual gives no range beyond it).
+        A longer time limit can also let another section in with a cheaper plan: high is then
+        capped at the smallest time limit at which one of them has a cheaper LP plan, and
+        next_section names it. When that happens within the current limit the LP cannot show the
+        plan stays optimal beyond it, so high is the limit and shadow_price None. A larger cost
+        limit never lets another section in, as a cheaper plan already fits the current one.
+        optimal_range is None when the LP splits tasks (lp_cost below plan_cost): the LP optimum
+        is then not the plan and says nothing about how far the plan stays optimal
+      - capacity: limit, used, slack and optimal_range [parts, None]; shadow_price is None, as
+        every part is assigned exactly once, so capacity only decides whether the section can
+        take the order and never changes its cost
+      - machines: unused machines of the section with their smallest reduced cost, i.e. how much
+        cheaper one of their tasks must become before the LP would move work there
+    assignments: the plan's assignments DataFrame (section_id, machine_id, task_id).
+    Returns dict(status, note) instead when there is no plan or the LP is not optimal.
+    """
+    rows = [(int(r.section_id), int(r.machine_id), int(r.task_id)) for r in assignments.itertuples()]
+    if not rows:
+        return {"section": None, "status": "No plan", "note": "The order has no assignments to analyse."}
+    j = rows[0][0]
+    p = int(DATA["p"]); T = float(DATA["T_desired"]); C = float(DATA["C_desired"]); Cap = int(DATA["Cap"][j])
+    f = float(DATA["f"][j])
+    machs = [int(i) for i in DATA["I"][j]]
+    tasks = range(1, p + 1)
+    t = lambda i, k: float(DATA["t_ijk"][(j, i, k)] if DATA["t_ijk"] else DATA["t_ij"][(j, i)])
+    c = lambda i, k: float(DATA["C_var"][(j, i, k)])
+
+    m = pulp.LpProblem("Sensitivity", pulp.LpMinimize)
+    y = {(i, k): pulp.LpVariable(f"y_{i}_{k}", 0, 1 if int(DATA["A"][(j, i)]) else 0) for i in machs for k in tasks}
+    cost = f + pulp.lpSum([c(i, k) * var for (i, k), var in y.items()])
+    m += cost - f
+    for k in tasks:
+        m += pulp.lpSum([y[(i, k)] for i in machs]) == 1, f"assign_{k}"
+    T_machine = {i: min(T, float(DATA.get("T_machine", {}).get((j, i), T))) for i in machs}
+    if time_model == "makespan":
+        for i in machs:
+            m += pulp.lpSum([t(i, k) * y[(i, k)] for k in tasks]) <= T_machine[i], f"time_cap_{i}"
+        time_rows = [f"time_cap_{i}" for i in machs if T_machine[i] >= T]  # the rows T_desired sets
+    else:
+        m += pulp.lpSum([t(i, k) * var for (i, k), var in y.items()]) <= T, "time_cap"
+        for i in machs:
+            if T_machine[i] < T:
+                m += pulp.lpSum([t(i, k) * y[(i, k)] for k in tasks]) <= T_machine[i], f"machine_cap_{i}"
+        time_rows = ["time_cap"]
+    m += cost <= C, "cost_cap"
+    m.solve(pulp.PULP_CBC_CMD(msg=msg))
+    if pulp.LpStatus[m.status] != "Optimal":
+        return {"section": j, "status": pulp.LpStatus[m.status], "note": "LP of the chosen section not optimal."}
+
+    # Duals of a minimization are <= 0 on <= rows; profit = price - cost, so profit per unit is -pi
+    price = lambda name: round(-(m.constraints[name].pi or 0.0), 6) + 0.0
+    lp_slack = lambda name: -m.constraints[name].value()
+    time_price = sum(price(name) for name in time_rows)
+    loads = {}
+    for _, i, k in rows:
+        loads[i] = loads.get(i, 0.0) + t(i, k)
+    lead = max(loads.values()) if time_model == "makespan" else sum(loads.values())
+    plan_cost = f + sum(c(i, k) for _, i, k in rows)
+    lp_cost = pulp.value(cost)
+    tol = 1e-6
+
+    def optimal_range(used, limit, slack):
+        """[used, high] when the plan is also the LP optimum: tightening the cap to what the plan uses
+        cannot beat it, and relaxing a cap the LP leaves slack cannot either"""
+        if lp_cost < plan_cost - tol:
+            return None
+        return [round(used, 6), None if slack > tol else limit]
+
+    time_range = optimal_range(lead, T, min((lp_slack(n) for n in time_rows), default=T))
+    next_section = None
+    if time_range is not None:
+        beat = {other: _time_to_beat(DATA, other, plan_cost - tol, time_model, msg)
+                for other in DATA["sections"] if other != j}
+        beat = {other: hours for other, hours in beat.items() if hours is not None}
+        if beat:
+            next_section = min(beat, key=lambda s: (beat[s], s))
+            if beat[next_section] <= T + tol:
+                time_range[1], time_price = T, None
+            elif time_range[1] is None or beat[next_section] < time_range[1]:
+                time_range[1] = round(beat[next_section], 6)
+
+    used = set(loads)
+    machines = []
+    for i in machs:
+        if i in used:
+            continue
+        k = min(tasks, key=lambda k: (y[(i, k)].dj or 0.0, k))
+        machines.append(dict(machine_id=i, available=bool(int(DATA["A"][(j, i)])),
+                             reduced_cost=round(y[(i, k)].dj or 0.0, 6), task_id=k))
+    report = dict(
+        section=j, status="Optimal", lp_cost=round(lp_cost, 6), plan_cost=round(plan_cost, 6),
+        time_limit=dict(limit=T, used=round(lead, 6), slack=round(T - lead, 6), shadow_price=time_price,
+                        optimal_range=time_range, next_section=next_section),
+        cost_limit=dict(limit=C, used=round(plan_cost, 6), slack=round(C - plan_cost, 6),
+                        shadow_price=price("cost_cap"), optimal_range=optimal_range(plan_cost, C, lp_slack("cost_cap"))),
+        capacity=dict(limit=Cap, used=p, slack=Cap - p, shadow_price=None, optimal_range=[p, None]),
+        machines=machines,
+    )
+    if time_model == "makespan":
+        report["time_by_machine"] = [dict(machine_id=i, load=round(loads.get(i, 0.0), 6),
+                                          shadow_price=price(f"time_cap_{i}")) for i in machs]
+    return report
+
+
+def quick_quote(DATA, time_model="total", iterations=40):
+    """
+    Stage-1 profit bounds and a feasibility verdict in milliseconds, without CBC.
+    Per section, the time cap is relaxed into the objective with a multiplier lam (Lagrangian
+    relaxation; the assignment structure is integral, so its best lam gives the LP-relaxation bound):
+        min cost >= f_j + sum_k min_i (c_ik + lam*t_ik) - lam*T
+    For time_model="makespan" the per-machine caps (T, or DATA["T_machine"] where lower) are relaxed
+    to their sum; "total" also relaxes to that sum when it is below T.
+    Plans met along the way are repaired greedily into feasible ones for the lower bound.
+
+    Returns dict(verdict, upper_bound, lower_bound, section, reasons, causes, bounds):
+      verdict "infeasible" (proved: no section can take the order), "feasible" (a plan was found)
+      or "unknown"; lower_bound/section describe the best plan found; reasons explain per section
+      why it cannot take the order and causes names the limit behind each reason ("machines",
+      "capacity", "time" or "cost"); bounds is the profit upper bound of every remaining section.
+    """
+    p = int(DATA["p"]); Cc = float(DATA["Cc"]); T_desired = float(DATA["T_desired"]); C_desired = float(DATA["C_desired"])
+    t_ijk = DATA["t_ijk"]; tol = 1e-9
+    upper, lower, best_section, reasons, causes, bounds = None, None, None, {}, {}, {}
+
+    for j in map(int, DATA["sections"]):
+        machs = [int(i) for i in DATA["I"][j] if int(DATA["A"][(j, int(i))])]
+        if not machs:
+            reasons[j], causes[j] = "no available machines", "machines"
+            continue
+        if p > int(DATA["Cap"][j]):
+            reasons[j], causes[j] = f"capacity {int(DATA['Cap'][j])} < {p} parts", "capacity"
+            continue
+        c = [[float(DATA["C_var"][(j,i,k)]) for i in machs] for k in range(1, p+1)]
+        t = [[float(t_ijk[(j,i,k)] if t_ijk else DATA["t_ij"][(j,i)]) for i in machs] for k in range(1, p+1)]
+        caps = [min(T_desired, float(DATA.get("T_machine", {}).get((j, i), T_desired))) for i in machs]
+        T_cap = sum(caps) if time_model == "makespan" else min(T_desired, sum(caps))
+
+        fastest = sum(min(row) for row in t)
+        if fastest > T_cap + tol or any(all(t[k][x] > caps[x] + tol for x in range(len(machs))) for k in range(p)):
+            reasons[j] = (f"even the fastest plan needs more than {T_desired:.2f}h" if min(caps) >= T_desired
+                          else "even the fastest plan needs more hours than its machines have left before other bookings")
+            causes[j] = "time"
+            continue
+
+        def relaxed(lam):
+            """Lagrangian bound on the section's cost and the plan (machine index per task) behind it"""
+            plan = [min(range(len(machs)), key=lambda x: (c[k][x] + lam*t[k][x], t[k][x])) for k in range(p)]
+            value = float(DATA["f"][j]) + sum(c[k][x] + lam*t[k][x] for k, x in enumerate(plan)) - lam*T_cap
+            return value, plan, sum(t[k][x] for k, x in enumerate(plan))
+
+        bound, plan, load = relaxed(0.0)
+        plans = [plan]
+        if load > T_cap + tol:
+            # bisection on the subgradient (plan time - T_cap) for the best multiplier
+            lo, hi = 0.0, 1.0
+            while relaxed(hi)[2] > T_cap + tol:
+                hi *= 2.0
+            for _ in range(iterations):
+                mid = (lo + hi) / 2.0
+                value, plan, load = relaxed(mid)
+                bound = max(bound, value)
+                plans.append(plan)
+                lo, hi = (mid, hi) if load > T_cap + tol else (lo, mid)
+            value, plan, _ = relaxed(hi)
+            bound = max(bound, value)
+            plans.append(plan)
+        if bound > C_desired + 1e-6:
+            reasons[j], causes[j] = f"minimum cost {bound:.2f} > cost limit {C_desired:.2f}", "cost"
+            continue
+        bounds[j] = Cc - bound
+        upper = max(upper, Cc - bound) if upper is not None else Cc - bound
+
+        # Lower bound: repair the relaxed plans (cheapest machine that still fits, biggest tasks first)
+        for plan in plans[-2:]:
+            loads, cost, ok = [0.0] * len(machs), float(DATA["f"][j]), True
+            for k in sorted(range(p), key=lambda k: -min(t[k])):
+                busy = loads if time_model == "makespan" else [sum(loads)] * len(machs)
+                fits = [x for x in range(len(machs))
+                        if busy[x] + t[k][x] <= T_desired + tol and loads[x] + t[k][x] <= caps[x] + tol]
+                if not fits:
+                    ok = False
+                    break
+                x = plan[k] if plan[k] in fits else min(fits, key=lambda x: (c[k][x], t[k][x]))
+                loads[x] += t[k][x]
+                cost += c[k][x]
+            if ok and cost <= C_desired + 1e-6 and (lower is None or Cc - cost > lower):
+                lower, best_section = Cc - cost, j
+
+    verdict = "feasible" if lower is not None else ("infeasible" if upper is None else "unknown")
+    return dict(verdict=verdict, upper_bound=upper, lower_bound=lower, section=best_section, reasons=reasons,
+                causes=causes, bounds=bounds)
@@ -0,0 +1,45 @@
+import os
+import csv
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def write_rows(path, columns, rows):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        writer.writerows(rows)
+
+
+def write_plant(folder, sections, machines, task_costs):
+    """
+    Write a manufacturer configuration: sections [(section_id, fixed_cost, capacity)],
+    machines [(section_id, machine_id, available, hours_per_task)] and
+    task_costs {(section_id, machine_id): variable cost of every task}
+    """
+    os.makedirs(folder, exist_ok=True)
+    write_rows(os.path.join(folder, 'sections.csv'),
+               ['section_id', 'fixed_setup_cost', 'capacity', 'output_score_optional'],
+               [(j, f, cap, '') for j, f, cap in sections])
+    write_rows(os.path.join(folder, 'machines.csv'), ['section_id', 'machine_id', 'available', 'time_per_task'],
+               machines)
+    write_rows(os.path.join(folder, 'costs.csv'), ['section_id', 'machine_id', 'task_id', 'variable_cost'],
+               [(j, i, k, cost) for (j, i), cost in sorted(task_costs.items()) for k in range(1, 21)])
+    return folder
+
+
+def write_order(folder, parts, price, hours, cost_limit):
+    os.makedirs(folder, exist_ok=True)
+    write_rows(os.path.join(folder, 'params.csv'), ['param', 'value'],
+               [('num_tasks_p', parts), ('order_price_Cc', price),
+                ('time_limit_Tdesired', hours), ('cost_limit_Cdesired', cost_limit)])
+    return folder
+
+
+@pytest.fixture
+def one_machine_plant(tmp_path):
+    """One section with a single machine that takes 3 hours and costs 100 per part"""
+    return write_plant(str(tmp_path / 'data'), [(1, 50.0, 10)], [(1, 1, 1, 3.0)], {(1, 1): 100.0})
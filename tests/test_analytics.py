@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+import pytest
+
+import analytics
+import reservations
+from conftest import write_order
+from order_pipeline import run_order
+
+HOUR = 3600.0
+MONDAY = 1700438400.0  # 2023-11-20 00:00 UTC
+
+
+def _plan(*machine_hours):
+    return pd.DataFrame([dict(section_id=1, machine_id=i, task_id=k, time=h, var_cost=10.0)
+                         for k, (i, h) in enumerate(machine_hours, start=1)])
+
+
+def test_utilization_splits_bookings_across_buckets(tmp_path):
+    orders_dir = str(tmp_path)
+    # ORD-1 books machine 1 from 00:30 for 1.5h; ORD-2 queues after it until 04:00
+    reservations.reserve(orders_dir, 'ORD-1', _plan((1, 1.5)), MONDAY + 0.5 * HOUR)
+    reservations.reserve(orders_dir, 'ORD-2', _plan((1, 2.0)), MONDAY + 0.5 * HOUR)
+
+    report = analytics.utilization(orders_dir, 'hour', since=MONDAY, until=MONDAY + 4 * HOUR)
+    hours = [(m['start'][11:16], m['hours'], m['share'], m['orders']) for m in report['machines']]
+    assert hours == [('00:00', 0.5, 0.5, 1), ('01:00', 1.0, 1.0, 1), ('02:00', 1.0, 1.0, 1), ('03:00', 1.0, 1.0, 1)]
+
+    day = analytics.utilization(orders_dir, 'day')['machines']
+    assert [(m['start'][:10], m['hours'], m['orders']) for m in day] == [('2023-11-20', 3.5, 2)]
+    assert day[0]['share'] == pytest.approx(3.5 / 24, abs=1e-4)
+
+
+def test_utilization_follows_the_calendar_not_the_solve_time(tmp_path, one_machine_plant):
+    orders_dir = str(tmp_path / 'orders')
+    order_dir = write_order(os.path.join(orders_dir, 'ORD-1'), parts=2, price=1000, hours=10, cost_limit=900)
+    run_order(order_dir, one_machine_plant)
+    assert [b[2] for b in reservations.booked(orders_dir)] == ['ORD-1']
+
+    # the solve is recorded now; the machine is busy for 6 hours from now, in every hour it is booked
+    report = analytics.utilization(orders_dir, 'hour')
+    assert sum(m['hours'] for m in report['machines']) == pytest.approx(6.0, abs=1e-3)
+    assert len(report['machines']) in (6, 7)
+    assert report['sections'][0]['hours'] == pytest.approx(6.0)
+
+    # a released booking leaves the report, though no solve was recorded
+    reservations.release(orders_dir, 'ORD-1')
+    assert analytics.utilization(orders_dir, 'hour')['machines'] == []
@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+import app as webapp
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, one_machine_plant):
+    orders_dir = str(tmp_path / 'orders')
+    os.makedirs(orders_dir)
+    monkeypatch.setattr(webapp, 'ORDERS_DIR', orders_dir)
+    monkeypatch.setattr(webapp, 'MANUFACTURER_DATA_DIR', one_machine_plant)
+    return webapp.app.test_client()
+
+
+def _order(order_id, **fields):
+    order = {'order_id': order_id, 'customer_name': 'ACME', 'num_cad_files': 1,
+             'desired_delivery_time': 100, 'offered_price': 1000}
+    order.update(fields)
+    return order
+
+
+def test_a_duplicate_order_id_is_rejected(client):
+    response = client.post('/api/orders', json={'orders': [_order('ORD-1')]})
+    assert response.status_code == 201
+    assert response.get_json()['results'] == [{'order_id': 'ORD-1', 'status': 'processed'}]
+
+    response = client.post('/api/orders', json=[_order('ORD-1', offered_price=5000)])
+    assert response.status_code == 400
+    [row] = response.get_json()['results']
+    assert (row['order_id'], row['status'], row['error']) == ('ORD-1', 'rejected', 'Order ORD-1 already exists')
+    assert client.get('/api/orders/ORD-1').get_json()['offered_price'] == 1000
+
+
+def test_a_duplicate_order_id_within_one_batch_is_solved_once(client):
+    response = client.post('/api/orders', json={'orders': [_order('ORD-1'), _order('ORD-1', offered_price=5000),
+                                                           _order('ORD-2')]})
+    assert response.status_code == 201
+    results = response.get_json()['results']
+    assert [r['status'] for r in results] == ['processed', 'rejected', 'processed']
+    assert results[1]['error'] == 'Order ORD-1 already exists'
+    assert client.get('/api/orders/ORD-1').get_json()['offered_price'] == 1000
+
+
+def test_malformed_batches_are_rejected(client):
+    assert client.post('/api/orders', json={'orders': {'order_id': 'ORD-1'}}).status_code == 400
+    assert client.post('/api/orders', data='not json').status_code == 400
+    response = client.post('/api/orders', json=[_order('ORD-1', offered_price='lots')])
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['status'] == 'rejected'
+    assert client.post('/api/orders', json=[_order(f'ORD-{n}') for n in range(webapp.API_MAX_BATCH + 1)]
+                       ).status_code == 413
@@ -0,0 +1,91 @@
+import os
+import json
+import time
+import hashlib
+
+import blob_store
+
+
+def _upload(orders_dir, order_id, filename, data):
+    order_dir = os.path.join(orders_dir, order_id)
+    os.makedirs(order_dir, exist_ok=True)
+    with open(os.path.join(order_dir, filename), 'wb') as f:
+        f.write(data)
+    return order_dir, hashlib.sha256(data).hexdigest()
+
+
+def _manifest(order_dir, file_hashes):
+    with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
+        json.dump({'order_id': os.path.basename(order_dir), 'file_hashes': file_hashes}, f)
+
+
+def _age(path, seconds):
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+
+
+def test_identical_uploads_share_one_blob(tmp_path):
+    blobs_dir, orders_dir = str(tmp_path / 'blobs'), str(tmp_path / 'orders')
+    first, sha256 = _upload(orders_dir, 'ORD-1', 'part.step', b'solid')
+    second, _ = _upload(orders_dir, 'ORD-2', 'copy.step', b'solid')
+
+    assert blob_store.ingest(blobs_dir, first, 'part.step', sha256) is False
+    assert blob_store.ingest(blobs_dir, second, 'copy.step', sha256) is True
+
+    blob = blob_store.blob_path(blobs_dir, sha256)
+    assert os.listdir(os.path.dirname(blob)) == [sha256]
+    assert os.stat(blob).st_nlink == 3  # the blob plus a hardlink in each order folder
+    for order_dir, name in [(first, 'part.step'), (second, 'copy.step')]:
+        assert os.path.samefile(os.path.join(order_dir, name), blob)
+        assert blob_store.open_path(blobs_dir, order_dir, name, {name: sha256}) == blob
+
+
+def test_open_path_falls_back_to_the_order_folder(tmp_path):
+    order_dir, sha256 = _upload(str(tmp_path), 'ORD-1', 'part.step', b'solid')
+    expected = os.path.join(order_dir, 'part.step')
+    assert blob_store.open_path(str(tmp_path / 'blobs'), order_dir, 'part.step', {'part.step': sha256}) == expected
+    assert blob_store.open_path(str(tmp_path / 'blobs'), order_dir, 'part.step', None) == expected
+
+
+def test_gc_keeps_referenced_and_young_blobs(tmp_path):
+    blobs_dir, orders_dir = str(tmp_path / 'blobs'), str(tmp_path / 'orders')
+    kept_dir, kept = _upload(orders_dir, 'ORD-1', 'kept.step', b'referenced')
+    orphan_dir, orphan = _upload(orders_dir, 'ORD-2', 'orphan.step', b'orphaned')
+    young_dir, young = _upload(orders_dir, 'ORD-3', 'young.step', b'manifest not written yet')
+    for order_dir, name, sha256 in [(kept_dir, 'kept.step', kept), (orphan_dir, 'orphan.step', orphan),
+                                    (young_dir, 'young.step', young)]:
+        blob_store.ingest(blobs_dir, order_dir, name, sha256)
+    _manifest(kept_dir, {'kept.step': kept})
+    _manifest(orphan_dir, {})
+    _age(blob_store.blob_path(blobs_dir, kept), 7200)
+    _age(blob_store.blob_path(blobs_dir, orphan), 7200)
+
+    assert blob_store.gc(blobs_dir, orders_dir, grace_seconds=3600) == (1, len(b'orphaned'))
+    assert os.path.exists(blob_store.blob_path(blobs_dir, kept))
+    assert os.path.exists(blob_store.blob_path(blobs_dir, young))
+    assert not os.path.exists(blob_store.blob_path(blobs_dir, orphan))
+
+
+def test_a_duplicate_upload_restarts_the_grace_period(tmp_path):
+    blobs_dir, orders_dir = str(tmp_path / 'blobs'), str(tmp_path / 'orders')
+    first, sha256 = _upload(orders_dir, 'ORD-1', 'part.step', b'solid')
+    blob_store.ingest(blobs_dir, first, 'part.step', sha256)
+    _age(blob_store.blob_path(blobs_dir, sha256), 7200)
+
+    second, _ = _upload(orders_dir, 'ORD-2', 'part.step', b'solid')
+    assert blob_store.ingest(blobs_dir, second, 'part.step', sha256) is True
+    assert blob_store.gc(blobs_dir, orders_dir, grace_seconds=3600) == (0, 0)
+
+    _age(blob_store.blob_path(blobs_dir, sha256), 7200)
+    assert blob_store.gc(blobs_dir, orders_dir, grace_seconds=3600) == (1, len(b'solid'))
+
+
+def test_reference_counts_skip_unreadable_manifests(tmp_path):
+    orders_dir = str(tmp_path)
+    _manifest(_upload(orders_dir, 'ORD-1', 'a.step', b'a')[0], {'a.step': 'aa', 'b.step': 'aa'})
+    _manifest(_upload(orders_dir, 'ORD-2', 'a.step', b'a')[0], {'a.step': 'aa', 'c.step': 'cc'})
+    torn_dir, _ = _upload(orders_dir, 'ORD-3', 'a.step', b'a')
+    with open(os.path.join(torn_dir, 'customer_data.json'), 'w') as f:
+        f.write('{"file_hashes": {"a.step": "a')
+
+    assert blob_store.reference_counts(orders_dir) == {'aa': 2, 'cc': 1}
@@ -0,0 +1,67 @@
+import os
+
+import pandas as pd
+import pytest
+
+import config_store
+from solver import load_data_from_csv
+
+
+def _tables(fixed_cost):
+    return {
+        'sections.csv': pd.DataFrame({'section_id': [1], 'fixed_setup_cost': [fixed_cost], 'capacity': [10],
+                                      'output_score_optional': [None]}),
+        'machines.csv': pd.DataFrame({'section_id': [1], 'machine_id': [1], 'available': [1], 'time_per_task': [2.0]}),
+        'costs.csv': pd.DataFrame({'section_id': [1, 1], 'machine_id': [1, 1], 'task_id': [1, 2],
+                                   'variable_cost': [10.0, 12.0]}),
+    }
+
+
+class _BrokenTable:
+    def to_csv(self, path, index=False):
+        with open(path, 'w') as f:
+            f.write('section_id,')
+        raise OSError("disk full")
+
+
+def _fixed_cost(config_dir):
+    return load_data_from_csv(config_dir, params={'num_tasks_p': 2, 'order_price_Cc': 100,
+                                                  'time_limit_Tdesired': 10, 'cost_limit_Cdesired': 100})['f'][1]
+
+
+def test_publish_switches_the_live_version(tmp_path):
+    data_dir = str(tmp_path)
+    assert config_store.pin(data_dir) == (None, data_dir)  # flat layout until the first publish
+
+    first = config_store.publish(data_dir, _tables(50.0), {'name': 'plant'})
+    pinned, folder = config_store.pin(data_dir)
+    assert pinned == first
+    second = config_store.publish(data_dir, _tables(80.0), {'name': 'plant'})
+
+    # a reader that pinned the first version keeps reading it whole
+    assert _fixed_cost(folder) == 50.0
+    assert config_store.load_settings(folder) == {'name': 'plant', 'version': first}
+    assert config_store.current_version(data_dir) == second
+    assert _fixed_cost(config_store.pin(data_dir)[1]) == 80.0
+
+
+def test_failed_publish_keeps_the_live_version(tmp_path):
+    data_dir = str(tmp_path)
+    live = config_store.publish(data_dir, _tables(50.0), {})
+    with pytest.raises(OSError):
+        config_store.publish(data_dir, dict(_tables(80.0), **{'times.csv': _BrokenTable()}), {})
+
+    assert config_store.current_version(data_dir) == live
+    assert os.listdir(os.path.join(data_dir, config_store.VERSIONS_DIR)) == [live]
+    assert _fixed_cost(config_store.pin(data_dir)[1]) == 50.0
+
+
+def test_prune_keeps_the_newest_and_the_live_version(tmp_path):
+    data_dir = str(tmp_path)
+    versions = [config_store.publish(data_dir, _tables(float(n)), {}, keep=0) for n in range(4)]
+    assert sorted(os.listdir(os.path.join(data_dir, config_store.VERSIONS_DIR))) == versions[-1:]
+
+    versions += [config_store.publish(data_dir, _tables(float(n)), {}, keep=2) for n in range(3)]
+    assert sorted(os.listdir(os.path.join(data_dir, config_store.VERSIONS_DIR))) == versions[-2:]
+    assert config_store.version_dir(data_dir, versions[0]) is None
+    assert config_store.version_dir(data_dir, versions[-1]) == config_store.pin(data_dir)[1]
@@ -0,0 +1,63 @@
+import json
+import threading
+
+import events
+
+
+def _parse(frame):
+    lines = frame.rstrip('\n').split('\n')
+    fields = dict(line.split(': ', 1) for line in lines)
+    return fields['id'], fields['event'], json.loads(fields['data'])
+
+
+def test_frames_carry_the_event_id_and_payload():
+    event = events.publish('ORD-1', 'processed', elapsed=1.5)
+    frame = events._frame(event)
+
+    assert frame.endswith('\n\n') and frame.count('\n') == 4
+    event_id, name, data = _parse(frame)
+    assert (event_id, name) == (str(event['id']), 'order_status')
+    assert data == event
+    assert (data['order_id'], data['status'], data['elapsed']) == ('ORD-1', 'processed', 1.5)
+
+
+def test_a_reconnecting_client_gets_only_what_it_missed():
+    seen = events.publish('ORD-1', 'queued')
+    missed = [events.publish('ORD-1', 'solving_stage1'), events.publish('ORD-1', 'processed')]
+
+    frames = events.stream(seen['id'], keepalive=0.01)
+    assert [_parse(next(frames))[2] for _ in missed] == missed
+    assert next(frames) == ': keepalive\n\n'
+
+
+def test_a_new_subscriber_starts_from_now():
+    events.publish('ORD-1', 'queued')
+    frames = events.stream(keepalive=0.01)
+    assert next(frames) == ': keepalive\n\n'
+
+    live = events.publish('ORD-2', 'queued')
+    assert _parse(next(frames))[2] == live
+
+
+def test_a_waiting_subscriber_is_woken_by_publish():
+    frames = events.stream(events.publish('ORD-1', 'queued')['id'], keepalive=30)
+    timer = threading.Timer(0.05, events.publish, ('ORD-1', 'failed'), {'error': 'infeasible'})
+    timer.start()
+    try:
+        _, _, data = _parse(next(frames))
+    finally:
+        timer.cancel()
+    assert (data['status'], data['error']) == ('failed', 'infeasible')
+
+
+def test_the_route_resumes_from_last_event_id():
+    import app as webapp
+
+    seen = events.publish('ORD-1', 'queued')
+    missed = events.publish('ORD-1', 'processed')
+    response = webapp.app.test_client().get('/admin/events', headers={'Last-Event-ID': str(seen['id'])})
+    assert response.mimetype == 'text/event-stream'
+    assert response.headers['Cache-Control'] == 'no-cache'
+    chunk = next(response.response)
+    response.close()
+    assert _parse(chunk.decode())[2] == missed
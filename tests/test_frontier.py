@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from solver import pareto_frontier, solve_two_stage_order_price
+
+
+def _order(seed):
+    """Two sections of fast-expensive and slow-cheap machines, so profit trades against lead time"""
+    rng = random.Random(seed)
+    p = rng.randint(4, 8)
+    I = {1: [1, 2, 3], 2: [1, 2]}
+    t_ij = {(j, i): round(rng.uniform(0.5, 3), 2) for j in I for i in I[j]}
+    C_var = {(j, i, k): round(60 / t_ij[(j, i)] * rng.uniform(0.8, 1.2), 2)
+             for j in I for i in I[j] for k in range(1, p + 1)}
+    return dict(p=p, Cc=150.0 * p, T_desired=3.0 * p, C_desired=150.0 * p, sections=[1, 2], I=I,
+                f={1: 30.0, 2: 10.0}, Cap={1: p, 2: p}, O={}, A={(j, i): 1 for j in I for i in I[j]},
+                t_ijk=None, t_ij=t_ij, C_var=C_var)
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+def test_frontier_is_monotone_and_optimal_at_each_cap(seed, time_model):
+    DATA = _order(seed)
+    frontier = pareto_frontier(DATA, points=5, time_model=time_model, max_workers=2)['frontier']
+    points = frontier.to_dict('records')
+    assert points
+
+    for before, after in zip(points, points[1:]):
+        assert after['time'] > before['time']
+        assert after['total_profit'] > before['total_profit']
+    for point in points:
+        assert point['time'] <= point['time_cap'] + 1e-6
+        exact = solve_two_stage_order_price(dict(DATA, T_desired=point['time_cap']), time_model=time_model)
+        assert point['total_profit'] == pytest.approx(exact['summary']['total_profit'], abs=1e-3 * DATA['T_desired'])
+
+    best = solve_two_stage_order_price(DATA, time_model=time_model)['summary']
+    assert points[-1]['total_profit'] == pytest.approx(best['total_profit'], abs=1e-6)
+
+
+def test_an_infeasible_order_has_no_frontier():
+    result = pareto_frontier(dict(_order(0), T_desired=0.1))
+    assert result['status'] != 'Optimal' and 'frontier' not in result
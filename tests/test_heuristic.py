@@ -0,0 +1,49 @@
+import time
+import random
+
+import pandas  # noqa: F401  (imported by the heuristic's result; keep its first import out of the timing)
+import pytest
+
+from heuristic import solve_heuristic
+from solver import quick_quote, solve_two_stage_order_price
+
+
+def _order(p, time_model, seed=1):
+    """Two sections of 6 machines with per-task times; the time limit is the average machine's load"""
+    rng = random.Random(seed)
+    I = {1: list(range(1, 7)), 2: list(range(1, 7))}
+    t_ijk = {(j, i, k): round(rng.uniform(1, 4), 2) for j in I for i in I[j] for k in range(1, p + 1)}
+    # odd machines are dear for slow tasks, even ones cheap: cost and time pull apart
+    C_var = {(j, i, k): round(rng.uniform(10, 50) + 5 * t_ijk[(j, i, k)] * (-1) ** i, 2)
+             for j in I for i in I[j] for k in range(1, p + 1)}
+    T = p * 2.5 / 6 if time_model == 'makespan' else p * 2.5
+    return dict(p=p, Cc=100.0 * p, T_desired=T, C_desired=100.0 * p, sections=[1, 2], I=I, f={1: 100.0, 2: 200.0},
+                Cap={1: p, 2: p}, O={}, A={(j, i): 1 for j in I for i in I[j]}, t_ij=None, t_ijk=t_ijk, C_var=C_var)
+
+
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+def test_large_order_finishes_within_its_budget(time_model):
+    # 600 parts: each LNS step is a real CBC run, and makespan steps take longer than the budget left
+    DATA = _order(600, time_model)
+    started = time.perf_counter()
+    result = solve_heuristic(DATA, time_budget=0.6, time_model=time_model)
+    assert time.perf_counter() - started <= 0.6 + 0.15
+    assert result['summary']['elapsed'] <= 0.6 + 0.15
+
+    summary = result['summary']
+    upper = quick_quote(DATA, time_model=time_model)['upper_bound']
+    assert summary['upper_bound'] == pytest.approx(upper)
+    assert summary['total_profit'] <= upper + 1e-6
+    assert summary['gap'] == pytest.approx((upper - summary['total_profit']) / max(abs(upper), 1.0))
+
+
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+@pytest.mark.parametrize('seed', [3, 4, 7])
+def test_gap_brackets_the_exact_optimum(time_model, seed):
+    # the plan can be no better than the MILP optimum, which is no better than the quote's bound
+    DATA = _order(8, time_model, seed)
+    summary = solve_heuristic(DATA, time_budget=5.0, time_model=time_model)['summary']
+    exact = solve_two_stage_order_price(DATA, time_model=time_model)['summary']['total_profit']
+    assert summary['total_profit'] <= exact + 1e-6
+    assert exact <= summary['upper_bound'] + 1e-6
+    assert summary['gap'] >= (summary['upper_bound'] - exact) / max(abs(summary['upper_bound']), 1.0) - 1e-9
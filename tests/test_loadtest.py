@@ -0,0 +1,48 @@
+import shutil
+
+import pytest
+
+import loadtest
+
+
+@pytest.fixture
+def portal(monkeypatch, one_machine_plant):
+    """The portal on a scratch copy of the one-machine plant; its folders are restored afterwards"""
+    import app as webapp
+
+    for name in ('MANUFACTURER_DATA_DIR', 'ORDERS_DIR', 'BLOBS_DIR'):
+        monkeypatch.setattr(webapp, name, getattr(webapp, name))
+    webapp.MANUFACTURER_DATA_DIR = one_machine_plant
+    portal, scratch = loadtest.in_process_app()
+    yield portal
+    shutil.rmtree(scratch, ignore_errors=True)
+
+
+def test_percentiles_are_nearest_rank():
+    values = list(range(1, 101))
+    assert [loadtest._percentile(values, q) for q in (50, 95, 99, 100)] == [50, 95, 99, 100]
+    assert loadtest._percentile([7], 99) == 7
+    assert loadtest._percentile([], 50) is None
+
+
+def test_regressions_beyond_the_tolerance_are_reported():
+    baseline = {'routes': {'admin': {'throughput': 100.0, 'p95': 10.0}, 'submit': {'throughput': 5.0, 'p95': 200.0}}}
+    result = {'routes': {'admin': {'throughput': 85.0, 'p95': 11.5}, 'submit': {'throughput': 3.0, 'p95': 300.0}}}
+    assert loadtest.regressions(result, baseline, tolerance=0.2) == [
+        'submit: throughput 3.0/s < baseline 5.0/s', 'submit: p95 300.0 ms > baseline 200.0 ms']
+    assert loadtest.regressions(result, {'routes': {'results': {'throughput': 1.0, 'p95': 1.0}}}) == []
+
+
+def test_a_short_in_process_run_reports_every_request(portal):
+    result = loadtest.run_load(lambda: loadtest.TestClient(portal.app), concurrency=2, duration=0, requests=12,
+                               max_parts=3, seed=1)
+
+    assert result['requests'] == 12
+    assert sum(r['requests'] for r in result['routes'].values()) == 12
+    assert all(r['errors'] == 0 for r in result['routes'].values())
+    for r in result['routes'].values():
+        assert r['p50'] <= r['p95'] <= r['p99'] <= r['max']
+        assert sum(r['statuses'].values()) == r['requests']
+    submitted = loadtest.SEED_ORDERS + result['routes'].get('submit', {}).get('requests', 0)
+    assert set(result['orders']) <= {'processed', 'failed'}  # an order too slow for its date is a valid 'failed'
+    assert sum(result['orders'].values()) == submitted
@@ -0,0 +1,56 @@
+import random
+import itertools
+
+import pytest
+
+from solver import _lpt_schedule, _model_context, solve_two_stage_order_price
+
+
+def _identical_machines(times, machines, T_desired=None):
+    """One section of identical machines with per-part times and a flat cost, so only the lead time differs"""
+    p = len(times)
+    I = {1: list(range(1, machines + 1))}
+    return dict(p=p, Cc=1000.0 * p, T_desired=T_desired or float(sum(times)), C_desired=100.0 * p,
+                sections=[1], I=I, f={1: 10.0}, Cap={1: p}, O={}, A={(1, i): 1 for i in I[1]},
+                t_ijk={(1, i, k): times[k - 1] for i in I[1] for k in range(1, p + 1)}, t_ij=None,
+                C_var={(1, i, k): 50.0 for i in I[1] for k in range(1, p + 1)})
+
+
+def _lpt_makespan(DATA):
+    loads = {}
+    for _, i, k in _lpt_schedule(_model_context(DATA, time_model='makespan')):
+        loads[i] = loads.get(i, 0.0) + DATA['t_ijk'][(1, i, k)]
+    return max(loads.values())
+
+
+def _best_makespan(times, machines):
+    best = None
+    for plan in itertools.product(range(machines), repeat=len(times)):
+        loads = [0.0] * machines
+        for t, i in zip(times, plan):
+            loads[i] += t
+        best = max(loads) if best is None else min(best, max(loads))
+    return best
+
+
+def test_the_milp_beats_lpt_on_its_worst_case():
+    # Graham's tight instance for two machines: LPT packs 3+2+2 | 3+2, the optimum 3+3 | 2+2+2
+    DATA = _identical_machines([3.0, 3.0, 2.0, 2.0, 2.0], machines=2)
+    assert _lpt_makespan(DATA) == 7.0
+    assert solve_two_stage_order_price(DATA, time_model='makespan')['summary']['time'] == pytest.approx(6.0)
+
+
+@pytest.mark.parametrize('seed', range(6))
+def test_makespan_is_optimal_and_within_the_lpt_bound(seed):
+    rng = random.Random(seed)
+    machines = rng.randint(2, 3)
+    times = [float(rng.randint(1, 9)) for _ in range(rng.randint(5, 8))]
+    DATA = _identical_machines(times, machines)
+
+    lpt, best = _lpt_makespan(DATA), _best_makespan(times, machines)
+    assert max(sum(times) / machines, max(times)) <= best <= lpt <= (4 / 3 - 1 / (3 * machines)) * best + 1e-9
+    assert solve_two_stage_order_price(DATA, time_model='makespan')['summary']['time'] == pytest.approx(best)
+
+    # the LPT plan is feasible by construction, so a delivery time of exactly its makespan is quotable
+    at_lpt = solve_two_stage_order_price(dict(DATA, T_desired=lpt), time_model='makespan')
+    assert at_lpt['summary']['time'] == pytest.approx(best)
@@ -0,0 +1,68 @@
+import os
+import json
+
+import order_store
+
+
+def _order(orders_dir, order_id, status='processing'):
+    order_dir = os.path.join(orders_dir, order_id)
+    os.makedirs(order_dir)
+    data = {'order_id': order_id, 'customer': 'ACME', 'status': status}
+    order_store.atomic_write_json(os.path.join(order_dir, 'customer_data.json'), data)
+    return order_dir, data
+
+
+def _status(order_dir):
+    return order_store.read_json(os.path.join(order_dir, 'customer_data.json'))['status']
+
+
+def test_recover_requeues_solves_without_a_commit(tmp_path):
+    orders_dir = str(tmp_path)
+    crashed, data = _order(orders_dir, 'ORD-1')
+    finished, _ = _order(orders_dir, 'ORD-2', status='processed')
+    order_store.journal_begin(orders_dir, 'ORD-1', data)
+    order_store.journal_begin(orders_dir, 'ORD-2')
+    order_store.journal_commit(orders_dir, 'ORD-2', 'processed')
+    open(os.path.join(crashed, 'solution_summary.json.123.456.tmp'), 'w').close()
+
+    assert order_store.recover(orders_dir) == ['ORD-1']
+    assert _status(crashed) == 'queued'
+    assert _status(finished) == 'processed'
+    assert os.listdir(crashed) == ['customer_data.json']
+    with open(os.path.join(orders_dir, order_store.JOURNAL_NAME)) as f:
+        assert [(r['op'], r['order_id']) for r in map(json.loads, f)] == [('begin', 'ORD-1')]
+
+
+def test_recover_restores_customer_data_from_the_journal(tmp_path):
+    orders_dir = str(tmp_path)
+    order_dir, data = _order(orders_dir, 'ORD-1')
+    order_store.journal_begin(orders_dir, 'ORD-1', data)
+    order_store.journal_begin(orders_dir, 'ORD-1')  # a re-solve journals no payload
+    with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
+        f.write('{"order_id": "ORD-1", "cust')  # torn by the crash
+    with open(os.path.join(orders_dir, order_store.JOURNAL_NAME), 'a') as f:
+        f.write('{"op": "commit", "order_id": "ORD-1"')  # torn last journal line: no commit
+
+    assert order_store.recover(orders_dir) == ['ORD-1']
+    assert order_store.read_json(os.path.join(order_dir, 'customer_data.json')) == dict(data, status='queued')
+
+
+def test_recover_leaves_an_unchanged_journal_alone(tmp_path):
+    orders_dir = str(tmp_path)
+    _, data = _order(orders_dir, 'ORD-1')
+    order_store.journal_begin(orders_dir, 'ORD-1', data)
+    assert order_store.recover(orders_dir) == ['ORD-1']
+    journal = os.path.join(orders_dir, order_store.JOURNAL_NAME)
+    before = os.stat(journal)
+
+    assert order_store.recover(orders_dir) == ['ORD-1']
+    after = os.stat(journal)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+
+
+def test_recover_without_a_journal_writes_nothing(tmp_path):
+    orders_dir = str(tmp_path)
+    _order(orders_dir, 'ORD-1')
+    assert order_store.recover(orders_dir) == []
+    assert order_store.recover(str(tmp_path / 'missing')) == []
+    assert sorted(os.listdir(orders_dir)) == ['ORD-1']
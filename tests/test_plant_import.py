@@ -0,0 +1,90 @@
+import io
+
+import pandas as pd
+import pytest
+
+import config_store
+from plant_import import PlantImportError, import_plant, read_table, validate_tables
+from solver import load_data_from_csv
+
+
+def _csv(text):
+    return read_table(io.StringIO(text), 'table.csv')
+
+
+def _plant(**overrides):
+    """Two sections of 2 and 1 machines, 2 tasks; `overrides` replaces tables by name"""
+    tables = {
+        'sections.csv': _csv("section_id,fixed_setup_cost,capacity,output_score_optional\n1,50,10,\n2,80,5,1.5\n"),
+        'machines.csv': _csv("section_id,machine_id,available,time_per_task\n1,1,1,2.0\n1,2,0,1.5\n2,1,1,3.0\n"),
+        'costs.csv': _csv("section_id,machine_id,task_id,variable_cost\n"
+                          "1,1,1,10\n1,1,2,11\n1,2,1,12\n1,2,2,13\n2,1,1,9\n2,1,2,8\n"),
+    }
+    tables.update(overrides)
+    return tables
+
+
+def _errors(tables, **kwargs):
+    with pytest.raises(PlantImportError) as raised:
+        validate_tables(tables, **kwargs)
+    return raised.value.errors
+
+
+def test_valid_plant_is_published(tmp_path):
+    data_dir = str(tmp_path)
+    version = import_plant(data_dir, _plant(), {'default_cost_limit': 500, 'version': 'stale'})
+
+    assert config_store.current_version(data_dir) == version
+    folder = config_store.pin(data_dir)[1]
+    settings = config_store.load_settings(folder)
+    assert (settings['version'], settings['max_tasks'], settings['num_sections']) == (version, 2, 2)
+    assert settings['machines_per_section'] == [2, 1]
+    assert settings['default_cost_limit'] == 500
+    DATA = load_data_from_csv(folder, params={'num_tasks_p': 2, 'order_price_Cc': 100,
+                                              'time_limit_Tdesired': 10, 'cost_limit_Cdesired': 500})
+    assert DATA['A'] == {(1, 1): 1, (1, 2): 0, (2, 1): 1}
+    assert DATA['C_var'][(2, 1, 2)] == 8.0
+    assert DATA['t_ij'][(1, 2)] == 1.5
+
+
+def test_every_problem_is_reported_at_once():
+    errors = _errors(_plant(**{
+        'sections.csv': _csv("section_id,fixed_setup_cost,capacity\n1,50,10\n2,-80,5.5\n3,10,4\n"),
+        'machines.csv': _csv("section_id,machine_id,available,time_per_task\n1,1,1,2.0\n1,2,2,abc\n"
+                             "2,1,1,3.0\n1,1,1,2.5\n4,1,1,1.0\n"),
+    }))
+    assert errors == [
+        "sections.csv: fixed_setup_cost is negative in row(s) 3",
+        "sections.csv: capacity must be a whole number in row(s) 3",
+        "machines.csv: available must be 0 or 1 in row(s) 3",
+        "machines.csv: time_per_task is not a number in row(s) 3",
+        "machines.csv: duplicate section_id/machine_id in row(s) 5",
+        "machines.csv: section_id not in sections.csv in row(s) 6",
+        "sections.csv: section(s) without machines: 3",
+        "costs.csv: no row for 2 (section, machine, task) combination(s): (4, 1, 1), (4, 1, 2)",
+    ]
+
+
+def test_costs_must_cover_every_machine_and_task():
+    costs = _csv("section_id,machine_id,task_id,variable_cost\n1,1,1,10\n1,1,2,11\n1,2,1,12\n"
+                 "2,1,1,9\n2,1,2,8\n3,1,1,7\n1,1,5,1\n")
+    errors = _errors(_plant(**{'costs.csv': costs}), max_tasks=2)
+    assert errors == [
+        "costs.csv: task_id outside 1..2 in row(s) 8",
+        "costs.csv: no row for 1 (section, machine, task) combination(s): (1, 2, 2)",
+        "costs.csv: 1 row(s) for machines not in machines.csv: (3, 1)",
+    ]
+
+
+def test_missing_and_unreadable_tables(tmp_path):
+    tables = _plant()
+    del tables['machines.csv']
+    tables['costs.csv'] = None
+    tables['layout.csv'] = pd.DataFrame()
+    errors = _errors(tables, errors=["costs.csv: could not parse"])
+    assert errors == [
+        "costs.csv: could not parse",
+        "machines.csv: no file uploaded",
+        "layout.csv: not a configuration table (sections.csv, machines.csv, costs.csv, times.csv)",
+    ]
+    assert config_store.current_version(str(tmp_path)) is None
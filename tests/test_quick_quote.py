@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from differential import case_data, random_case
+from solver import quick_quote, solve_two_stage_order_price
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_bounds_bracket_the_milp(seed):
+    case = random_case(random.Random(seed))
+    DATA, time_model = case_data(case), case['time_model']
+    quote = quick_quote(DATA, time_model=time_model)
+    exact = solve_two_stage_order_price(DATA, time_model=time_model)
+
+    if 'summary' not in exact:
+        assert quote['verdict'] != 'feasible'
+        assert quote['lower_bound'] is None
+        return
+    profit = exact['summary']['total_profit']
+    assert quote['verdict'] != 'infeasible'
+    assert quote['upper_bound'] >= profit - 1e-6
+    assert quote['bounds'][exact['summary']['chosen_section']] >= profit - 1e-6
+    if quote['lower_bound'] is not None:
+        assert quote['verdict'] == 'feasible'
+        assert quote['lower_bound'] <= profit + 1e-6
+
+
+def test_the_time_multiplier_tightens_the_bound():
+    # two machines: cheap and slow, dear and fast; the delivery time forces a mix
+    p = 4
+    DATA = dict(p=p, Cc=1000.0, T_desired=10.0, C_desired=1000.0, sections=[1], I={1: [1, 2]},
+                f={1: 0.0}, Cap={1: p}, O={}, A={(1, 1): 1, (1, 2): 1}, t_ijk=None,
+                t_ij={(1, 1): 4.0, (1, 2): 1.0}, C_var={(1, i, k): (10.0, 40.0)[i - 1] for i in (1, 2)
+                                                       for k in range(1, p + 1)})
+    quote = quick_quote(DATA)
+    exact = solve_two_stage_order_price(DATA)['summary']['total_profit']
+
+    assert exact == 1000.0 - 10.0 * 2 - 40.0 * 2  # two slow parts (8h) and two fast ones (2h)
+    assert 1000.0 - 4 * 10.0 > quote['upper_bound'] >= exact - 1e-6
+    assert quote['lower_bound'] == pytest.approx(exact)
+
+
+def test_an_order_no_section_can_take_is_proved_infeasible():
+    DATA = dict(p=3, Cc=1000.0, T_desired=2.0, C_desired=1000.0, sections=[1, 2], I={1: [1], 2: [1]},
+                f={1: 0.0, 2: 0.0}, Cap={1: 3, 2: 2}, O={}, A={(1, 1): 1, (2, 1): 1}, t_ijk=None,
+                t_ij={(1, 1): 1.0, (2, 1): 0.1}, C_var={(j, 1, k): 10.0 for j in (1, 2) for k in (1, 2, 3)})
+    quote = quick_quote(DATA)
+    assert quote['verdict'] == 'infeasible'
+    assert quote['causes'] == {1: 'time', 2: 'capacity'}
+    assert 'summary' not in solve_two_stage_order_price(DATA)
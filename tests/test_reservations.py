@@ -0,0 +1,158 @@
+import os
+import json
+import time
+
+import pytest
+
+import reservations
+from conftest import write_order, write_plant
+from order_pipeline import run_order
+from reoptimize import _reoptimize_one
+from heuristic import solve_heuristic
+from solver import load_data_from_csv, solve_two_stage_order_price
+
+
+def _bookings(orders_dir, order_id):
+    with reservations._index_lock:
+        return reservations._calendar(orders_dir).orders.get(order_id, [])
+
+
+def _set_status(order_dir, status):
+    with open(os.path.join(order_dir, 'customer_data.json'), 'w') as f:
+        json.dump({'order_id': os.path.basename(order_dir), 'status': status}, f)
+
+
+def test_back_to_back_orders_on_one_machine(tmp_path, one_machine_plant):
+    orders_dir = str(tmp_path / 'orders')
+    first = write_order(os.path.join(orders_dir, 'ORD-1'), parts=2, price=1000, hours=10, cost_limit=900)
+    second = write_order(os.path.join(orders_dir, 'ORD-2'), parts=2, price=1000, hours=10, cost_limit=900)
+
+    started = time.time()
+    run_order(first, one_machine_plant)
+    (booking,) = _bookings(orders_dir, 'ORD-1')
+    assert booking[3] - booking[2] == pytest.approx(6 * 3600)
+
+    # 6 of the machine's 10 hours are booked; 2 more parts (6h) cannot finish by the deadline
+    with pytest.raises(ValueError):
+        run_order(second, one_machine_plant)
+    assert _bookings(orders_dir, 'ORD-2') == []
+    assert not os.path.exists(os.path.join(second, 'solution_summary.json'))
+
+    # one part (3h) still fits after the first order
+    third = write_order(os.path.join(orders_dir, 'ORD-3'), parts=1, price=1000, hours=10, cost_limit=900)
+    run_order(third, one_machine_plant)
+    (booking,) = _bookings(orders_dir, 'ORD-3')
+    assert booking[2] == pytest.approx(started + 6 * 3600, abs=60)
+    assert booking[3] <= time.time() + 10 * 3600
+
+
+def test_booked_hours_cap_the_machine(tmp_path):
+    # two machines; the cheap one is booked for 6 of the order's 10 hours
+    data_dir = write_plant(str(tmp_path / 'data'), [(1, 50.0, 10)], [(1, 1, 1, 3.0), (1, 2, 1, 3.0)],
+                           {(1, 1): 100.0, (1, 2): 150.0})
+    orders_dir = str(tmp_path / 'orders')
+    order_dir = write_order(os.path.join(orders_dir, 'ORD-1'), parts=2, price=1000, hours=10, cost_limit=900)
+    now = time.time()
+    reservations.reserve(orders_dir, 'ORD-0', {'section_id': [1, 1], 'machine_id': [1, 1], 'time': [3.0, 3.0]}, now)
+
+    DATA, _ = reservations.residual_data(orders_dir, load_data_from_csv(data_dir, params={
+        'num_tasks_p': 2, 'order_price_Cc': 1000, 'time_limit_Tdesired': 10, 'cost_limit_Cdesired': 900}), now)
+    assert DATA['T_machine'][(1, 1)] == pytest.approx(4.0, abs=1e-3)
+
+    result = run_order(order_dir, data_dir)
+    machines = sorted(result['assignments']['machine_id'])
+    assert machines == [1, 2]  # only one part fits on the cheap machine
+    for _, _, start, end, _ in _bookings(orders_dir, 'ORD-1'):
+        assert end <= now + 10 * 3600 + 60
+
+
+def test_reserve_refuses_bookings_past_the_deadline(tmp_path):
+    orders_dir = str(tmp_path / 'orders')
+    os.makedirs(orders_dir)
+    now = time.time()
+    plan = {'section_id': [1], 'machine_id': [1], 'time': [6.0]}
+    reservations.reserve(orders_dir, 'ORD-1', plan, now, deadline=now + 10 * 3600)
+    with pytest.raises(ValueError):
+        reservations.reserve(orders_dir, 'ORD-2', plan, now, deadline=now + 10 * 3600)
+    assert _bookings(orders_dir, 'ORD-2') == []
+
+
+def test_release_and_compact(tmp_path):
+    orders_dir = str(tmp_path / 'orders')
+    os.makedirs(orders_dir)
+    now = time.time()
+    plan = {'section_id': [1], 'machine_id': [1], 'time': [2.0]}
+    reservations.reserve(orders_dir, 'ORD-1', plan, now - 5 * 3600)  # finished 3 hours ago
+    reservations.reserve(orders_dir, 'ORD-2', plan, now)
+    reservations.reserve(orders_dir, 'ORD-3', plan, now)
+    reservations.release(orders_dir, 'ORD-3')
+
+    assert reservations.compact(orders_dir, now) == 1
+    assert [_bookings(orders_dir, o) != [] for o in ('ORD-1', 'ORD-2', 'ORD-3')] == [False, True, False]
+
+
+def test_failed_rerun_of_a_processed_order_keeps_its_bookings(tmp_path, one_machine_plant):
+    orders_dir = str(tmp_path / 'orders')
+    first = write_order(os.path.join(orders_dir, 'ORD-1'), parts=2, price=1000, hours=10, cost_limit=900)
+    run_order(first, one_machine_plant)
+    _set_status(first, 'processed')
+    booked = _bookings(orders_dir, 'ORD-1')
+
+    # the re-run with a cost limit below the plan fails; the order keeps its status, plan and machine hours
+    write_order(first, parts=2, price=1000, hours=10, cost_limit=100)
+    with pytest.raises(ValueError):
+        run_order(first, one_machine_plant)
+    assert _bookings(orders_dir, 'ORD-1') == booked
+    assert os.path.exists(os.path.join(first, 'solution_assignments.csv'))
+
+    # so a later order cannot take the hours it still holds
+    second = write_order(os.path.join(orders_dir, 'ORD-2'), parts=2, price=1000, hours=10, cost_limit=900)
+    with pytest.raises(ValueError):
+        run_order(second, one_machine_plant)
+
+
+def test_failed_rerun_of_a_failed_order_releases_its_bookings(tmp_path, one_machine_plant):
+    orders_dir = str(tmp_path / 'orders')
+    order_dir = write_order(os.path.join(orders_dir, 'ORD-1'), parts=2, price=1000, hours=10, cost_limit=900)
+    run_order(order_dir, one_machine_plant)
+    _set_status(order_dir, 'failed')
+
+    write_order(order_dir, parts=2, price=1000, hours=10, cost_limit=100)
+    with pytest.raises(ValueError):
+        run_order(order_dir, one_machine_plant)
+    assert _bookings(orders_dir, 'ORD-1') == []
+
+
+def test_failed_reoptimization_releases_the_bookings(tmp_path, one_machine_plant):
+    orders_dir = str(tmp_path / 'orders')
+    order_dir = write_order(os.path.join(orders_dir, 'ORD-1'), parts=2, price=1000, hours=10, cost_limit=900)
+    run_order(order_dir, one_machine_plant)
+    _set_status(order_dir, 'processed')
+
+    write_order(order_dir, parts=2, price=1000, hours=10, cost_limit=100)
+    outcome = _reoptimize_one(orders_dir, one_machine_plant, 'v2', 'ORD-1')
+    assert outcome['status'] == 'failed'
+    assert _bookings(orders_dir, 'ORD-1') == []
+
+
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+@pytest.mark.parametrize('options', [dict(symmetry='off'), dict(symmetry='auto'), dict(symmetry='order'),
+                                     dict(section_branching='sos1'), dict(template_key='booked-test'),
+                                     dict(engine='heuristic')], ids=str)
+def test_every_solve_path_keeps_booked_machines_within_their_hours(time_model, options):
+    # 4 identical parts; machine 1 is cheapest but has only 2.5h left, room for one 2h part
+    DATA = dict(p=4, Cc=2000.0, T_desired=12.0, C_desired=2000.0, sections=[1], I={1: [1, 2, 3]}, f={1: 0.0},
+                Cap={1: 10}, O={}, A={(1, i): 1 for i in (1, 2, 3)}, t_ijk=None,
+                t_ij={(1, 1): 2.0, (1, 2): 2.0, (1, 3): 2.0},
+                C_var={(1, i, k): 10.0 * i for i in (1, 2, 3) for k in range(1, 5)},
+                T_machine={(1, 1): 2.5})
+    options = dict(options)
+    if options.pop('engine', None) == 'heuristic':
+        result = solve_heuristic(DATA, time_budget=2.0, time_model=time_model)
+    else:
+        if 'template_key' in options:  # a cached model from an unbooked order of the same size
+            solve_two_stage_order_price(dict(DATA, T_machine={}), time_model=time_model, **options)
+        result = solve_two_stage_order_price(DATA, time_model=time_model, **options)
+    machines = list(result['assignments']['machine_id'])
+    assert machines.count(1) == 1
+    assert result['summary']['total_profit'] == 2000.0 - 10.0 - 3 * 20.0
@@ -0,0 +1,73 @@
+import os
+
+import results_view
+from conftest import write_rows
+
+COLUMNS = ['section_id', 'machine_id', 'task_id', 'var_cost', 'time']
+
+
+def _assignments(tmp_path, rows):
+    path = str(tmp_path / 'solution_assignments.csv')
+    write_rows(path, COLUMNS, rows)
+    return path
+
+
+def _plan(tmp_path, tasks=25):
+    # tasks alternate between machines 1 and 2; costs repeat so sorting needs the task_id tie-break
+    return _assignments(tmp_path, [(1, 1 + k % 2, k, 100 + k % 3 * 10, 2.0 + k % 2) for k in range(1, tasks + 1)])
+
+
+def test_pages_are_consecutive_slices(tmp_path):
+    path = _plan(tmp_path)
+    pages = [results_view.assignments_page(path, page, per_page=10) for page in (1, 2, 3)]
+
+    assert [p['total'] for p in pages] == [25] * 3
+    assert [p['pages'] for p in pages] == [3] * 3
+    assert [len(p['rows']) for p in pages] == [10, 10, 5]
+    assert [r['task_id'] for p in pages for r in p['rows']] == list(range(1, 26))
+
+
+def test_out_of_range_pages_are_clamped(tmp_path):
+    path = _plan(tmp_path)
+    assert results_view.assignments_page(path, 0, per_page=10)['page'] == 1
+    last = results_view.assignments_page(path, 99, per_page=10)
+    assert last['page'] == 3
+    assert [r['task_id'] for r in last['rows']] == list(range(21, 26))
+
+
+def test_sorting_breaks_ties_by_task(tmp_path):
+    path = _plan(tmp_path, tasks=7)
+    rows = results_view.assignments_page(path, sort='var_cost')['rows']
+    assert [(r['var_cost'], r['task_id']) for r in rows] == [
+        (100, 3), (100, 6), (110, 1), (110, 4), (110, 7), (120, 2), (120, 5)]
+
+    rows = results_view.assignments_page(path, sort='var_cost', descending=True)['rows']
+    assert [(r['var_cost'], r['task_id']) for r in rows] == [
+        (120, 2), (120, 5), (110, 1), (110, 4), (110, 7), (100, 3), (100, 6)]
+
+
+def test_unknown_sort_columns_fall_back_to_task_order(tmp_path):
+    page = results_view.assignments_page(_plan(tmp_path, tasks=5), sort='__class__')
+    assert page['sort'] == 'task_id'
+    assert [r['task_id'] for r in page['rows']] == [1, 2, 3, 4, 5]
+
+
+def test_machine_totals_and_timeline(tmp_path):
+    path = _assignments(tmp_path, [(1, 1, 1, 100, 2.0), (1, 2, 2, 50, 1.0), (1, 1, 3, 100, 2.0), (1, 2, 4, 50, 1.0)])
+    page = results_view.assignments_page(path)
+
+    assert page['makespan'] == 4.0
+    assert [(m['machine_id'], m['tasks'], m['total_cost'], m['total_time'], m['load_pct'])
+            for m in page['machines']] == [(1, 2, 200, 4.0, 100.0), (2, 2, 100, 2.0, 50.0)]
+    assert [(r['task_id'], r['start'], r['end']) for r in page['rows']] == [
+        (1, 0.0, 2.0), (2, 0.0, 1.0), (3, 2.0, 4.0), (4, 1.0, 2.0)]
+
+
+def test_a_rewritten_file_is_parsed_again(tmp_path):
+    path = _plan(tmp_path, tasks=5)
+    assert results_view.assignments_page(path)['total'] == 5
+    _plan(tmp_path, tasks=8)
+    info = os.stat(path)
+    os.utime(path, ns=(info.st_atime_ns, info.st_mtime_ns + 1))
+
+    assert results_view.assignments_page(path)['total'] == 8
@@ -0,0 +1,44 @@
+import os
+import random
+import tempfile
+
+import pytest
+
+import solver
+from differential import case_data, random_case
+
+
+def _cases(count=12, seed=42):
+    rng = random.Random(seed)
+    return [random_case(rng) for _ in range(count)]
+
+
+@pytest.mark.parametrize('branching', ['sos1', 'priority', 'both'])
+def test_branching_options_match_the_plain_model(branching):
+    solved = 0
+    for case in _cases():
+        DATA, time_model = case_data(case), case['time_model']
+        plain = solver.solve_two_stage_order_price(DATA, time_model=time_model)
+        result = solver.solve_two_stage_order_price(DATA, time_model=time_model, section_branching=branching)
+        assert ('summary' in result) == ('summary' in plain)
+        if 'summary' not in plain:
+            continue
+        solved += 1
+        got, ref = result['summary'], plain['summary']
+        assert got['total_profit'] == pytest.approx(ref['total_profit'], abs=1e-6)
+        assert got['time'] == pytest.approx(ref['time'], abs=1e-6)
+        assert sorted(result['assignments']['task_id']) == list(range(1, DATA['p'] + 1))
+        assert set(result['assignments']['section_id']) == {got['chosen_section']}
+    assert solved >= 3
+
+
+def test_the_priority_file_is_removed(monkeypatch, tmp_path):
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    DATA = case_data(_cases(1)[0])
+    solver.solve_two_stage_order_price(DATA, section_branching='priority')
+    assert not [name for name in os.listdir(str(tmp_path)) if name.endswith('.csv')]
+
+
+def test_an_unknown_branching_option_is_rejected():
+    with pytest.raises(ValueError, match='sos1'):
+        solver.solve_two_stage_order_price(case_data(_cases(1)[0]), section_branching='sos2')
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from solver import sensitivity_report, solve_two_stage_order_price
+
+
+def _data(hours):
+    """One section, 2 parts; machine 1 takes 3h at 100 a part, machine 2 takes 1h at 150"""
+    return dict(p=2, Cc=1000.0, T_desired=hours, C_desired=1000.0, sections=[1], I={1: [1, 2]}, f={1: 50.0},
+                Cap={1: 5}, O={}, A={(1, 1): 1, (1, 2): 1}, t_ij={(1, 1): 3.0, (1, 2): 1.0}, t_ijk=None,
+                C_var={(1, i, k): (100.0 if i == 1 else 150.0) for i in (1, 2) for k in (1, 2)})
+
+
+def _plan(*machines):
+    return pd.DataFrame([dict(section_id=1, machine_id=i, task_id=k) for k, i in enumerate(machines, 1)])
+
+
+def test_binding_time_limit():
+    # one part per machine takes exactly the 4h; each extra hour moves half a part to the cheap machine
+    report = sensitivity_report(_data(4.0), _plan(1, 2))
+    assert report['plan_cost'] == report['lp_cost'] == 300.0
+    time_limit = report['time_limit']
+    assert time_limit['used'] == 4.0 and time_limit['slack'] == 0.0
+    assert time_limit['shadow_price'] == pytest.approx(25.0)
+    assert time_limit['optimal_range'] == [4.0, 4.0]
+
+    cost_limit = report['cost_limit']
+    assert cost_limit['shadow_price'] == 0.0
+    assert cost_limit['optimal_range'] == [300.0, None]
+
+    assert report['capacity'] == dict(limit=5, used=2, slack=3, shadow_price=None, optimal_range=[2, None])
+
+
+def test_slack_time_limit():
+    report = sensitivity_report(_data(10.0), _plan(1, 1))
+    assert report['time_limit']['shadow_price'] == 0.0
+    assert report['time_limit']['optimal_range'] == [6.0, None]
+    assert report['machines'] == [dict(machine_id=2, available=True, reduced_cost=50.0, task_id=1)]
+
+
+def test_fractional_lp_has_no_ranges():
+    # at 3.5h the integer plan puts both parts on machine 2 (350); the LP splits a part (312.5)
+    report = sensitivity_report(_data(3.5), _plan(2, 2))
+    assert report['lp_cost'] == pytest.approx(312.5) and report['plan_cost'] == 350.0
+    assert report['time_limit']['optimal_range'] is None
+    assert report['cost_limit']['optimal_range'] is None
+
+
+def test_empty_plan():
+    report = sensitivity_report(_data(4.0), _plan())
+    assert report['status'] == 'No plan'
+
+
+def _two_sections(hours, machines2):
+    """One part; section 1 takes 5h at 100, section 2 has machines2 {machine: (hours, cost)}"""
+    I = {1: [1], 2: sorted(machines2)}
+    t_ij = {(1, 1): 5.0, **{(2, i): h for i, (h, _) in machines2.items()}}
+    C_var = {(1, 1, 1): 100.0, **{(2, i, 1): c for i, (_, c) in machines2.items()}}
+    return dict(p=1, Cc=500.0, T_desired=hours, C_desired=500.0, sections=[1, 2], I=I, f={1: 0.0, 2: 0.0},
+                Cap={1: 5, 2: 5}, O={}, A={(j, i): 1 for j in I for i in I[j]}, t_ij=t_ij, t_ijk=None, C_var=C_var)
+
+
+def test_time_range_ends_where_another_section_pays_more():
+    # at 15h section 2 makes the part for 50 (profit 450 > 400), so the plan is only optimal below that
+    DATA = _two_sections(10.0, {1: (15.0, 50.0)})
+    result = solve_two_stage_order_price(DATA)
+    assert result['summary']['chosen_section'] == 1
+    time_limit = sensitivity_report(DATA, result['assignments'])['time_limit']
+    assert time_limit['shadow_price'] == 0.0
+    assert time_limit['optimal_range'] == [5.0, 15.0]
+    assert time_limit['next_section'] == 2
+    assert solve_two_stage_order_price(dict(DATA, T_desired=15.0))['summary']['total_profit'] == 450.0
+
+
+def test_time_range_stops_at_the_limit_when_another_section_could_pay_more():
+    # section 2's LP mixes a slow free machine with a fast dear one into a plan under 100 within 10h
+    DATA = _two_sections(10.0, {1: (20.0, 0.0), 2: (1.0, 120.0)})
+    result = solve_two_stage_order_price(DATA)
+    assert result['summary']['chosen_section'] == 1
+    time_limit = sensitivity_report(DATA, result['assignments'])['time_limit']
+    assert time_limit['optimal_range'] == [5.0, 10.0]
+    assert time_limit['shadow_price'] is None
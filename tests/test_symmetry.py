@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from solver import solve_two_stage_order_price
+
+
+def _order(seed, monge):
+    """
+    Two sections with per-machine part times (t_ij). Costs are machine rate x task weight: weights from
+    a short list repeat, so tasks merge into counts; distinct weights make the costs Monge instead.
+    """
+    rng = random.Random(seed)
+    p = rng.randint(4, 12)
+    I = {1: [1, 2, 3], 2: [1, 2]}
+    rate = {(j, i): rng.uniform(5, 20) for j in I for i in I[j]}
+    weight = {k: (1 + k / 10 if monge else rng.choice([1.0, 1.5, 2.0])) for k in range(1, p + 1)}
+    return dict(p=p, Cc=40.0 * p, T_desired=rng.uniform(1.5, 4) * p, C_desired=rng.uniform(25, 40) * p,
+                sections=[1, 2], I=I, f={1: 30.0, 2: 10.0}, Cap={1: p + 2, 2: p}, O={},
+                A={(j, i): 1 for j in I for i in I[j]}, t_ijk=None,
+                t_ij={(j, i): round(rng.uniform(0.5, 3), 2) for j in I for i in I[j]},
+                C_var={(j, i, k): round(rate[(j, i)] * weight[k], 2) for j in I for i in I[j] for k in range(1, p + 1)})
+
+
+def _check_same_plan_value(DATA, result, time_model):
+    reference = solve_two_stage_order_price(DATA, time_model=time_model, symmetry='off')
+    if 'summary' not in reference:
+        assert 'summary' not in result
+        return
+    ref, got = reference['summary'], result['summary']
+    assert got['total_profit'] == pytest.approx(ref['total_profit'], abs=1e-6)
+    assert got['time'] == pytest.approx(ref['time'], abs=1e-6)
+    rows = result['assignments']
+    assert sorted(rows['task_id']) == list(range(1, DATA['p'] + 1))
+    assert got['total_cost'] == pytest.approx(
+        DATA['f'][got['chosen_section']] + sum(rows['var_cost']), abs=1e-6)
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+def test_task_counts_match_the_binary_model(seed, time_model):
+    DATA = _order(seed, monge=False)
+    result = solve_two_stage_order_price(DATA, time_model=time_model, symmetry='auto')
+    if 'summary' in result:
+        assert result['summary']['formulation'] == 'counts'
+    _check_same_plan_value(DATA, result, time_model)
+
+
+@pytest.mark.parametrize('seed', range(4))
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+def test_ordering_rows_match_the_binary_model(seed, time_model):
+    DATA = _order(seed, monge=True)
+    result = solve_two_stage_order_price(DATA, time_model=time_model, symmetry='order')
+    if 'summary' in result:
+        assert result['summary']['formulation'] == 'ordered'
+    _check_same_plan_value(DATA, result, time_model)
+
+
+def test_admin_form_costs_keep_the_binary_model():
+    # the admin form prices task k at base x (1 + 1.5% (k - 1)): no two tasks share a cost column
+    DATA = _order(0, monge=False)
+    DATA['C_var'] = {(j, i, k): round(10.0 * i * (1 + 0.015 * (k - 1)), 2)
+                     for j in DATA['I'] for i in DATA['I'][j] for k in range(1, DATA['p'] + 1)}
+    DATA['C_desired'] = 1e6
+    result = solve_two_stage_order_price(DATA, symmetry='auto')
+    assert result['summary']['formulation'] == 'binary'
+    _check_same_plan_value(DATA, result, 'total')
@@ -0,0 +1,79 @@
+import random
+from collections import OrderedDict
+
+import pytest
+
+import solver
+from test_symmetry import _order
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Fresh template cache; counts how many model pairs get built"""
+    monkeypatch.setattr(solver, '_templates', OrderedDict())
+    built = []
+    build = solver._stage_models
+    monkeypatch.setattr(solver, '_stage_models', lambda ctx, tie: built.append(ctx['p']) or build(ctx, tie))
+    return built
+
+
+def _orders(seed, count=6):
+    """Orders of one plant and size that differ only in price, delivery time, cost limit and bookings"""
+    rng = random.Random(seed)
+    DATA = _order(seed, monge=False)
+    orders = []
+    for n in range(count):
+        order = dict(DATA, Cc=DATA['Cc'] * rng.uniform(0.5, 1.5), T_desired=DATA['T_desired'] * rng.uniform(0.3, 1.5),
+                     C_desired=DATA['C_desired'] * rng.uniform(0.6, 1.4))
+        if n % 2:
+            order['T_machine'] = {(j, i): order['T_desired'] * rng.uniform(0.2, 1) for j in DATA['I'] for i in DATA['I'][j]}
+        orders.append(order)
+    return orders
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+def test_a_reused_template_solves_like_a_fresh_model(builds, seed, time_model):
+    orders = _orders(seed)
+    for DATA in orders:
+        cached = solver.solve_two_stage_order_price(DATA, time_model=time_model, template_key='v1')
+        fresh = solver.solve_two_stage_order_price(DATA, time_model=time_model)
+        assert ('summary' in cached) == ('summary' in fresh)
+        if 'summary' in fresh:
+            for figure in ('total_profit', 'time', 'total_cost'):
+                assert cached['summary'][figure] == pytest.approx(fresh['summary'][figure], abs=1e-6)
+    # one build per fresh solve plus the single template every cached solve reused
+    assert len(builds) == len(orders) + 1
+    assert [len(idle) for idle in solver._templates.values()] == [1]
+
+
+def test_templates_are_kept_per_key_and_size(builds):
+    small, large = _order(0, monge=False), _order(1, monge=False)
+    assert small['p'] != large['p']
+    for key, DATA in [('v1', small), ('v1', large), ('v2', small), ('v1', small), ('v1', large)]:
+        solver.solve_two_stage_order_price(DATA, template_key=key)
+    assert builds == [small['p'], large['p'], small['p']]
+    assert list(solver._templates) == [('v2', small['p'], 'auto', 'total', 1e-3),
+                                       ('v1', small['p'], 'auto', 'total', 1e-3),
+                                       ('v1', large['p'], 'auto', 'total', 1e-3)]
+
+
+def test_the_least_recently_used_template_is_evicted(builds, monkeypatch):
+    monkeypatch.setattr(solver, 'TEMPLATE_CACHE_SIZE', 2)
+    DATA = _order(0, monge=False)
+    for key in ['v1', 'v2', 'v1', 'v3', 'v2']:
+        solver.solve_two_stage_order_price(DATA, template_key=key)
+    assert len(builds) == 4  # v2 was evicted by v3 and built again
+    assert [key[0] for key in solver._templates] == ['v3', 'v2']
+
+
+def test_concurrent_orders_never_share_a_model_pair(builds):
+    DATA = _order(0, monge=False)
+    key = ('v1', DATA['p'], 'auto', 'total', 1e-3)
+    ctx = solver._model_context(DATA)
+    first, second = solver._acquire_models(key, ctx, 1e-3), solver._acquire_models(key, ctx, 1e-3)
+    assert first is not second
+    solver._release_models(key, first)
+    solver._release_models(key, second)
+    assert solver._acquire_models(key, ctx, 1e-3) is second
+    assert len(builds) == 2
@@ -0,0 +1,98 @@
+import io
+import os
+import hashlib
+
+import pytest
+
+import uploads
+
+
+def _send(order_dir, data, start, total):
+    return uploads.write_chunk(order_dir, 'part.step', io.BytesIO(data), start, total)
+
+
+def test_chunks_resume_from_the_received_offset(tmp_path):
+    order_dir = str(tmp_path)
+    data = os.urandom(3000)
+
+    assert _send(order_dir, data[:1000], 0, len(data)) == {'received': 1000, 'complete': False, 'sha256': None}
+    assert uploads.received_bytes(order_dir, 'part.step') == 1000
+    _send(order_dir, data[1000:2500], 1000, len(data))
+    state = _send(order_dir, data[2500:], 2500, len(data))
+
+    digest = hashlib.sha256(data).hexdigest()
+    assert state == {'received': 3000, 'complete': True, 'sha256': digest}
+    assert not os.path.exists(os.path.join(order_dir, 'part.step' + uploads.PART_SUFFIX))
+    with open(os.path.join(order_dir, 'part.step'), 'rb') as f:
+        assert f.read() == data
+    assert uploads.received_bytes(order_dir, 'part.step') == 3000
+    assert uploads.uploaded_sha256(order_dir, 'part.step') == digest
+
+
+@pytest.mark.parametrize('start', [0, 500, 1500])
+def test_a_chunk_off_the_received_offset_is_rejected(tmp_path, start):
+    order_dir = str(tmp_path)
+    data = os.urandom(2000)
+    _send(order_dir, data[:1000], 0, len(data))
+
+    with pytest.raises(uploads.UploadError, match='expected 1000'):
+        _send(order_dir, data[start:], start, len(data))
+    assert uploads.received_bytes(order_dir, 'part.step') == 1000
+    assert _send(order_dir, data[1000:], 1000, len(data))['sha256'] == hashlib.sha256(data).hexdigest()
+
+
+def test_a_lost_running_hash_is_rebuilt_from_the_received_prefix(tmp_path):
+    order_dir = str(tmp_path)
+    data = os.urandom(2000)
+    _send(order_dir, data[:1200], 0, len(data))
+    uploads._hashers.clear()  # restart, or the next chunk landing on another worker
+
+    assert _send(order_dir, data[1200:], 1200, len(data))['sha256'] == hashlib.sha256(data).hexdigest()
+
+
+def test_a_stale_running_hash_does_not_leak_into_the_digest(tmp_path):
+    order_dir = str(tmp_path)
+    data = os.urandom(2000)
+    _send(order_dir, data[:800], 0, len(data))
+    part_path = os.path.join(order_dir, 'part.step' + uploads.PART_SUFFIX)
+    with open(part_path, 'ab') as f:
+        f.write(data[800:1200])  # bytes that arrived without updating the running hash
+
+    digest = _send(order_dir, data[1200:], 1200, len(data))['sha256']
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert digest == uploads.file_sha256(os.path.join(order_dir, 'part.step'))
+
+
+def test_chunks_past_the_declared_size_are_rejected(tmp_path):
+    order_dir = str(tmp_path)
+    with pytest.raises(uploads.UploadError, match='limit of 10 bytes'):
+        _send(order_dir, b'x' * 20, 0, 10)
+    with pytest.raises(uploads.UploadError, match='limit of 10 bytes'):
+        uploads.write_chunk(order_dir, 'part.step', io.BytesIO(b'x'), 0, 20, max_bytes=10)
+
+
+def test_save_upload_hashes_the_stream(tmp_path):
+    from werkzeug.datastructures import FileStorage
+
+    data = os.urandom(uploads.CHUNK_SIZE + 10)
+    saved = uploads.save_upload(FileStorage(io.BytesIO(data), 'part.step'), str(tmp_path), 'part.step')
+    assert saved == {'name': 'part.step', 'size': len(data), 'sha256': hashlib.sha256(data).hexdigest()}
+    assert os.listdir(str(tmp_path)) == ['part.step']
+
+
+def test_upload_route_reports_the_offset_on_a_bad_range(tmp_path, monkeypatch):
+    import app as webapp
+
+    monkeypatch.setattr(webapp, 'ORDERS_DIR', str(tmp_path))
+    client = webapp.app.test_client()
+    order_id = client.post('/upload/start', data={'order_id': 'ORD-1'}).get_json()['order_id']
+    url = f'/upload/{order_id}/part.step'
+
+    assert client.post(url, data=b'abcd', headers={'Content-Range': 'bytes 0-3/8'}).get_json()['received'] == 4
+    response = client.post(url, data=b'efgh', headers={'Content-Range': 'bytes 2-5/8'})
+    assert response.status_code == 416
+    assert response.get_json()['received'] == 4
+    assert client.post(url, data=b'efgh', headers={'Content-Range': 'items 4-7/8'}).status_code == 400
+    assert client.get(url).get_json() == {'filename': 'part.step', 'received': 4}
+    done = client.post(url, data=b'efgh', headers={'Content-Range': 'bytes 4-7/8'}).get_json()
+    assert done['sha256'] == hashlib.sha256(b'abcdefgh').hexdigest()
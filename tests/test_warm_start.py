@@ -0,0 +1,31 @@
+import random
+
+import pandas as pd
+import pytest
+
+from solver import solve_two_stage_order_price
+
+
+def _order(seed):
+    """Two sections of 3 and 2 machines with random part times and costs, priced at a loss"""
+    rng = random.Random(seed)
+    p = rng.randint(3, 10)
+    I = {1: [1, 2, 3], 2: [1, 2]}
+    return dict(p=p, Cc=150.0 + 20 * p, T_desired=rng.uniform(10, 40), C_desired=4000.0, sections=[1, 2], I=I,
+                f={1: 100.0, 2: 200.0}, Cap={1: 20, 2: 20}, O={}, A={(j, i): 1 for j in I for i in I[j]}, t_ij=None,
+                t_ijk={(j, i, k): rng.uniform(1, 5) for j in I for i in I[j] for k in range(1, p + 1)},
+                C_var={(j, i, k): rng.uniform(10, 60) for j in I for i in I[j] for k in range(1, p + 1)})
+
+
+@pytest.mark.parametrize('seed', [35, 38, 39])
+@pytest.mark.parametrize('time_model', ['total', 'makespan'])
+def test_warm_start_keeps_the_optimum(seed, time_model):
+    # a poor start (every part on its fastest machine) must not come back as the optimum
+    DATA = _order(seed)
+    cold = solve_two_stage_order_price(DATA, time_model=time_model, symmetry='off')['summary']
+    j = cold['chosen_section']
+    start = pd.DataFrame([dict(section_id=j, machine_id=min(DATA['I'][j], key=lambda i: DATA['t_ijk'][(j, i, k)]),
+                               task_id=k) for k in range(1, DATA['p'] + 1)])
+    warm = solve_two_stage_order_price(DATA, time_model=time_model, warm_start=start)['summary']
+    assert warm['total_profit'] == pytest.approx(cold['total_profit'], abs=1e-6)
+    assert warm['time'] <= DATA['T_desired'] + 1e-6
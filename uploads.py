@@ -0,0 +1,144 @@
+"""
+Streaming upload handling for CAD files and documents
+- Chunked writes straight into the order folder (no extra temp copy), hashed on the fly
+- Resumable chunked uploads: clients send byte ranges and can ask how much has arrived
+"""
+import os
+import hashlib
+import threading
+
+CHUNK_SIZE = 1024 * 1024  # 1MB read/write chunks
+PART_SUFFIX = '.part'
+DIGEST_DIR = '.uploads'  # per-order folder holding the sha256 of completed chunked uploads
+
+# Running sha256 state per in-progress upload, so each chunk is hashed once as it arrives.
+# Lost on restart (or on another worker); _hasher_for() then rehashes the received prefix once.
+_hashers = {}
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+class UploadError(ValueError):
+    """Rejected upload chunk (bad range, size limit exceeded)"""
+
+
+def _copy_stream(stream, out, hasher, max_bytes=None, chunk_size=CHUNK_SIZE):
+    written = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        written += len(chunk)
+        if max_bytes is not None and written > max_bytes:
+            raise UploadError(f"Upload exceeds the limit of {max_bytes} bytes")
+        out.write(chunk)
+        hasher.update(chunk)
+    return written
+
+
+def stream_to_file(stream, dest_path, max_bytes=None, chunk_size=CHUNK_SIZE):
+    """
+    Copy a readable stream to dest_path in fixed-size chunks, hashing as it goes.
+    Data lands in dest_path + '.part' and is renamed into place once complete.
+    Returns (size, sha256 hex digest).
+    """
+    part_path = dest_path + PART_SUFFIX
+    hasher = hashlib.sha256()
+    try:
+        with open(part_path, 'wb') as out:
+            size = _copy_stream(stream, out, hasher, max_bytes, chunk_size)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    os.replace(part_path, dest_path)
+    return size, hasher.hexdigest()
+
+
+def save_upload(file, order_dir, filename, max_bytes=None):
+    """Stream a Werkzeug FileStorage into the order folder; returns dict(name, size, sha256)"""
+    size, digest = stream_to_file(file.stream, os.path.join(order_dir, filename), max_bytes)
+    return {'name': filename, 'size': size, 'sha256': digest}
+
+
+def received_bytes(order_dir, filename):
+    """How many bytes of a resumable upload have arrived (full size once it is complete)"""
+    path = os.path.join(order_dir, filename)
+    if os.path.exists(path + PART_SUFFIX):
+        return os.path.getsize(path + PART_SUFFIX)
+    if os.path.exists(path):
+        return os.path.getsize(path)
+    return 0
+
+
+def _lock_for(part_path):
+    with _locks_lock:
+        return _locks.setdefault(part_path, threading.Lock())
+
+
+def _hasher_for(part_path, offset):
+    hasher = _hashers.get(part_path)
+    if hasher is not None and hasher[1] == offset:
+        return hasher[0]
+    hasher = hashlib.sha256()
+    if offset:
+        with open(part_path, 'rb') as f:
+            remaining = offset
+            while remaining:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                hasher.update(chunk)
+                remaining -= len(chunk)
+    return hasher
+
+
+def write_chunk(order_dir, filename, stream, start, total, max_bytes=None):
+    """
+    Append one byte range [start, ...) of a resumable upload whose full size is `total`.
+    The range must start exactly where the previous chunk ended (see received_bytes).
+    Returns dict(received, complete, sha256) — sha256 is set once the last byte arrived.
+    """
+    if max_bytes is not None and total > max_bytes:
+        raise UploadError(f"Upload exceeds the limit of {max_bytes} bytes")
+    path = os.path.join(order_dir, filename)
+    part_path = path + PART_SUFFIX
+
+    with _lock_for(part_path):
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        if start != offset:
+            raise UploadError(f"Chunk starts at byte {start}, expected {offset}")
+        hasher = _hasher_for(part_path, offset)
+        with open(part_path, 'ab') as out:
+            received = offset + _copy_stream(stream, out, hasher, total - offset)
+        _hashers[part_path] = (hasher, received)
+
+        if received < total:
+            return {'received': received, 'complete': False, 'sha256': None}
+        digest = hasher.hexdigest()
+        os.makedirs(os.path.join(order_dir, DIGEST_DIR), exist_ok=True)
+        with open(os.path.join(order_dir, DIGEST_DIR, filename + '.sha256'), 'w') as f:
+            f.write(digest)
+        os.replace(part_path, path)
+        _hashers.pop(part_path, None)
+    with _locks_lock:
+        _locks.pop(part_path, None)
+    return {'received': received, 'complete': True, 'sha256': digest}
+
+
+def file_sha256(path):
+    """Hash an already stored file"""
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def uploaded_sha256(order_dir, filename):
+    """sha256 recorded when a chunked upload completed (falls back to hashing the file)"""
+    digest_path = os.path.join(order_dir, DIGEST_DIR, filename + '.sha256')
+    if os.path.exists(digest_path):
+        with open(digest_path, 'r') as f:
+            return f.read().strip()
+    return file_sha256(os.path.join(order_dir, filename))